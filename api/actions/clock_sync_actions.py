@@ -0,0 +1,132 @@
+import json
+import decimal
+from django.db import connection, transaction
+from django.utils import timezone
+from api.models import Clockin, ClockinSyncEvent
+from api.serializers.clockin_serializer import ClockEventSerializer, validate_clock_in
+from api.actions import clockin_actions, daily_hours_actions, employer_actions
+from api.utils.bulk import bulk_update
+
+# events accepted on every sync request
+MAXIMUM_SYNC_EVENTS = 200
+
+APPLIED = 'applied'
+DUPLICATE = 'duplicate'
+REJECTED = 'rejected'
+
+def coordinate(value):
+    # same precision as the clockin columns
+    return round(decimal.Decimal(value), 11)
+
+def rejected(key, errors):
+    return { "key": key, "status": REJECTED, "clockin": None, "errors": errors }
+
+def sync_clock_events(employee, events):
+    """
+    Apply an ordered list of clock ins and outs recorded by the phone while it was offline.
+    The shifts, the open clockins and the keys already applied are loaded once for
+    the whole batch, the events are validated in order against that state (with the
+    time they happened on the phone) and the accepted ones are saved in one transaction.
+    Returns one result per event: { key, status (applied, duplicate or rejected), clockin, errors },
+    only the applied events are recorded so a retried rejected event is checked again with the state it finds
+    """
+    results = [None] * len(events)
+    valid = []
+    for index, event in enumerate(events):
+        serializer = ClockEventSerializer(data=event)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            results[index] = rejected(event.get('key') if isinstance(event, dict) else None, serializer.errors)
+
+    applied = {sync.key: sync for sync in ClockinSyncEvent.objects.filter(employee=employee, key__in=[event['key'] for index, event in valid])}
+    shifts = clockin_actions.clockin_shifts(employee.id).in_bulk(list(set(event['shift'] for index, event in valid)))
+    open_clockins = {clockin.shift_id: clockin for clockin in Clockin.objects.filter(employee=employee, ended_at=None)}
+    clocked_in = set(shift.id for shift in shifts.values() if shift.has_shift_clockin)
+
+    now = timezone.now()
+    created = []
+    closed = []
+    accepted = []
+    seen = set()
+    for index, event in valid:
+        key = event['key']
+        if key in applied:
+            results[index] = dict(json.loads(applied[key].result), status=DUPLICATE)
+            continue
+        if key in seen:
+            results[index] = { "key": key, "status": DUPLICATE, "clockin": None, "errors": [] }
+            continue
+        seen.add(key)
+
+        shift = shifts.get(event['shift'])
+        if shift is None:
+            results[index] = rejected(key, ["The shift was not found"])
+            continue
+        if clockin_actions.distance_to_venue(shift.venue_id, event['latitude'], event['longitude']) > clockin_actions.CLOCKIN_DISTANCE_MILES:
+            results[index] = rejected(key, ["You need to be 0.1 miles near " + clockin_actions.get_venue(shift.venue_id)[3]])
+            continue
+
+        if event['type'] == 'in':
+            if len(open_clockins) > 0:
+                results[index] = rejected(key, ["You need to clock out first from all your previous shifts before attempting to clockin again"])
+                continue
+            try:
+                validate_clock_in(shift.starting_at, shift.ending_at, shift.employer.maximum_clockin_delta_minutes,
+                    is_first_clockin=shift.id not in clocked_in, now=event['at'])
+            except ValueError as e:
+                results[index] = rejected(key, [str(e)])
+                continue
+            clockin = Clockin(employee=employee, shift_id=shift.id, started_at=event['at'],
+                latitude_in=coordinate(event['latitude']), longitude_in=coordinate(event['longitude']))
+            open_clockins[shift.id] = clockin
+            clocked_in.add(shift.id)
+            created.append(clockin)
+        else:
+            clockin = open_clockins.get(shift.id)
+            if clockin is None:
+                results[index] = rejected(key, ["There is no previous clockin for this shift"])
+                continue
+            if event['at'] < clockin.started_at:
+                results[index] = rejected(key, ["You can't clock out before you clocked in"])
+                continue
+            del open_clockins[shift.id]
+            clockin.ended_at = event['at']
+            clockin.latitude_out = coordinate(event['latitude'])
+            clockin.longitude_out = coordinate(event['longitude'])
+            clockin.updated_at = now
+            # the clockins created on this batch are inserted already closed
+            if clockin.id is not None:
+                closed.append(clockin)
+
+        results[index] = { "key": key, "status": APPLIED, "clockin": None, "errors": [] }
+        accepted.append((index, clockin))
+
+    with transaction.atomic():
+        # only some databases (postgres) return the primary keys after a bulk insert,
+        # on the rest the new clockins are read back from the ids after the last one
+        last_id = None
+        if len(created) > 0 and not connection.features.can_return_ids_from_bulk_insert:
+            last_id = Clockin.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+        Clockin.objects.bulk_create(created)
+
+        if last_id is not None:
+            ids = dict(Clockin.objects.filter(employee=employee, id__gt=last_id).values_list('started_at', 'id'))
+            for clockin in created:
+                clockin.id = ids[clockin.started_at]
+
+        bulk_update(closed, ['ended_at', 'latitude_out', 'longitude_out', 'updated_at'])
+
+        for index, clockin in accepted:
+            results[index]["clockin"] = clockin.id
+        ClockinSyncEvent.objects.bulk_create([
+            ClockinSyncEvent(employee=employee, key=results[index]["key"], clockin_id=clockin.id, result=json.dumps(results[index]))
+            for index, clockin in accepted
+        ])
+        daily_hours_actions.refresh_daily_hours([(clockin.employee_id, clockin.shift_id) for index, clockin in accepted if clockin.ended_at is not None])
+
+    for employer_id in set(shifts[clockin.shift_id].employer_id for index, clockin in accepted):
+        employer_actions.forget_employer_summary(employer_id)
+
+    return results
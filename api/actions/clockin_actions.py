@@ -0,0 +1,131 @@
+import time
+import datetime
+import logging
+from math import radians, cos, sin, asin, sqrt
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from api.models import Clockin, Shift, Venue
+from api.utils.geo import EARTH_RADIUS_MILES
+from api.utils.bulk import bulk_update
+from api.actions import daily_hours_actions, employer_actions
+
+logger = logging.getLogger(__name__)
+
+# talents have to be this close to the venue to clock in or out
+CLOCKIN_DISTANCE_MILES = 0.1
+
+# the venues of this process are reloaded after this time (other processes don't get the signals)
+VENUE_CACHE_SECONDS = 300
+
+# open clockins checked on every batch of the auto clock out
+AUTO_CLOCKOUT_BATCH_SIZE = 500
+
+# venue id -> (latitude, longitude, cos(latitude), title, expires_at), coordinates in radians
+_venues = {}
+
+def get_venue(venue_id):
+    """
+    Coordinates of the venue in radians (ready for haversine) and its title,
+    venues almost never move so they are kept in memory for a few minutes
+    """
+    venue = _venues.get(venue_id)
+    if venue is None or venue[4] < time.time():
+        title, latitude, longitude = Venue.objects.values_list('title', 'latitude', 'longitude').get(id=venue_id)
+        latitude = radians(float(latitude))
+        venue = (latitude, radians(float(longitude)), cos(latitude), title, time.time() + VENUE_CACHE_SECONDS)
+        _venues[venue_id] = venue
+    return venue
+
+@receiver(post_save, sender=Venue)
+@receiver(post_delete, sender=Venue)
+def forget_venue(sender, instance, **kwargs):
+    _venues.pop(instance.id, None)
+
+def distance_to_venue(venue_id, latitude, longitude):
+    """
+    Miles between a coordinate (decimal degrees) and the venue
+    """
+    venue_latitude, venue_longitude, venue_cos, title, expires_at = get_venue(venue_id)
+    latitude = radians(float(latitude))
+    longitude = radians(float(longitude))
+    a = sin((latitude - venue_latitude)/2)**2 + venue_cos * cos(latitude) * sin((longitude - venue_longitude)/2)**2
+    return 2 * EARTH_RADIUS_MILES * asin(sqrt(a))
+
+def clockin_shifts(employee_id):
+    """
+    Shifts with the employer settings and the clockin state of the talent,
+    getting one of them is the only query a clock in needs
+    """
+    return Shift.objects.select_related('employer').annotate(
+        has_open_clockin=Exists(Clockin.objects.filter(employee_id=employee_id, ended_at=None)),
+        has_shift_clockin=Exists(Clockin.objects.filter(employee_id=employee_id, shift_id=OuterRef('pk')))
+    )
+
+def auto_clockout_time(started_at, shift_ending_at, delay_minutes, now):
+    """
+    When an open clockin has to be closed: delay_minutes after the end of the shift,
+    the talent is paid until the end of the shift. Returns None if it is not overdue yet
+    """
+    if shift_ending_at + datetime.timedelta(minutes=delay_minutes) > now:
+        return None
+    return shift_ending_at if shift_ending_at > started_at else started_at
+
+def close_overdue_clockins(now=None, batch_size=AUTO_CLOCKOUT_BATCH_SIZE):
+    """
+    Close the clockins nobody clocked out of once the maximum_clockout_delay_minutes
+    of the shift (or of the employer if the shift has none) passed, shifts and
+    employers without it let talents clock out anytime.
+    The open clockins are read in id order and every batch is locked with SKIP LOCKED
+    (where the database supports it) so several nodes can run it at the same time.
+    Returns a report with the counts and timing of the run
+    """
+    started = time.time()
+    if now is None:
+        now = timezone.now()
+
+    lock = {}
+    if connection.features.has_select_for_update_skip_locked:
+        lock['skip_locked'] = True
+    if connection.features.has_select_for_update_of:
+        lock['of'] = ('self',)
+
+    report = { "scanned": 0, "closed": 0, "seconds": 0 }
+    employer_ids = set()
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            rows = list(Clockin.objects.select_for_update(**lock).annotate(
+                delay_minutes=Coalesce('shift__maximum_clockout_delay_minutes', 'shift__employer__maximum_clockout_delay_minutes')
+            ).filter(
+                id__gt=last_id,
+                ended_at=None,
+                shift__ending_at__lt=now,
+                delay_minutes__isnull=False
+            ).order_by('id').values_list('id', 'employee_id', 'shift_id', 'started_at', 'shift__ending_at',
+                'delay_minutes', 'shift__employer_id')[:batch_size])
+            if len(rows) == 0:
+                break
+            last_id = rows[-1][0]
+            report["scanned"] += len(rows)
+
+            closed = []
+            for id, employee_id, shift_id, started_at, shift_ending_at, delay_minutes, employer_id in rows:
+                ended_at = auto_clockout_time(started_at, shift_ending_at, delay_minutes, now)
+                if ended_at is not None:
+                    closed.append(Clockin(id=id, employee_id=employee_id, shift_id=shift_id, ended_at=ended_at, updated_at=now))
+                    employer_ids.add(employer_id)
+
+            bulk_update(closed, ['ended_at', 'updated_at'])
+            daily_hours_actions.refresh_daily_hours([(clockin.employee_id, clockin.shift_id) for clockin in closed])
+            report["closed"] += len(closed)
+
+    for employer_id in employer_ids:
+        employer_actions.forget_employer_summary(employer_id)
+
+    report["seconds"] = round(time.time() - started, 3)
+    logger.info('auto_clockout scanned=%s closed=%s seconds=%s', report["scanned"], report["closed"], report["seconds"])
+    return report
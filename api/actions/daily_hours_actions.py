@@ -0,0 +1,67 @@
+import decimal
+import functools
+import operator
+from django.db import transaction
+from django.db.models import F, Q, Sum, Count, DurationField, ExpressionWrapper
+from django.db.models.functions import TruncDate
+from api.models import Clockin, EmployeeDailyHours
+
+# how many rows are inserted on each query
+DAILY_HOURS_BATCH_SIZE = 500
+CENTS = decimal.Decimal('0.01')
+
+def build_daily_hours(clockins):
+    """
+    Unsaved rollup rows for a queryset of clockins, the database adds up
+    the worked time per employer, talent, shift and day
+    """
+    rows = clockins.filter(ended_at__isnull=False).annotate(day=TruncDate('started_at')).values(
+        'shift__employer_id', 'employee_id', 'shift_id', 'shift__minimum_hourly_rate', 'day'
+    ).annotate(
+        duration=Sum(ExpressionWrapper(F('ended_at') - F('started_at'), output_field=DurationField())),
+        total=Count('id')
+    ).order_by()
+
+    daily_hours = []
+    for row in rows:
+        hours = decimal.Decimal(row['duration'].total_seconds()) / 3600
+        daily_hours.append(EmployeeDailyHours(
+            employer_id = row['shift__employer_id'],
+            employee_id = row['employee_id'],
+            shift_id = row['shift_id'],
+            day = row['day'],
+            clockins = row['total'],
+            hours = hours.quantize(CENTS),
+            amount = (hours * row['shift__minimum_hourly_rate']).quantize(CENTS)
+        ))
+    return daily_hours
+
+def refresh_daily_hours(pairs):
+    """
+    Recompute the rollup of some (employee_id, shift_id) pairs after
+    their clockins were closed, edited or deleted
+    """
+    pairs = set(pairs)
+    if len(pairs) == 0:
+        return []
+
+    match = functools.reduce(operator.or_, [Q(employee_id=employee_id, shift_id=shift_id) for employee_id, shift_id in pairs])
+    with transaction.atomic():
+        # two refreshes of the same pair (auto clock out and a timesheet edit) would both
+        # delete and then both insert the same days, the second one waits for the first
+        list(Clockin.objects.select_for_update().filter(match).values_list('id', flat=True))
+        EmployeeDailyHours.objects.filter(match).delete()
+        daily_hours = build_daily_hours(Clockin.objects.filter(match))
+        EmployeeDailyHours.objects.bulk_create(daily_hours, batch_size=DAILY_HOURS_BATCH_SIZE)
+    return daily_hours
+
+def rebuild_daily_hours(employer_id):
+    """
+    Throw away and recompute the whole rollup of an employer (backfills),
+    returns how many rows were created
+    """
+    with transaction.atomic():
+        EmployeeDailyHours.objects.filter(employer_id=employer_id).delete()
+        daily_hours = build_daily_hours(Clockin.objects.filter(shift__employer_id=employer_id))
+        EmployeeDailyHours.objects.bulk_create(daily_hours, batch_size=DAILY_HOURS_BATCH_SIZE)
+    return len(daily_hours)
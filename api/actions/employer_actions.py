@@ -0,0 +1,80 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Sum, F, Q, OuterRef, Subquery, IntegerField, DecimalField
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from api.models import (Employer, Shift, ShiftApplication, ShiftEmployee, ShiftInvite, Clockin, PayrollPeriodPayment,
+    OPEN, FILLED, DRAFT, PENDING)
+
+# the summary is dropped when the employer data is saved (the bulk writers drop it themselves), this is the safety net for deletes (no signals)
+SUMMARY_CACHE_SECONDS = 60
+
+def summary_key(employer_id):
+    return 'employer-summary-' + str(employer_id)
+
+def count_of(queryset):
+    """
+    Scalar subquery with the number of rows of queryset for the outer employer
+    """
+    return Coalesce(Subquery(queryset.order_by().values('employer_id').annotate(total=Count('id')).values('total'),
+        output_field=IntegerField()), 0)
+
+def compute_employer_summary(employer_id):
+    """
+    Dashboard numbers of the employer with two queries: the shifts by status
+    and one row of the employer with a subquery for every other count
+    """
+    shifts = Shift.objects.filter(employer_id=employer_id).aggregate(
+        open_shifts=Count('id', filter=Q(status=OPEN)),
+        filled_shifts=Count('id', filter=Q(status=FILLED)),
+        draft_shifts=Count('id', filter=Q(status=DRAFT))
+    )
+
+    unpaid_hours = PayrollPeriodPayment.objects.filter(paryroll_period__employer_id=OuterRef('pk'), status=PENDING).order_by() \
+        .annotate(employer_id=F('paryroll_period__employer_id')).values('employer_id') \
+        .annotate(total=Sum(F('regular_hours') + F('over_time'))).values('total')
+    summary = Employer.objects.filter(id=employer_id).annotate(
+        pending_applicants=count_of(ShiftApplication.objects.filter(shift__employer_id=OuterRef('pk')).annotate(employer_id=F('shift__employer_id'))),
+        pending_invites=count_of(ShiftInvite.objects.filter(shift__employer_id=OuterRef('pk'), status=PENDING).annotate(employer_id=F('shift__employer_id'))),
+        open_clockins=count_of(Clockin.objects.filter(shift__employer_id=OuterRef('pk'), ended_at=None).annotate(employer_id=F('shift__employer_id'))),
+        unpaid_hours=Coalesce(Subquery(unpaid_hours, output_field=DecimalField()), 0)
+    ).values('pending_applicants', 'pending_invites', 'open_clockins', 'unpaid_hours').get()
+
+    summary.update(shifts)
+    summary['unpaid_hours'] = float(summary['unpaid_hours'])
+    return summary
+
+def get_employer_summary(employer_id):
+    summary = cache.get(summary_key(employer_id))
+    if summary is None:
+        summary = compute_employer_summary(employer_id)
+        cache.set(summary_key(employer_id), summary, SUMMARY_CACHE_SECONDS)
+    return summary
+
+def forget_employer_summary(employer_id):
+    cache.delete(summary_key(employer_id))
+    # a request that read the data before the write commits can cache the old numbers again
+    transaction.on_commit(lambda: cache.delete(summary_key(employer_id)))
+
+@receiver(post_save, sender=Shift)
+@receiver(post_delete, sender=Shift)
+def forget_shift_employer(sender, instance, **kwargs):
+    forget_employer_summary(instance.employer_id)
+
+# only saves, a receiver on the deletes would load every row the shift deletes cascade to
+@receiver(post_save, sender=ShiftApplication)
+@receiver(post_save, sender=ShiftEmployee)
+@receiver(post_save, sender=ShiftInvite)
+@receiver(post_save, sender=Clockin)
+def forget_shift_row_employer(sender, instance, **kwargs):
+    if sender._meta.get_field('shift').is_cached(instance):
+        employer_id = instance.shift.employer_id
+    else:
+        employer_id = Shift.objects.filter(id=instance.shift_id).values_list('employer_id', flat=True).first()
+    if employer_id is not None:
+        forget_employer_summary(employer_id)
+
+@receiver(post_save, sender=PayrollPeriodPayment)
+def forget_payment_employer(sender, instance, **kwargs):
+    forget_employer_summary(instance.paryroll_period.employer_id)
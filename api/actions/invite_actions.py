@@ -0,0 +1,32 @@
+from api.models import ShiftInvite
+
+# how many invites are inserted on each query
+INVITE_BATCH_SIZE = 500
+
+def create_shift_invites(shift, sender, talents, batch_size=INVITE_BATCH_SIZE):
+    """
+    Invite a list of talents to a shift using chunked bulk inserts,
+    talents that already have an invite for the shift are skipped.
+    Returns the new invites (with their ids) so they can be notified
+    """
+    already_invited = set(ShiftInvite.objects.filter(shift=shift).values_list('employee_id', flat=True))
+
+    invites = []
+    for talent in talents:
+        if talent.id in already_invited:
+            continue
+        already_invited.add(talent.id)
+        invites.append(ShiftInvite(sender=sender, shift=shift, employee=talent))
+
+    if len(invites) == 0:
+        return []
+
+    ShiftInvite.objects.bulk_create(invites, batch_size=batch_size)
+
+    # only some databases (postgres) return the primary keys after a bulk insert
+    if any(invite.id is None for invite in invites):
+        ids = dict(ShiftInvite.objects.filter(shift=shift, employee_id__in=[invite.employee_id for invite in invites]).values_list('employee_id', 'id'))
+        for invite in invites:
+            invite.id = ids[invite.employee_id]
+
+    return invites
@@ -0,0 +1,185 @@
+import time
+import datetime
+import logging
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from api.models import Employer, Clockin, PayrollPeriod, PayrollPeriodPayment
+from api.utils.payroll import HOUR, compute_payroll, week_of, week_start
+
+logger = logging.getLogger(__name__)
+
+# how many rows are inserted on each query
+PAYMENT_BATCH_SIZE = 500
+
+def get_pending_windows(employer, now=None):
+    """
+    (starting_at, ending_at) of every period that already finished and was
+    not generated yet, starting after the last period of the employer
+    """
+    if now is None:
+        now = timezone.now()
+
+    length = datetime.timedelta(days=employer.payroll_period_length)
+    last_ending_at = PayrollPeriod.objects.filter(employer__id=employer.id).aggregate(last=Max('ending_at'))['last']
+
+    #if there is a previous period we generate from there, if not we generate since the company joined jobcore
+    if last_ending_at is None:
+        starting_time = employer.payroll_period_starting_time
+        last_ending_at = employer.created_at.replace(hour=starting_time.hour, minute=starting_time.minute, second=starting_time.second) - datetime.timedelta(seconds=1)
+
+    windows = []
+    end_date = last_ending_at + length
+    while end_date < now:
+        windows.append((end_date - length + datetime.timedelta(seconds=1), end_date))
+        end_date = end_date + length
+    return windows
+
+def hours_between(clockins, starting_at, ending_at):
+    """
+    Hours of every talent inside starting_at and ending_at (timestamps),
+    clockins are (employee_id, shift_id, started_at, ended_at, rate) rows with timestamps
+    """
+    hours = {}
+    for employee_id, shift_id, started_at, ended_at, rate in clockins:
+        start = started_at if started_at > starting_at else starting_at
+        end = ended_at if ended_at < ending_at else ending_at
+        if end > start:
+            hours[employee_id] = hours.get(employee_id, 0.0) + (end - start) / HOUR
+    return hours
+
+def build_payments(clockins, starting_at, ending_at, carried=None):
+    """
+    Unsaved payments for the part of every clockin that falls inside the period,
+    clockins are (employee_id, shift_id, started_at, ended_at, rate) rows with timestamps.
+    The hours and the weekly overtime are computed for all of them at once,
+    carried are the hours worked in the week before the period (compute_payroll)
+    """
+    employees, shifts, starts, ends, rates = zip(*clockins)
+    hours = compute_payroll(employees, starts, ends, [float(rate) for rate in rates], starting_at, ending_at, carried=carried)
+
+    return [PayrollPeriodPayment(
+        employee_id = employee_id,
+        shift_id = shift_id,
+        regular_hours = round(regular_hours, 2),
+        over_time = round(over_time, 2),
+        hourly_rate = rate,
+        total_amount = round(amount, 2),
+        splited_payment = splited
+    ) for employee_id, shift_id, rate, regular_hours, over_time, amount, splited
+        in zip(employees, shifts, rates, hours.regular_hours, hours.over_time, hours.amount, hours.splited)]
+
+def carried_hours(limits, index, origin, length, earlier, clockins_by_window):
+    """
+    Hours every talent worked in the week the period index starts, before it started:
+    in the clockins before the first period (earlier) and in the previous periods
+    """
+    period_start = limits[index][0]
+    since = week_start(period_start)
+    if since >= period_start:
+        return {}
+
+    sources = [(earlier, since, min(origin, period_start))]
+    for previous in range(max(0, int((since - origin) // length)), index):
+        sources.append((clockins_by_window.get(previous, []), max(since, limits[previous][0]), min(period_start, limits[previous][1])))
+
+    carried = {}
+    week = week_of(period_start)
+    for rows, starting_at, ending_at in sources:
+        for employee_id, hours in hours_between(rows, starting_at, ending_at).items():
+            carried[(employee_id, week)] = carried.get((employee_id, week), 0.0) + hours
+    return carried
+
+def generate_periods(employer, now=None):
+    """
+    Generate all the payroll periods (and their payments) the employer is missing.
+    The clockins of the whole catch up window are loaded with one query, split
+    into periods in memory and everything is inserted in the transaction that
+    locks the employer row, so the runs for the same employer never overlap.
+    Returns (periods, report) where report has the counts and timing of the run
+    """
+    started = time.time()
+    if employer.payroll_period_type != 'DAYS':
+        raise ValueError('The only supported period type is DAYS (for now)')
+
+    with transaction.atomic():
+        # the hourly command and the admin view can run at the same time, the second run
+        # for the same employer waits here and then finds the periods of the first one
+        Employer.objects.select_for_update().values_list('id', flat=True).get(id=employer.id)
+
+        windows = get_pending_windows(employer, now)
+        report = { "employer": employer.id, "periods": 0, "payments": 0, "clockins": 0, "seconds": 0 }
+        if len(windows) == 0:
+            report["seconds"] = round(time.time() - started, 3)
+            return [], report
+
+        first_start = windows[0][0]
+        last_end = windows[-1][1]
+        length = datetime.timedelta(days=employer.payroll_period_length).total_seconds()
+
+        # every clockin that overlaps the window (from the start of its first week, the
+        # overtime counts them), clockins still open can't be paid yet.
+        # only the columns the math needs are loaded, no model instances
+        origin = first_start.timestamp()
+        clockins = Clockin.objects.filter(
+            shift__employer__id=employer.id,
+            started_at__lte=last_end,
+            ended_at__gte=datetime.datetime.fromtimestamp(week_start(origin), tz=timezone.utc)
+        ).values_list('employee_id', 'shift_id', 'started_at', 'ended_at', 'shift__minimum_hourly_rate').order_by('started_at', 'id')
+
+        limits = [(starting_at.timestamp(), ending_at.timestamp()) for starting_at, ending_at in windows]
+        clockins_by_window = {}
+        earlier = []
+        for employee_id, shift_id, started_at, ended_at, rate in clockins:
+            row = (employee_id, shift_id, started_at.timestamp(), ended_at.timestamp(), rate)
+            if row[2] < origin:
+                earlier.append(row)
+            if row[3] < origin:
+                continue
+            report["clockins"] += 1
+            # the periods are contiguous, the index of the first and last one is just arithmetic
+            first = max(0, int((row[2] - origin) // length))
+            last = min(len(windows) - 1, int((row[3] - origin) // length))
+            for index in range(first, last + 1):
+                if row[2] > limits[index][1] or row[3] < limits[index][0]:
+                    continue
+                clockins_by_window.setdefault(index, []).append(row)
+
+        payments_by_window = {}
+        for index, window_clockins in clockins_by_window.items():
+            payments_by_window[index] = build_payments(window_clockins, *windows[index],
+                carried=carried_hours(limits, index, origin, length, earlier, clockins_by_window))
+
+        # periods without any clockin are not created
+        periods = []
+        for index in sorted(payments_by_window.keys()):
+            starting_at, ending_at = windows[index]
+            periods.append(PayrollPeriod(
+                starting_at = starting_at,
+                ending_at = ending_at,
+                employer = employer,
+                length = employer.payroll_period_length,
+                length_type = employer.payroll_period_type
+            ))
+
+        PayrollPeriod.objects.bulk_create(periods)
+
+        # only some databases (postgres) return the primary keys after a bulk insert
+        if any(period.id is None for period in periods):
+            ids = dict(PayrollPeriod.objects.filter(employer__id=employer.id, starting_at__gte=first_start).values_list('starting_at', 'id'))
+            for period in periods:
+                period.id = ids[period.starting_at]
+
+        payments = []
+        for period, index in zip(periods, sorted(payments_by_window.keys())):
+            for payment in payments_by_window[index]:
+                payment.paryroll_period = period
+                payments.append(payment)
+        PayrollPeriodPayment.objects.bulk_create(payments, batch_size=PAYMENT_BATCH_SIZE)
+
+    report["periods"] = len(periods)
+    report["payments"] = len(payments)
+    report["seconds"] = round(time.time() - started, 3)
+    logger.info('Payroll periods for employer %s: %s periods, %s payments from %s clockins in %ss',
+        employer.id, report["periods"], report["payments"], report["clockins"], report["seconds"])
+    return periods, report
@@ -0,0 +1,109 @@
+from django.db import transaction
+from django.utils import timezone
+from api.actions import employer_actions
+from api.models import Employee, Shift, ShiftEmployee, ShiftApplication, OPEN, FILLED
+
+# rows inserted on each query
+ROSTER_BATCH_SIZE = 500
+
+# results of fill_shift
+ACCEPTED = 'accepted'
+ALREADY_ACCEPTED = 'already_accepted'
+SHIFT_FILLED = 'shift_filled'
+# DRAFT, PAUSED, CANCELLED...
+SHIFT_NOT_OPEN = 'shift_not_open'
+
+def sync_roster(shift, model, employee_ids, batch_size=ROSTER_BATCH_SIZE, maximum=0):
+    """
+    Make the talents of the shift on model (ShiftEmployee or ShiftApplication)
+    exactly employee_ids: the changes are the differences between the ids on the
+    shift and the existing talents, applied with one delete and one bulk insert.
+    Raises ValueError if there are more talents than maximum (0 means no limit).
+    Returns (added, removed) talent ids
+    """
+    current = set(model.objects.filter(shift_id=shift.id).values_list('employee_id', flat=True))
+    wanted = set(Employee.objects.filter(id__in=employee_ids).values_list('id', flat=True))
+    if maximum > 0 and len(wanted) > maximum:
+        raise ValueError("This shift only has "+str(maximum)+" spots")
+    added = wanted - current
+    removed = current - wanted
+
+    with transaction.atomic():
+        if len(removed) > 0:
+            model.objects.filter(shift_id=shift.id, employee_id__in=removed).delete()
+        if len(added) > 0:
+            model.objects.bulk_create([model(shift_id=shift.id, employee_id=id) for id in sorted(added)], batch_size=batch_size)
+
+    if len(added) > 0 or len(removed) > 0:
+        employer_actions.forget_employer_summary(shift.employer_id)
+
+    return added, removed
+
+def sync_shift_employees(shift, employee_ids):
+    """
+    Set the accepted talents of the shift, returns the talents to notify
+    { accepted, rejected } loaded (with their users) in one query.
+    It takes the same lock of the shift row as fill_shift, so the employer and the
+    talents can't accept more talents than maximum_allowed_employees between them
+    (ValueError). An OPEN shift moves to FILLED once all its spots are taken and
+    a FILLED shift moves back to OPEN when the employer frees a spot
+    """
+    with transaction.atomic():
+        Shift.objects.filter(id=shift.id).update(updated_at=timezone.now())
+        maximum, status = Shift.objects.values_list('maximum_allowed_employees', 'status').get(id=shift.id)
+        added, removed = sync_roster(shift, ShiftEmployee, employee_ids, maximum=maximum)
+        if status in (OPEN, FILLED):
+            full = maximum > 0 and ShiftEmployee.objects.filter(shift_id=shift.id).count() >= maximum
+            if status == OPEN and full:
+                Shift.objects.filter(id=shift.id).update(status=FILLED)
+                employer_actions.forget_employer_summary(shift.employer_id)
+            elif status == FILLED and not full:
+                Shift.objects.filter(id=shift.id).update(status=OPEN)
+                employer_actions.forget_employer_summary(shift.employer_id)
+
+    talents = {}
+    if len(added) > 0 or len(removed) > 0:
+        talents = Employee.objects.select_related('user').in_bulk(list(added | removed))
+    return {
+        "accepted": [talents[id] for id in sorted(added)],
+        "rejected": [talents[id] for id in sorted(removed)]
+    }
+
+def sync_shift_candidates(shift, employee_ids):
+    """
+    Set the applicants of the shift
+    """
+    sync_roster(shift, ShiftApplication, employee_ids)
+
+def fill_shift(shift_id, employee_id):
+    """
+    Accept one talent on an OPEN shift without going over maximum_allowed_employees
+    (0 means no limit). The first statement is a conditional update of the shift row:
+    it locks the shift until the transaction ends, so the accepts of the same shift
+    run one after the other, and it matches nothing once the shift is FILLED (or not
+    OPEN anymore), rejecting the extra accepts with one more query for the status.
+    The shift moves to FILLED in the same transaction that takes the last spot.
+    Returns ACCEPTED, ALREADY_ACCEPTED, SHIFT_FILLED or SHIFT_NOT_OPEN
+    """
+    with transaction.atomic():
+        if Shift.objects.filter(id=shift_id, status=OPEN).update(updated_at=timezone.now()) == 0:
+            if Shift.objects.filter(id=shift_id, status=FILLED).exists():
+                return SHIFT_FILLED
+            return SHIFT_NOT_OPEN
+
+        maximum, employer_id = Shift.objects.values_list('maximum_allowed_employees', 'employer_id').get(id=shift_id)
+        employee_ids = set(ShiftEmployee.objects.filter(shift_id=shift_id).values_list('employee_id', flat=True))
+        if employee_id in employee_ids:
+            return ALREADY_ACCEPTED
+
+        if maximum > 0 and len(employee_ids) >= maximum:
+            Shift.objects.filter(id=shift_id).update(status=FILLED)
+            employer_actions.forget_employer_summary(employer_id)
+            return SHIFT_FILLED
+
+        ShiftEmployee.objects.create(shift_id=shift_id, employee_id=employee_id)
+        if maximum > 0 and len(employee_ids) + 1 >= maximum:
+            Shift.objects.filter(id=shift_id).update(status=FILLED)
+
+    employer_actions.forget_employer_summary(employer_id)
+    return ACCEPTED
@@ -0,0 +1,166 @@
+import time
+import logging
+import itertools
+from dateutil import rrule
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from api.models import Shift, ShiftInvite, OPEN, FILLED, EXPIRED, COMPLETED, PENDING
+from api.actions import invite_actions, employer_actions
+from api.utils import notifier
+
+logger = logging.getLogger(__name__)
+
+# shifts moved on every query of the lifecycle
+LIFECYCLE_BATCH_SIZE = 500
+
+# occurrences of a shift series created at once
+MAXIMUM_SERIES_SHIFTS = 100
+
+SERIES_FREQUENCIES = {
+    'DAILY': rrule.DAILY,
+    'WEEKLY': rrule.WEEKLY,
+}
+
+def expire_pending_invites(shift_ids):
+    """
+    Nobody can apply to these shifts anymore, their pending invites stop showing up
+    """
+    return ShiftInvite.objects.filter(shift_id__in=shift_ids, status=PENDING).update(status=EXPIRED)
+
+def move_shifts(queryset, from_statuses, status, batch_size, expire_invites=False):
+    """
+    Move the shifts of the queryset from one of from_statuses to status in batches of ids.
+    The update checks the status again, so a shift the employer cancelled or paused after
+    the batch was read keeps the status the employer gave it (and its invites).
+    Returns (shifts, invites) updated
+    """
+    shifts = 0
+    invites = 0
+    employer_ids = set()
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            rows = list(queryset.filter(id__gt=last_id).order_by('id').values_list('id', 'employer_id')[:batch_size])
+            if len(rows) == 0:
+                break
+            last_id = rows[-1][0]
+            ids = [id for id, employer_id in rows]
+            employer_ids.update(employer_id for id, employer_id in rows)
+            moved = Shift.objects.filter(id__in=ids, status__in=from_statuses).update(status=status, updated_at=timezone.now())
+            shifts += moved
+            if expire_invites and moved > 0:
+                if moved < len(ids):
+                    ids = list(Shift.objects.filter(id__in=ids, status=status).values_list('id', flat=True))
+                invites += expire_pending_invites(ids)
+
+    for employer_id in employer_ids:
+        employer_actions.forget_employer_summary(employer_id)
+    return shifts, invites
+
+def update_shift_statuses(now=None, batch_size=LIFECYCLE_BATCH_SIZE):
+    """
+    Move the shifts through their lifecycle (employers only set DRAFT, OPEN, PAUSED or CANCELLED):
+    OPEN shifts with all the spots taken are FILLED, OPEN or FILLED shifts that ended are EXPIRED
+    and EXPIRED shifts with all their payments paid are COMPLETED. The pending invites of
+    FILLED and EXPIRED shifts are expired. Returns a report with the counts and timing of the run
+    """
+    started = time.time()
+    if now is None:
+        now = timezone.now()
+
+    report = { "filled": 0, "expired": 0, "completed": 0, "invites": 0, "seconds": 0 }
+
+    report["expired"], invites = move_shifts(
+        Shift.objects.filter(status__in=[OPEN, FILLED], ending_at__lt=now),
+        [OPEN, FILLED], EXPIRED, batch_size, expire_invites=True)
+    report["invites"] += invites
+
+    report["filled"], invites = move_shifts(
+        Shift.objects.filter(status=OPEN, ending_at__gte=now, maximum_allowed_employees__gt=0)
+            .annotate(accepted=Count('employees')).filter(accepted__gte=F('maximum_allowed_employees')),
+        [OPEN], FILLED, batch_size, expire_invites=True)
+    report["invites"] += invites
+
+    report["completed"], invites = move_shifts(
+        Shift.objects.filter(status=EXPIRED).annotate(
+            payments=Count('payrollperiodpayment'),
+            pending=Count('payrollperiodpayment', filter=Q(payrollperiodpayment__status=PENDING))
+        ).filter(payments__gt=0, pending=0),
+        [EXPIRED], COMPLETED, batch_size)
+
+    report["seconds"] = round(time.time() - started, 3)
+    logger.info('shift_lifecycle filled=%s expired=%s completed=%s invites=%s seconds=%s',
+        report["filled"], report["expired"], report["completed"], report["invites"], report["seconds"])
+    return report
+
+def series_occurrences(starting_at, ending_at, frequency, interval=1, count=None, until=None, weekdays=None, tz=None,
+        limit=MAXIMUM_SERIES_SHIFTS):
+    """
+    (starting_at, ending_at) of the first limit shifts of a series, the first one is the
+    template shift when it falls on one of the weekdays (0 is monday).
+    The rule is expanded on the wall clock of tz (the TIME_ZONE setting by default)
+    so the shifts keep their local hour across daylight saving changes, the
+    times returned are in UTC and every shift lasts the same as the template
+    """
+    if tz is None:
+        tz = timezone.get_current_timezone()
+    if until is not None:
+        until = timezone.make_naive(until, tz)
+
+    rule = rrule.rrule(SERIES_FREQUENCIES[frequency], dtstart=timezone.make_naive(starting_at, tz), interval=interval,
+        count=count if until is None else None, until=until, byweekday=weekdays or None)
+    length = ending_at - starting_at
+    starts = [timezone.make_aware(start, tz, is_dst=False).astimezone(timezone.utc)
+        for start in itertools.islice(rule, limit)]
+    return [(start, start + length) for start in starts]
+
+def create_shift_series(data, repeat, sender):
+    """
+    Create all the shifts of a series (data is the validated template shift,
+    repeat the validated rule) with one bulk insert per table, the talents are
+    matched once for the whole series and get a single invite notification.
+    Returns the new shifts
+    """
+    data = dict(data)
+    allowed_from_list = data.pop('allowed_from_list', [])
+    required_badges = data.pop('required_badges', [])
+    data['status'] = OPEN
+
+    shifts = [Shift(**dict(data, starting_at=starting_at, ending_at=ending_at))
+        for starting_at, ending_at in series_occurrences(data['starting_at'], data['ending_at'], **repeat)]
+    if len(shifts) == 0:
+        return []
+
+    with transaction.atomic():
+        Shift.objects.bulk_create(shifts)
+
+        # only some databases (postgres) return the primary keys after a bulk insert
+        if any(shift.id is None for shift in shifts):
+            ids = dict(Shift.objects.filter(employer=data['employer'], venue=data['venue'], position=data['position'],
+                starting_at__in=[shift.starting_at for shift in shifts]).order_by('id').values_list('starting_at', 'id'))
+            for shift in shifts:
+                shift.id = ids[shift.starting_at]
+
+        Shift.allowed_from_list.through.objects.bulk_create([
+            Shift.allowed_from_list.through(shift_id=shift.id, favoritelist_id=favorite_list.id)
+            for shift in shifts for favorite_list in allowed_from_list
+        ])
+        Shift.required_badges.through.objects.bulk_create([
+            Shift.required_badges.through(shift_id=shift.id, badge_id=badge.id)
+            for shift in shifts for badge in required_badges
+        ])
+
+        # every shift of the series has the same requirements
+        talents = list(notifier.get_talents_to_notify(shifts[0]).select_related('user'))
+        invites = invite_actions.create_shift_invites(shifts[0], sender, talents)
+        ShiftInvite.objects.bulk_create([
+            ShiftInvite(sender=sender, shift_id=shift.id, employee_id=talent.id)
+            for shift in shifts[1:] for talent in talents
+        ], batch_size=invite_actions.INVITE_BATCH_SIZE)
+
+        notifier.notify_shift_series_invites(shifts, invites)
+
+    employer_actions.forget_employer_summary(shifts[0].employer_id)
+
+    return shifts
@@ -0,0 +1,91 @@
+from django.db import transaction
+from django.utils import timezone
+from api.models import Clockin, Shift, Employee
+from api.serializers.clockin_serializer import ClockinTimesheetSerializer
+from api.actions import daily_hours_actions, employer_actions
+from api.utils.bulk import bulk_update
+
+# (timesheet field, model attribute)
+TIMESHEET_FIELDS = [
+    ('employee', 'employee_id'),
+    ('shift', 'shift_id'),
+    ('started_at', 'started_at'),
+    ('ended_at', 'ended_at'),
+    ('status', 'status'),
+]
+
+def save_timesheet(employer, entries):
+    """
+    Create or edit a batch of clockins of the employer, all or nothing.
+    Everything the entries reference is loaded with one query per model and
+    the changes are written with one bulk update and one bulk insert.
+    Returns (clockins, errors): errors has one dict per entry (empty when the
+    entry is valid) and nothing is saved if any entry has errors
+    """
+    serializer = ClockinTimesheetSerializer(data=entries, many=True)
+    if not serializer.is_valid():
+        return [], serializer.errors
+    rows = serializer.validated_data
+
+    clockins = Clockin.objects.filter(shift__employer__id=employer.id).in_bulk([row['id'] for row in rows if 'id' in row])
+    shift_ids = set(Shift.objects.filter(employer__id=employer.id, id__in=[row['shift'] for row in rows if 'shift' in row]).values_list('id', flat=True))
+    employee_ids = set(Employee.objects.filter(id__in=[row['employee'] for row in rows if 'employee' in row]).values_list('id', flat=True))
+
+    errors = []
+    for row in rows:
+        error = {}
+        if 'id' in row and row['id'] not in clockins:
+            error['id'] = ['Not found.']
+        if 'shift' in row and row['shift'] not in shift_ids:
+            error['shift'] = ['The shift does not exist or belongs to another employer']
+        if 'employee' in row and row['employee'] not in employee_ids:
+            error['employee'] = ['The talent does not exist']
+        if 'id' in row and row['id'] in clockins:
+            started_at = row.get('started_at', clockins[row['id']].started_at)
+            ended_at = row.get('ended_at', clockins[row['id']].ended_at)
+            if ended_at is not None and ended_at < started_at:
+                error['non_field_errors'] = ["The clockin can't end before it started"]
+        errors.append(error)
+    if any(errors):
+        return [], errors
+
+    now = timezone.now()
+    # (employee, shift) pairs whose daily hours change, before and after the edit
+    pairs = []
+    updated = []
+    created = []
+    result = []
+    for row in rows:
+        if 'id' in row:
+            clockin = clockins[row['id']]
+            pairs.append((clockin.employee_id, clockin.shift_id))
+            updated.append(clockin)
+        else:
+            clockin = Clockin()
+            created.append(clockin)
+        for name, attribute in TIMESHEET_FIELDS:
+            if name in row:
+                setattr(clockin, attribute, row[name])
+        clockin.updated_at = now
+        pairs.append((clockin.employee_id, clockin.shift_id))
+        result.append(clockin)
+
+    with transaction.atomic():
+        bulk_update(updated, [attribute for name, attribute in TIMESHEET_FIELDS] + ['updated_at'])
+        Clockin.objects.bulk_create(created)
+
+        # only some databases (postgres) return the primary keys after a bulk insert
+        if any(clockin.id is None for clockin in created):
+            ids = {(employee_id, shift_id, started_at): id for employee_id, shift_id, started_at, id in Clockin.objects.filter(
+                employee_id__in=[clockin.employee_id for clockin in created],
+                shift_id__in=[clockin.shift_id for clockin in created],
+                started_at__in=[clockin.started_at for clockin in created]
+            ).order_by('id').values_list('employee_id', 'shift_id', 'started_at', 'id')}
+            for clockin in created:
+                clockin.id = ids[(clockin.employee_id, clockin.shift_id, clockin.started_at)]
+
+        daily_hours_actions.refresh_daily_hours(pairs)
+
+    employer_actions.forget_employer_summary(employer.id)
+
+    return result, []
@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        # the notification templates are compiled once per process
+        from api.utils.notification_templates import load_templates
+        load_templates()
+        # the cached employer summaries are dropped by signals, every process has to listen
+        import api.actions.employer_actions
@@ -0,0 +1,19 @@
+import time
+from django.core.management.base import BaseCommand
+from api.actions import clockin_actions
+
+class Command(BaseCommand):
+    help = 'Close the clockins talents forgot to clock out of (maximum_clockout_delay_minutes of the shift or the employer)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=clockin_actions.AUTO_CLOCKOUT_BATCH_SIZE, help='Open clockins checked on every batch')
+        parser.add_argument('--sleep', type=float, default=60, help='Seconds between runs')
+        parser.add_argument('--once', action='store_true', help='Close the overdue clockins and exit')
+
+    def handle(self, *args, **options):
+        while True:
+            report = clockin_actions.close_overdue_clockins(batch_size=options['batch_size'])
+            self.stdout.write('Clockins scanned: {scanned}, closed: {closed} ({seconds}s)'.format(**report))
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
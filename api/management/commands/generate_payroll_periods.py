@@ -0,0 +1,69 @@
+import os
+import time
+import logging
+from multiprocessing import Pool
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from api.models import Employer
+from api.actions import payroll_actions
+
+logger = logging.getLogger(__name__)
+
+def generate_employer_periods(employer_id):
+    """
+    Runs on the pool, one employer per call: its own transaction and any
+    error is returned on the report instead of stopping the other employers
+    """
+    started = time.time()
+    try:
+        employer = Employer.objects.get(id=employer_id)
+        periods, report = payroll_actions.generate_periods(employer)
+        return report
+    except Exception as e:
+        logger.exception('Error generating the payroll periods of employer %s', employer_id)
+        return {
+            "employer": employer_id,
+            "error": str(e) or e.__class__.__name__,
+            "seconds": round(time.time() - started, 3)
+        }
+
+def init_worker():
+    # every worker opens its own database connections
+    connections.close_all()
+
+class Command(BaseCommand):
+    help = 'Generate the payroll periods every employer is missing (schedule it every hour)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=os.cpu_count() or 1, help='Employers processed at the same time')
+        parser.add_argument('--employer', type=int, action='append', dest='employers', help='Only this employer (can be repeated)')
+
+    def handle(self, *args, **options):
+        employers = Employer.objects.filter(payroll_period_type='DAYS').order_by('id')
+        if options['employers']:
+            employers = employers.filter(id__in=options['employers'])
+        employer_ids = list(employers.values_list('id', flat=True))
+
+        started = time.time()
+        if options['concurrency'] > 1 and len(employer_ids) > 1:
+            # the forked workers can't share the connection of this process
+            connections.close_all()
+            with Pool(processes=options['concurrency'], initializer=init_worker) as pool:
+                reports = pool.imap_unordered(generate_employer_periods, employer_ids)
+                failed = self.write_reports(reports)
+        else:
+            failed = self.write_reports(generate_employer_periods(employer_id) for employer_id in employer_ids)
+
+        self.stdout.write('{} employers in {:.1f}s, {} failed'.format(len(employer_ids), time.time() - started, failed))
+        if failed > 0:
+            raise CommandError('The payroll periods of {} employers could not be generated'.format(failed))
+
+    def write_reports(self, reports):
+        failed = 0
+        for report in reports:
+            if "error" in report:
+                failed += 1
+                self.stderr.write('Employer {employer}: {error} ({seconds}s)'.format(**report))
+            else:
+                self.stdout.write('Employer {employer}: {periods} periods, {payments} payments from {clockins} clockins ({seconds}s)'.format(**report))
+        return failed
@@ -0,0 +1,24 @@
+import time
+from django.core.management.base import BaseCommand
+from api.models import Employer
+from api.actions import daily_hours_actions
+
+class Command(BaseCommand):
+    help = 'Recompute the daily hours rollup from the clockins (backfills), one transaction per employer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employer', type=int, action='append', dest='employers', help='Only this employer (can be repeated)')
+
+    def handle(self, *args, **options):
+        employers = Employer.objects.order_by('id')
+        if options['employers']:
+            employers = employers.filter(id__in=options['employers'])
+
+        started = time.time()
+        total = 0
+        for employer_id in employers.values_list('id', flat=True):
+            rows = daily_hours_actions.rebuild_daily_hours(employer_id)
+            total += rows
+            self.stdout.write('Employer {}: {} rows'.format(employer_id, rows))
+
+        self.stdout.write('{} rows in {:.1f}s'.format(total, time.time() - started))
@@ -0,0 +1,303 @@
+import time
+import random
+import datetime
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from api.models import (Position, Badge, Employer, Employee, Profile, AvailabilityBlock, FavoriteList, Venue,
+    Shift, ShiftInvite, ShiftApplication, ShiftEmployee, Clockin, PayrollPeriod)
+from api.utils.geo import encode_geohash
+from api.actions import daily_hours_actions
+
+FIRST_NAMES = ['James', 'Maria', 'John', 'Ana', 'Robert', 'Lucia', 'Michael', 'Sofia', 'David', 'Carmen']
+LAST_NAMES = ['Smith', 'Garcia', 'Johnson', 'Rodriguez', 'Brown', 'Martinez', 'Lopez', 'Perez', 'Davis', 'Gomez']
+POSITIONS = ['Server', 'Bartender', 'Cook', 'Dishwasher', 'Host', 'Busser', 'Barback', 'Runner']
+
+# one degree of latitude in miles
+MILES_PER_DEGREE = 69.0
+
+# day the dataset is built around (--anchor), fixed so the same seed always builds the same data
+DEFAULT_ANCHOR = '2026-01-05'
+
+def anchor_date(value):
+    """
+    Midnight (UTC) of a YYYY-MM-DD date or of the current day for "today"
+    """
+    if value == 'today':
+        return timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return datetime.datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+
+class Command(BaseCommand):
+    help = 'Generate a large synthetic dataset (employers, talents, shifts, invites, clockins...) for benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employers', type=int, default=50)
+        parser.add_argument('--venues', type=int, default=3, help='Venues per employer')
+        parser.add_argument('--employees', type=int, default=20000)
+        parser.add_argument('--shifts', type=int, default=400, help='Shifts per employer')
+        parser.add_argument('--invites', type=int, default=20, help='Invites per shift')
+        parser.add_argument('--applications', type=int, default=5, help='Applications per shift')
+        parser.add_argument('--workers', type=int, default=3, help='Talents working on every shift (they clock in)')
+        parser.add_argument('--periods', type=int, default=8, help='Weekly payroll periods per employer')
+        parser.add_argument('--latitude', type=float, default=25.7617, help='Center of the generated coordinates')
+        parser.add_argument('--longitude', type=float, default=-80.1918)
+        parser.add_argument('--radius', type=float, default=50, help='Miles around the center')
+        parser.add_argument('--seed', type=int, default=42, help='Same seed, same dataset')
+        parser.add_argument('--anchor', type=anchor_date, default=DEFAULT_ANCHOR,
+            help='Day (YYYY-MM-DD or today) the shifts and clockins are placed around, "now" is its noon')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows on every bulk insert')
+        parser.add_argument('--prefix', default='seed', help='Prefix for the generated usernames and emails')
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=options['prefix'] + '_').exists():
+            raise CommandError('There are already users with the prefix "{}", use another --prefix'.format(options['prefix']))
+
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.options = options
+        # every date is relative to the anchor so the dataset has past and upcoming shifts
+        # and the statuses don't depend on the day it runs
+        self.today = options['anchor']
+        self.now = self.today + datetime.timedelta(hours=12)
+        self.created = []
+
+        started = time.time()
+        with transaction.atomic():
+            self.seed_catalog()
+            self.seed_employers()
+            self.seed_employees()
+            self.seed_shifts()
+            self.seed_shift_people()
+            self.seed_daily_hours()
+            self.seed_periods()
+            self.reset_sequences()
+
+        self.stdout.write('Done in {:.1f}s'.format(time.time() - started))
+
+    #
+    # HELPERS
+    #
+
+    def next_id(self, model):
+        return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+    def create(self, model, count, build):
+        """
+        Insert count rows in chunks, build(index) returns the unsaved instance.
+        The ids are assigned here so the caller can reference the new rows
+        without reading them back, returns the first id
+        """
+        started = time.time()
+        first_id = self.next_id(model)
+        for offset in range(0, count, self.batch_size):
+            rows = []
+            for index in range(offset, min(offset + self.batch_size, count)):
+                instance = build(index)
+                instance.id = first_id + index
+                rows.append(instance)
+            model.objects.bulk_create(rows)
+
+        if model not in self.created:
+            self.created.append(model)
+        self.stdout.write('{}: {} rows in {:.1f}s'.format(model.__name__, count, time.time() - started))
+        return first_id
+
+    def create_links(self, through, links):
+        """
+        Rows for the many to many tables, links is a generator of unsaved instances
+        """
+        started = time.time()
+        count = 0
+        rows = []
+        for link in links:
+            rows.append(link)
+            if len(rows) == self.batch_size:
+                through.objects.bulk_create(rows)
+                count += len(rows)
+                rows = []
+        through.objects.bulk_create(rows)
+        count += len(rows)
+        self.stdout.write('{}: {} rows in {:.1f}s'.format(through.__name__, count, time.time() - started))
+
+    def coordinate(self):
+        radius = self.options['radius'] / MILES_PER_DEGREE
+        return (
+            round(self.options['latitude'] + self.random.uniform(-radius, radius), 6),
+            round(self.options['longitude'] + self.random.uniform(-radius, radius), 6)
+        )
+
+    def reset_sequences(self):
+        # the ids were assigned by hand, the database sequences have to catch up
+        statements = connection.ops.sequence_reset_sql(no_style(), self.created)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+    def create_users(self, kind, count):
+        password = make_password('jobcore')
+        prefix = self.options['prefix']
+        return self.create(User, count, lambda i: User(
+            username='{}_{}_{}'.format(prefix, kind, i),
+            email='{}_{}_{}@jobcore.co'.format(prefix, kind, i),
+            first_name=self.random.choice(FIRST_NAMES),
+            last_name=self.random.choice(LAST_NAMES),
+            password=password,
+            is_active=True
+        ))
+
+    #
+    # DATA
+    #
+
+    def seed_catalog(self):
+        self.first_position = self.create(Position, len(POSITIONS), lambda i: Position(title=POSITIONS[i]))
+        self.first_badge = self.create(Badge, 5, lambda i: Badge(title='Badge {}'.format(i)))
+
+    def seed_employers(self):
+        employers = self.options['employers']
+        venues = self.options['venues']
+
+        self.first_employer = self.create(Employer, employers, lambda i: Employer(
+            title='Employer {}'.format(i),
+            payroll_period_starting_time=self.today - datetime.timedelta(weeks=self.options['periods'])
+        ))
+        first_user = self.create_users('employer', employers)
+        self.first_employer_profile = self.create(Profile, employers, lambda i: Profile(
+            user_id=first_user + i, employer_id=self.first_employer + i, status='ACTIVE'))
+
+        def build_venue(i):
+            latitude, longitude = self.coordinate()
+            return Venue(title='Venue {}'.format(i), employer_id=self.first_employer + i // venues, latitude=latitude, longitude=longitude)
+        self.first_venue = self.create(Venue, employers * venues, build_venue)
+        self.first_favlist = self.create(FavoriteList, employers, lambda i: FavoriteList(
+            title='Favorites', employer_id=self.first_employer + i))
+
+    def seed_employees(self):
+        employees = self.options['employees']
+        first_user = self.create_users('employee', employees)
+
+        self.first_employee = self.create(Employee, employees, lambda i: Employee(
+            user_id=first_user + i,
+            minimum_hourly_rate=self.random.choice([8, 10, 12, 15]),
+            rating=self.random.choice([None, 3, 4, 5]),
+            maximum_job_distance_miles=self.random.choice([10, 25, 50, 100])
+        ))
+
+        def build_profile(i):
+            latitude, longitude = self.coordinate()
+            # bulk_create does not send pre_save, the geohash is computed here
+            return Profile(user_id=first_user + i, employee_id=self.first_employee + i, status='ACTIVE',
+                latitude=latitude, longitude=longitude, geohash=encode_geohash(latitude, longitude))
+        self.create(Profile, employees, build_profile)
+
+        self.create(AvailabilityBlock, employees, lambda i: AvailabilityBlock(
+            employee_id=self.first_employee + i,
+            starting_at=self.today, ending_at=self.today + datetime.timedelta(hours=23, minutes=59)))
+
+        self.create_links(Employee.positions.through, (
+            Employee.positions.through(employee_id=self.first_employee + i, position_id=self.first_position + self.random.randrange(len(POSITIONS)))
+            for i in range(employees)
+        ))
+        employers = self.options['employers']
+        self.create_links(FavoriteList.employees.through, (
+            FavoriteList.employees.through(favoritelist_id=self.first_favlist + i % employers, employee_id=self.first_employee + i)
+            for i in range(0, employees, 10)
+        ))
+
+    def seed_shifts(self):
+        employers = self.options['employers']
+        per_employer = self.options['shifts']
+        venues = self.options['venues']
+        self.shift_count = employers * per_employer
+        self.shift_starts = []
+
+        def build_shift(i):
+            employer = i // per_employer
+            # between 60 days ago and 30 days from now, always at a round hour
+            starting_at = self.today + datetime.timedelta(days=self.random.randint(-60, 30), hours=self.random.randint(6, 20))
+            ending_at = starting_at + datetime.timedelta(hours=self.random.choice([4, 6, 8]))
+            self.shift_starts.append((starting_at, ending_at))
+            if ending_at < self.now:
+                status = self.random.choice(['COMPLETED', 'EXPIRED'])
+            else:
+                status = self.random.choice(['OPEN', 'OPEN', 'FILLED', 'DRAFT'])
+            return Shift(
+                employer_id=self.first_employer + employer,
+                venue_id=self.first_venue + employer * venues + self.random.randrange(venues),
+                position_id=self.first_position + self.random.randrange(len(POSITIONS)),
+                status=status,
+                starting_at=starting_at,
+                ending_at=ending_at,
+                maximum_allowed_employees=self.options['workers'],
+                minimum_hourly_rate=self.random.choice([8, 10, 12, 15])
+            )
+        self.first_shift = self.create(Shift, self.shift_count, build_shift)
+
+    def shift_talents(self, count):
+        """
+        Deterministic sample of different talents for one shift
+        """
+        employees = self.options['employees']
+        start = self.random.randrange(employees)
+        return [self.first_employee + (start + j) % employees for j in range(min(count, employees))]
+
+    def seed_shift_people(self):
+        per_employer = self.options['shifts']
+        invites = self.options['invites']
+        applications = self.options['applications']
+        workers = self.options['workers']
+
+        people = []
+        for i in range(self.shift_count):
+            talents = self.shift_talents(invites + applications + workers)
+            people.append((i, talents[:invites], talents[invites:invites + applications], talents[invites + applications:]))
+
+        self.create_links(ShiftInvite, (
+            ShiftInvite(shift_id=self.first_shift + i, employee_id=talent,
+                sender_id=self.first_employer_profile + i // per_employer,
+                status=self.random.choice(['PENDING', 'APPLIED', 'REJECTED']))
+            for i, invited, applied, working in people for talent in invited
+        ))
+        self.create_links(ShiftApplication, (
+            ShiftApplication(shift_id=self.first_shift + i, employee_id=talent)
+            for i, invited, applied, working in people for talent in applied
+        ))
+        self.create_links(ShiftEmployee, (
+            ShiftEmployee(shift_id=self.first_shift + i, employee_id=talent)
+            for i, invited, applied, working in people for talent in working
+        ))
+
+        def clockins():
+            for i, invited, applied, working in people:
+                starting_at, ending_at = self.shift_starts[i]
+                if ending_at > self.now:
+                    continue
+                for talent in working:
+                    yield Clockin(shift_id=self.first_shift + i, employee_id=talent,
+                        started_at=starting_at + datetime.timedelta(minutes=self.random.randint(-10, 15)),
+                        ended_at=ending_at + datetime.timedelta(minutes=self.random.randint(-15, 10)),
+                        status='PENDING')
+        self.create_links(Clockin, clockins())
+
+    def seed_daily_hours(self):
+        # bulk_create does not send post_save, the rollup the payroll screens read is built here
+        started = time.time()
+        employers = self.options['employers']
+        count = 0
+        for i in range(employers):
+            count += daily_hours_actions.rebuild_daily_hours(self.first_employer + i)
+        self.stdout.write('EmployeeDailyHours: {} rows in {:.1f}s'.format(count, time.time() - started))
+
+    def seed_periods(self):
+        employers = self.options['employers']
+        periods = self.options['periods']
+
+        def build_period(i):
+            starting_at = self.today - datetime.timedelta(weeks=periods - i % periods)
+            return PayrollPeriod(employer_id=self.first_employer + i // periods, length=7, length_type='DAYS',
+                status='PENDING', starting_at=starting_at, ending_at=starting_at + datetime.timedelta(days=7))
+        self.create(PayrollPeriod, employers * periods, build_period)
@@ -0,0 +1,22 @@
+import time
+from django.core.management.base import BaseCommand
+from api.utils import outbox
+
+class Command(BaseCommand):
+    help = 'Deliver the queued email and push notifications (NotificationOutbox)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Messages claimed on every iteration')
+        parser.add_argument('--concurrency', type=int, default=8, help='Messages delivered at the same time')
+        parser.add_argument('--sleep', type=float, default=2, help='Seconds to wait when there is nothing to send')
+        parser.add_argument('--once', action='store_true', help='Process the pending messages and exit')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = outbox.process_batch(batch_size=options['batch_size'], concurrency=options['concurrency'])
+            if sent or failed:
+                self.stdout.write('Notifications sent: {}, failed: {}'.format(sent, failed))
+            elif options['once']:
+                break
+            else:
+                time.sleep(options['sleep'])
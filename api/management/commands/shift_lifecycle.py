@@ -0,0 +1,19 @@
+import time
+from django.core.management.base import BaseCommand
+from api.actions import shift_actions
+
+class Command(BaseCommand):
+    help = 'Move the shifts to FILLED, EXPIRED or COMPLETED and expire their pending invites'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=shift_actions.LIFECYCLE_BATCH_SIZE, help='Shifts moved on every query')
+        parser.add_argument('--sleep', type=float, default=300, help='Seconds between runs')
+        parser.add_argument('--once', action='store_true', help='Update the shifts and exit')
+
+    def handle(self, *args, **options):
+        while True:
+            report = shift_actions.update_shift_statuses(batch_size=options['batch_size'])
+            self.stdout.write('Shifts filled: {filled}, expired: {expired}, completed: {completed}, invites expired: {invites} ({seconds}s)'.format(**report))
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
@@ -0,0 +1,97 @@
+# Generated by Django 2.0 on 2026-10-18 08:51
+
+import datetime
+from django.db import migrations, models
+from django.db.models import Case, When, Value
+from django.utils.timezone import utc
+
+BATCH_SIZE = 500
+
+# a copy of api.utils.geo at the time of this migration, later changes there don't change what it does
+GEOHASH_PRECISION = 6
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_interval = [-90.0, 90.0]
+    lng_interval = [-180.0, 180.0]
+    latitude = float(latitude)
+    longitude = float(longitude)
+
+    geohash = []
+    bits = [16, 8, 4, 2, 1]
+    bit = 0
+    ch = 0
+    even = True
+    while len(geohash) < precision:
+        if even:
+            mid = (lng_interval[0] + lng_interval[1]) / 2
+            if longitude > mid:
+                ch |= bits[bit]
+                lng_interval[0] = mid
+            else:
+                lng_interval[1] = mid
+        else:
+            mid = (lat_interval[0] + lat_interval[1]) / 2
+            if latitude > mid:
+                ch |= bits[bit]
+                lat_interval[0] = mid
+            else:
+                lat_interval[1] = mid
+        even = not even
+        if bit < 4:
+            bit += 1
+        else:
+            geohash.append(_BASE32[ch])
+            bit = 0
+            ch = 0
+
+    return ''.join(geohash)
+
+
+def has_location(latitude, longitude):
+    return latitude is not None and longitude is not None and (latitude != 0 or longitude != 0)
+
+
+def update_geohashes(Profile, geohashes):
+    Profile.objects.filter(id__in=geohashes.keys()).update(geohash=Case(
+        *[When(id=id, then=Value(geohash)) for id, geohash in geohashes.items()],
+        output_field=models.CharField()
+    ))
+
+
+def fill_profile_geohash(apps, schema_editor):
+    """
+    One UPDATE for every BATCH_SIZE profiles with a location
+    """
+    Profile = apps.get_model('api', 'Profile')
+    geohashes = {}
+    for id, latitude, longitude in Profile.objects.values_list('id', 'latitude', 'longitude').order_by('id').iterator():
+        if has_location(latitude, longitude):
+            geohashes[id] = encode_geohash(latitude, longitude)
+        if len(geohashes) == BATCH_SIZE:
+            update_geohashes(Profile, geohashes)
+            geohashes = {}
+    if len(geohashes) > 0:
+        update_geohashes(Profile, geohashes)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_auto_20190122_2107'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=12),
+        ),
+        migrations.AlterField(
+            model_name='employer',
+            name='payroll_period_starting_time',
+            field=models.DateTimeField(blank=True, default=datetime.datetime(2026, 10, 18, 0, 0, 0, 415431, tzinfo=utc)),
+        ),
+        migrations.RunPython(fill_profile_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.0 on 2026-10-18 09:00
+
+import datetime
+from django.db import migrations, models
+from django.utils.timezone import utc
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_auto_20261018_0852'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationoutbox',
+            name='recipient_data',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='employer',
+            name='payroll_period_starting_time',
+            field=models.DateTimeField(blank=True, default=datetime.datetime(2026, 10, 18, 0, 0, 0, 273176, tzinfo=utc)),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.0 on 2026-10-18 09:05
+
+import datetime
+from django.db import migrations, models
+from django.utils.timezone import utc
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_auto_20261018_0900'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employer',
+            name='payroll_period_starting_time',
+            field=models.DateTimeField(blank=True, default=datetime.datetime(2026, 10, 18, 0, 0, 0, 390036, tzinfo=utc)),
+        ),
+        migrations.AlterIndexTogether(
+            name='payrollperiod',
+            index_together={('employer', 'starting_at', 'id')},
+        ),
+        migrations.AlterIndexTogether(
+            name='shift',
+            index_together={('employer', 'starting_at', 'id')},
+        ),
+        migrations.AlterIndexTogether(
+            name='shiftinvite',
+            index_together={('employee', 'created_at', 'id')},
+        ),
+    ]
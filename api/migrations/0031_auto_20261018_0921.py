@@ -0,0 +1,51 @@
+# Generated by Django 2.0 on 2026-10-18 09:21
+
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.timezone import utc
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0030_auto_20261018_0905'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeDailyHours',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('clockins', models.IntegerField(default=0)),
+                ('hours', models.DecimalField(decimal_places=2, default=0, max_digits=8)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.Employee')),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='employer',
+            name='payroll_period_starting_time',
+            field=models.DateTimeField(blank=True, default=datetime.datetime(2026, 10, 18, 0, 0, 0, 231644, tzinfo=utc)),
+        ),
+        migrations.AddField(
+            model_name='employeedailyhours',
+            name='employer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.Employer'),
+        ),
+        migrations.AddField(
+            model_name='employeedailyhours',
+            name='shift',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.Shift'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='employeedailyhours',
+            unique_together={('employer', 'employee', 'shift', 'day')},
+        ),
+        migrations.AlterIndexTogether(
+            name='employeedailyhours',
+            index_together={('employer', 'day')},
+        ),
+    ]
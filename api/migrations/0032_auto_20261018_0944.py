@@ -0,0 +1,24 @@
+# Generated by Django 2.0 on 2026-10-18 09:44
+
+import datetime
+from django.db import migrations, models
+from django.utils.timezone import utc
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0031_auto_20261018_0921'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employer',
+            name='payroll_period_starting_time',
+            field=models.DateTimeField(blank=True, default=datetime.datetime(2026, 10, 18, 0, 0, 0, 282964, tzinfo=utc)),
+        ),
+        migrations.AlterIndexTogether(
+            name='clockin',
+            index_together={('ended_at', 'id')},
+        ),
+    ]
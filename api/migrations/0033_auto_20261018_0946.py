@@ -0,0 +1,36 @@
+# Generated by Django 2.0 on 2026-10-18 09:46
+
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.timezone import utc
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0032_auto_20261018_0944'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClockinSyncEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64)),
+                ('result', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('clockin', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='api.Clockin')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.Employee')),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='employer',
+            name='payroll_period_starting_time',
+            field=models.DateTimeField(blank=True, default=datetime.datetime(2026, 10, 18, 0, 0, 0, 845850, tzinfo=utc)),
+        ),
+        migrations.AlterUniqueTogether(
+            name='clockinsyncevent',
+            unique_together={('employee', 'key')},
+        ),
+    ]
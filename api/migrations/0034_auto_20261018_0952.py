@@ -0,0 +1,29 @@
+# Generated by Django 2.0 on 2026-10-18 09:52
+
+import datetime
+from django.db import migrations, models
+from django.utils.timezone import utc
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0033_auto_20261018_0946'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employer',
+            name='payroll_period_starting_time',
+            field=models.DateTimeField(blank=True, default=datetime.datetime(2026, 10, 18, 0, 0, 0, 112701, tzinfo=utc)),
+        ),
+        migrations.AlterField(
+            model_name='shiftinvite',
+            name='status',
+            field=models.CharField(blank=True, choices=[('PENDING', 'Pending'), ('APPLIED', 'Applied'), ('REJECTED', 'Rejected'), ('EXPIRED', 'Expired')], default='PENDING', max_length=9),
+        ),
+        migrations.AlterIndexTogether(
+            name='shift',
+            index_together={('employer', 'starting_at', 'id'), ('status', 'ending_at', 'id')},
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 2.0 on 2026-10-18 11:20
+
+import decimal
+from django.db import migrations
+from django.db.models import F, Sum, Count, DurationField, ExpressionWrapper
+from django.db.models.functions import TruncDate
+
+BATCH_SIZE = 500
+CENTS = decimal.Decimal('0.01')
+
+
+def backfill_daily_hours(apps, schema_editor):
+    """
+    The payroll projection only reads the rollup, build it from the closed
+    clockins that existed before it (same math as daily_hours_actions.build_daily_hours)
+    """
+    Clockin = apps.get_model('api', 'Clockin')
+    EmployeeDailyHours = apps.get_model('api', 'EmployeeDailyHours')
+
+    EmployeeDailyHours.objects.all().delete()
+    rows = Clockin.objects.filter(ended_at__isnull=False).annotate(day=TruncDate('started_at')).values(
+        'shift__employer_id', 'employee_id', 'shift_id', 'shift__minimum_hourly_rate', 'day'
+    ).annotate(
+        duration=Sum(ExpressionWrapper(F('ended_at') - F('started_at'), output_field=DurationField())),
+        total=Count('id')
+    ).order_by()
+
+    daily_hours = []
+    for row in rows.iterator():
+        hours = decimal.Decimal(row['duration'].total_seconds()) / 3600
+        daily_hours.append(EmployeeDailyHours(
+            employer_id=row['shift__employer_id'],
+            employee_id=row['employee_id'],
+            shift_id=row['shift_id'],
+            day=row['day'],
+            clockins=row['total'],
+            hours=hours.quantize(CENTS),
+            amount=(hours * row['shift__minimum_hourly_rate']).quantize(CENTS)
+        ))
+        if len(daily_hours) == BATCH_SIZE:
+            EmployeeDailyHours.objects.bulk_create(daily_hours)
+            daily_hours = []
+    EmployeeDailyHours.objects.bulk_create(daily_hours)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0034_auto_20261018_0952'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_daily_hours, migrations.RunPython.noop),
+    ]
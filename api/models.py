@@ -1,10 +1,11 @@
 from django.utils import timezone
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_save
 from django.contrib.postgres.fields import JSONField
 from django.dispatch import receiver
 from django.core.validators import RegexValidator
+from api.utils.geo import encode_geohash, has_location
 
 NOW = timezone.now()
 MIDNIGHT = NOW.replace(hour=0, minute=0, second=0)
@@ -114,6 +115,8 @@ class Profile(models.Model):
     zip_code = models.IntegerField(null=True, blank=True)
     latitude = models.DecimalField(max_digits=14, decimal_places=11, default=0)
     longitude = models.DecimalField(max_digits=14, decimal_places=11, default=0)
+    # kept in sync with latitude/longitude (see sync_profile_geohash), used to match talents near a venue
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True)
     
     birth_date = models.DateField(null=True, blank=True)
     phone_number = models.CharField(max_length=17, blank=True) # validators should be a list
@@ -129,6 +132,13 @@ class Profile(models.Model):
 
     def __str__(self):
         return self.user.username
+
+@receiver(pre_save, sender=Profile)
+def sync_profile_geohash(sender, instance, **kwargs):
+    if has_location(instance.latitude, instance.longitude):
+        instance.geohash = encode_geohash(instance.latitude, instance.longitude)
+    else:
+        instance.geohash = ''
         
 WEEKLY = 'WEEKLY'
 MONTHLY = 'MONTHLY'
@@ -248,6 +258,14 @@ class Shift(models.Model):
     # auto checkout after 15 min
     maximum_clockout_delay_minutes = models.IntegerField(blank=True, default=15, null=True)  # in minutes
 
+    class Meta:
+        # the shift lists are paginated by (starting_at, id)
+        index_together = [
+            ['employer', 'starting_at', 'id'],
+            # shifts that ended and still have to change status, see update_shift_statuses
+            ['status', 'ending_at', 'id'],
+        ]
+
     def __str__(self):
         return "{} at {} on {}".format(self.position, self.venue, self.starting_at)
         
@@ -272,6 +290,7 @@ SHIFT_INVITE_STATUS_CHOICES = (
     (PENDING, 'Pending'),
     (APPLIED, 'Applied'),
     (REJECTED, 'Rejected'),
+    (EXPIRED, 'Expired'),
 )
 class ShiftInvite(models.Model):
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE, blank=True)
@@ -285,6 +304,12 @@ class ShiftInvite(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, editable=False)
     updated_at = models.DateTimeField(auto_now=True, editable=False)
 
+    class Meta:
+        # the invite lists are paginated by (created_at, id)
+        index_together = [
+            ['employee', 'created_at', 'id'],
+        ]
+
 PENDING = 'PENDING'
 ACCEPTED = 'ACCEPTED'
 JOBCORE_INVITE_STATUS_CHOICES = (
@@ -365,7 +390,54 @@ class Clockin(models.Model):
         max_length=9,
         choices=CLOCKIN_STATUS,
         default=PENDING)
+
+    class Meta:
+        index_together = [
+            # open clockins (ended_at is null) in id order, see close_overdue_clockins
+            ['ended_at', 'id'],
+        ]
         
+class ClockinSyncEvent(models.Model):
+    """
+    Clock ins and outs already applied by the batch sync (employees/me/clockins/sync),
+    the key is generated by the phone so a retried event is not applied twice
+    """
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE)
+    key = models.CharField(max_length=64)
+    clockin = models.ForeignKey(Clockin, on_delete=models.SET_NULL, blank=True, null=True)
+    # what the sync answered the first time (json)
+    result = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True, editable=False)
+
+    class Meta:
+        unique_together = [
+            ['employee', 'key'],
+        ]
+
+class EmployeeDailyHours(models.Model):
+    """
+    Hours worked by a talent on a shift, per day (the day the clockin started).
+    It is a rollup of the closed clockins so the payroll screens don't add them up on every request
+    """
+    employer = models.ForeignKey(Employer, on_delete=models.CASCADE)
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE)
+    shift = models.ForeignKey(Shift, on_delete=models.CASCADE)
+    day = models.DateField()
+    clockins = models.IntegerField(default=0)
+    hours = models.DecimalField(max_digits=8, decimal_places=2, default=0)
+    amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True, editable=False)
+
+    class Meta:
+        unique_together = [
+            ['employer', 'employee', 'shift', 'day'],
+        ]
+        index_together = [
+            ['employer', 'day'],
+        ]
+
 FINALIZED = 'FINALIZED'
 OPEN = 'OPEN'
 PERIOD_STATUS = (
@@ -390,6 +462,11 @@ class PayrollPeriod(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True, editable=False)
     updated_at = models.DateTimeField(auto_now=True, editable=False)
+
+    class Meta:
+        index_together = [
+            ['employer', 'starting_at', 'id'],
+        ]
     
 PENDING = 'PENDING'
 PAID = 'PAID'
@@ -417,4 +494,52 @@ class PayrollPeriodPayment(models.Model):
         max_digits=3, decimal_places=1, default=0, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True, editable=False)
-    updated_at = models.DateTimeField(auto_now=True, editable=False)
\ No newline at end of file
+    updated_at = models.DateTimeField(auto_now=True, editable=False)
+
+OUTBOX_EMAIL = 'EMAIL'
+OUTBOX_PUSH = 'PUSH'
+OUTBOX_CHANNELS = (
+    (OUTBOX_EMAIL, 'Email'),
+    (OUTBOX_PUSH, 'Push notification'),
+)
+OUTBOX_PENDING = 'PENDING'
+OUTBOX_PROCESSING = 'PROCESSING'
+OUTBOX_SENT = 'SENT'
+OUTBOX_FAILED = 'FAILED'
+OUTBOX_STATUS = (
+    (OUTBOX_PENDING, 'Pending'),
+    (OUTBOX_PROCESSING, 'Processing'),
+    (OUTBOX_SENT, 'Sent'),
+    (OUTBOX_FAILED, 'Failed'),
+)
+class NotificationOutbox(models.Model):
+    channel = models.CharField(
+        max_length=5,
+        choices=OUTBOX_CHANNELS,
+        default=OUTBOX_EMAIL)
+    slug = models.CharField(max_length=50)
+    
+    # emails are sent to an address, push notifications to all the user devices
+    email = models.TextField(max_length=100, blank=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, blank=True, null=True)
+    data = models.TextField(blank=True)
+    # values that change on every recipient of a batch email (%recipient.KEY%)
+    recipient_data = models.TextField(blank=True)
+    
+    status = models.CharField(
+        max_length=10,
+        choices=OUTBOX_STATUS,
+        default=OUTBOX_PENDING)
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True, editable=False)
+
+    class Meta:
+        index_together = [
+            ['status', 'available_at'],
+        ]
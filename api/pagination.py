@@ -1,4 +1,111 @@
+import json
+import datetime
+from base64 import b64encode, b64decode
+from collections import OrderedDict
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+def keyset_filter(ordering, values):
+    """
+    Rows that come after the given values on the ordering, e.g: for (starting_at, id)
+    starting_at > x OR (starting_at = x AND id > y)
+    """
+    condition = None
+    for i, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = name + ('__lt' if field.startswith('-') else '__gt')
+        after = Q(**{lookup: values[i]})
+        for previous, value in zip(ordering[:i], values[:i]):
+            after &= Q(**{previous.lstrip('-'): value})
+        condition = after if condition is None else condition | after
+    return condition
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a stable ordering that ends with the primary key,
+    the cursor carries the values of the last row so every page is a simple
+    index range (deep pages cost the same as the first one)
+    """
+    ordering = ('created_at', 'id')
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            values = self.decode_cursor(encoded, queryset.model)
+            queryset = queryset.filter(keyset_filter(self.ordering, values))
+
+        # one extra row tells us if there is a next page
+        results = list(queryset[:self.page_size + 1])
+        self.next_cursor = None
+        if len(results) > self.page_size:
+            results = results[:self.page_size]
+            self.next_cursor = self.encode_cursor(results[-1])
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def encode_cursor(self, instance):
+        values = [getattr(instance, field.lstrip('-')) for field in self.ordering]
+        # DjangoJSONEncoder drops the microseconds, the cursor needs the exact value
+        values = [value.isoformat() if isinstance(value, datetime.datetime) else value for value in values]
+        return b64encode(json.dumps(values, cls=DjangoJSONEncoder).encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, encoded, model):
+        try:
+            values = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError(self.invalid_cursor_message)
+            return [model._meta.get_field(field.lstrip('-')).to_python(value) for field, value in zip(self.ordering, values)]
+        except (TypeError, ValueError, UnicodeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('cursor', self.next_cursor),
+            ('results', data)
+        ]))
+
+class StartingAtPagination(KeysetPagination):
+    """
+    Shifts and payroll periods are listed in chronological order
+    """
+    ordering = ('starting_at', 'id')
+
 class CustomPagination(object):
+    """
+    Pagination for APIView classes, the views call paginate_queryset and
+    get_paginated_response the same way the generic views do
+    """
+    pagination_class = KeysetPagination
 
     @property
     def paginator(self):
@@ -12,20 +119,20 @@ class CustomPagination(object):
                 self._paginator = self.pagination_class()
         return self._paginator
 
-        def paginate_queryset(self, queryset):
-            """
-            Return a single page of results, or `None` if pagination
-            is disabled.
-            """
-            if self.paginator is None:
-                return None
-            return self.paginator.paginate_queryset(
-                queryset, self.request, view=self)
-
-        def get_paginated_response(self, data):
-            """
-            Return a paginated style `Response` object for the given
-            output data.
-            """
-            assert self.paginator is not None
-            return self.paginator.get_paginated_response(data)
+    def paginate_queryset(self, queryset):
+        """
+        Return a single page of results, or `None` if pagination
+        is disabled.
+        """
+        if self.paginator is None:
+            return None
+        return self.paginator.paginate_queryset(
+            queryset, self.request, view=self)
+
+    def get_paginated_response(self, data):
+        """
+        Return a paginated style `Response` object for the given
+        output data.
+        """
+        assert self.paginator is not None
+        return self.paginator.get_paginated_response(data)
@@ -3,7 +3,7 @@ from api.serializers import shift_serializer, employee_serializer
 from rest_framework import serializers
 from django.db.models import Q
 from api.models import Clockin
-from api.utils.utils import haversine
+from api.actions import clockin_actions
 from django.utils import timezone
 import datetime
 NOW = timezone.now()
@@ -12,6 +12,13 @@ class ClockinSerializer(serializers.ModelSerializer):
     class Meta:
         model = Clockin
         exclude = ()
+
+    def __init__(self, *args, **kwargs):
+        super(ClockinSerializer, self).__init__(*args, **kwargs)
+        # the shift comes with its employer and the clockin state of the talent in the same query
+        employee_id = getattr(self, 'initial_data', {}).get('employee')
+        if employee_id:
+            self.fields['shift'].queryset = clockin_actions.clockin_shifts(employee_id)
         
     def validate(self, data):
         # @todo: you need to be part of the shift to be able to clockin or clockout
@@ -19,18 +26,18 @@ class ClockinSerializer(serializers.ModelSerializer):
             if 'latitude_in' not in data or 'longitude_in' not in data:
                 raise serializers.ValidationError("You need to specify latitude_in,longitude_in")
             else:
-                distance = haversine(data['latitude_in'], data['longitude_in'], data["shift"].venue.latitude, data["shift"].venue.longitude)
-                if distance > 0.1: # 0.1 miles
-                    raise serializers.ValidationError("You need to be 0.1 miles near "+data["shift"].venue.title+" to clock in and right now your are at "+str(distance)+" miles")
+                distance = clockin_actions.distance_to_venue(data["shift"].venue_id, data['latitude_in'], data['longitude_in'])
+                if distance > clockin_actions.CLOCKIN_DISTANCE_MILES:
+                    raise serializers.ValidationError("You need to be 0.1 miles near "+clockin_actions.get_venue(data["shift"].venue_id)[3]+" to clock in and right now your are at "+str(round(distance, 2))+" miles")
     
             # previous clockin opened
-            clockins = Clockin.objects.filter(ended_at=None, employee=data["employee"])
-            if len(clockins) > 0:
+            if getattr(data["shift"], 'has_open_clockin', None) is None:
+                data["shift"] = clockin_actions.clockin_shifts(data["employee"].id).get(id=data["shift"].id)
+            if data["shift"].has_open_clockin:
                 raise serializers.ValidationError("You need to clock out first from all your previous shifts before attempting to clockin again")
             
             try:
-                clockins = Clockin.objects.filter(shift__id=data["shift"].id, employee__id=data["employee"].id)
-                validate_clock_in(data["shift"].starting_at, data["shift"].ending_at, data["shift"].employer.maximum_clockin_delta_minutes, is_first_clockin=(len(clockins) == 0))
+                validate_clock_in(data["shift"].starting_at, data["shift"].ending_at, data["shift"].employer.maximum_clockin_delta_minutes, is_first_clockin=not data["shift"].has_shift_clockin)
             except ValueError as e:
                 raise serializers.ValidationError(str(e))
 
@@ -50,9 +57,9 @@ class ClockinSerializer(serializers.ModelSerializer):
             if 'latitude_out' not in data or 'longitude_out' not in data:
                 raise serializers.ValidationError("You need to specify latitude_out,longitude_out")
             else:
-                distance = haversine(data['latitude_out'], data['longitude_out'], data["shift"].venue.latitude, data["shift"].venue.longitude)
-                if distance > 0.1: # 0.1 miles
-                    raise serializers.ValidationError("You need to be 0.1 miles near "+data["shift"].venue.title+" to clock out and right now your are at "+str(distance)+" miles")
+                distance = clockin_actions.distance_to_venue(data["shift"].venue_id, data['latitude_out'], data['longitude_out'])
+                if distance > clockin_actions.CLOCKIN_DISTANCE_MILES:
+                    raise serializers.ValidationError("You need to be 0.1 miles near "+clockin_actions.get_venue(data["shift"].venue_id)[3]+" to clock out and right now your are at "+str(round(distance, 2))+" miles")
         elif 'ended_at' in request.data:
 
             try:
@@ -105,10 +112,59 @@ class ClockinPayrollSerializer(serializers.ModelSerializer):
                 
         return data
 
+class ClockinTimesheetSerializer(serializers.Serializer):
+    """
+    One row of a timesheet edit, the relations are plain ids so a whole
+    timesheet is validated without queries (they are checked in bulk later)
+    """
+    id = serializers.IntegerField(required=False)
+    employee = serializers.IntegerField(required=False)
+    shift = serializers.IntegerField(required=False)
+    started_at = serializers.DateTimeField(required=False)
+    ended_at = serializers.DateTimeField(required=False, allow_null=True)
+    status = serializers.ChoiceField(choices=Clockin._meta.get_field('status').choices, required=False)
+
+    def validate(self, data):
+
+        if 'id' not in data:
+            if 'employee' not in data or 'shift' not in data or 'started_at' not in data:
+                raise serializers.ValidationError("New clockins need the employee, shift and started_at")
+        elif len(data) == 1:
+            raise serializers.ValidationError("You need to specify what to change on the clockin")
+
+        if data.get('started_at') is not None and data.get('ended_at') is not None and data['ended_at'] < data['started_at']:
+            raise serializers.ValidationError("The clockin can't end before it started")
+
+        return data
+
+# how far ahead of the server the clock of a phone can be
+CLOCK_SKEW = datetime.timedelta(minutes=5)
+# how long a phone can keep its clock ins and outs before syncing them
+OFFLINE_WINDOW = datetime.timedelta(hours=48)
 
+class ClockEventSerializer(serializers.Serializer):
+    """
+    One event of the offline sync, at is the time on the phone when it happened
+    and the key is generated by the phone (the same on every retry)
+    """
+    key = serializers.CharField(max_length=64)
+    type = serializers.ChoiceField(choices=['in', 'out'])
+    shift = serializers.IntegerField()
+    at = serializers.DateTimeField()
+    latitude = serializers.FloatField()
+    longitude = serializers.FloatField()
+
+    def validate_at(self, value):
+        now = timezone.now()
+        if value > now + CLOCK_SKEW:
+            raise serializers.ValidationError("The event can't happen in the future")
+        if value < now - OFFLINE_WINDOW:
+            raise serializers.ValidationError("Events older than "+str(int(OFFLINE_WINDOW.total_seconds() // 3600))+" hours can't be synced")
+        return value
     
-def validate_clock_in(started_at, ended_at, maximum_clockin_delta_minutes=None, is_first_clockin=True):
-    now = timezone.now()
+def validate_clock_in(started_at, ended_at, maximum_clockin_delta_minutes=None, is_first_clockin=True, now=None):
+    if now is None:
+        now = timezone.now()
     
     if now > ended_at:
         raise ValueError("You can't Clock In after the Shift ending time")
@@ -1,5 +1,6 @@
 from api.serializers import other_serializer, favlist_serializer
 from rest_framework import serializers
+from api.utils.query_plan import QueryPlanMixin
 from api.models import Employee, Profile, User, FavoriteList
 
 #
@@ -26,7 +27,7 @@ class EmployeeGetTinySerializer(serializers.ModelSerializer):
         model = Employee
         exclude = ()
         
-class EmployeeGetSmallSerializer(serializers.ModelSerializer):
+class EmployeeGetSmallSerializer(QueryPlanMixin, serializers.ModelSerializer):
     user = UserGetSmallSerializer(many=False)
     favoritelist_set = favlist_serializer.FavoriteListSerializer(many=True)
     class Meta:
@@ -1,11 +1,11 @@
 import datetime
-import itertools
-import decimal
-from django.db.models import Q
+from django.db.models import F, Sum, Count, DurationField, ExpressionWrapper
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 from rest_framework import serializers
-from api.models import Clockin, Employer, Shift, Position, Employee, PayrollPeriod, PayrollPeriodPayment, User
-NOW = timezone.now()
+from api.utils.query_plan import QueryPlanMixin
+from api.actions import payroll_actions
+from api.models import Clockin, EmployeeDailyHours, Employer, Shift, Position, Employee, PayrollPeriod, PayrollPeriodPayment, User
 
 #
 # NESTED
@@ -39,7 +39,7 @@ class EmployeeGetTinySerializer(serializers.ModelSerializer):
         model = Employee
         fields = ('user','id')
 
-class ClockinGetSerializer(serializers.ModelSerializer):
+class ClockinGetSerializer(QueryPlanMixin, serializers.ModelSerializer):
     shift = ShiftGetSmallSerializer()
     employee = EmployeeGetTinySerializer()
     #author = serializers.IntegerField()
@@ -63,7 +63,7 @@ class PayrollPeriodPaymentGetSerializer(serializers.ModelSerializer):
         model = PayrollPeriodPayment
         exclude = ()
         
-class PayrollPeriodGetSerializer(serializers.ModelSerializer):
+class PayrollPeriodGetSerializer(QueryPlanMixin, serializers.ModelSerializer):
     payments = PayrollPeriodPaymentGetSerializer(read_only=True, many=True)
     employer = EmployerGetSmallSerializer(read_only=True)
     
@@ -81,111 +81,98 @@ class PayrollPeriodSerializer(serializers.ModelSerializer):
         model = PayrollPeriod
         exclude = ()
         
+def projected_totals(clockins):
+    """
+    Hours, amount and number of clockins per day, computed by the database.
+    The rows are grouped by day and hourly rate so the amount is just hours * rate
+    """
+    rows = clockins.annotate(day=TruncDate('started_at')).values('day', 'shift__minimum_hourly_rate').annotate(
+        duration=Sum(ExpressionWrapper(F('ended_at') - F('started_at'), output_field=DurationField())),
+        total=Count('id')
+    ).order_by('day')
+
+    days = {}
+    for row in rows:
+        day = days.setdefault(row['day'].strftime("%Y-%m-%d"), { "clockins": 0, "hours": 0, "amount": 0 })
+        hours = row['duration'].total_seconds() / 3600
+        day["clockins"] += row['total']
+        day["hours"] = round(day["hours"] + hours, 2)
+        day["amount"] = round(day["amount"] + hours * float(row['shift__minimum_hourly_rate']), 2)
+    return days
+
+def daily_hours_totals(employer_id, start_date, talent_id=None, period_length=7):
+    """
+    Same totals as projected_totals but read from the daily hours rollup (one range scan)
+    """
+    first_day = timezone.localtime(start_date).date()
+    rows = EmployeeDailyHours.objects.filter(employer_id=employer_id, day__gte=first_day, day__lt=first_day + timezone.timedelta(days=period_length))
+    if talent_id is not None:
+        rows = rows.filter(employee_id=talent_id)
+    rows = rows.values('day').annotate(total=Sum('clockins'), worked=Sum('hours'), paid=Sum('amount')).order_by('day')
+
+    return { row['day'].strftime("%Y-%m-%d"): {
+        "clockins": row['total'],
+        "hours": round(float(row['worked']), 2),
+        "amount": round(float(row['paid']), 2)
+    } for row in rows }
+
+def get_projection_clockins(employer_id, start_date, talent_id=None, period_length=7):
+    """
+    (clockins inside the period, clockins that started before the end of the period and finished after it)
+    """
+    end_date = start_date + timezone.timedelta(days=period_length)
+    clockins = Clockin.objects.filter(shift__employer__id=employer_id)
+    if talent_id is not None:
+        clockins = clockins.filter(employee__id=talent_id)
+
+    normal_clockins = clockins.filter(ended_at__lte=end_date, started_at__gte=start_date)
+    clockins_in_between_periods = clockins.filter(ended_at__gte=end_date, started_at__lte=end_date)
+    return normal_clockins, clockins_in_between_periods
+
 def get_projected_payments(employer_id, start_date, talent_id=None, period_length=7, period_type='DAYS'):
 
     if period_type != 'DAYS':
         raise serializers.ValidationError('The only supported period type is DAYS for now')
-        
-    end_date = start_date + timezone.timedelta(days=period_length)
-    normal_clockins = Clockin.objects.filter(shift__employer__id=employer_id,ended_at__lte=end_date, started_at__gte=start_date)
-    if talent_id is not None:
-        normal_clockins = normal_clockins.filter(employee__id=talent_id)
-    grouped = itertools.groupby(normal_clockins, lambda record: record.started_at.strftime("%Y-%m-%d"))
-    clockins_by_day = [{ "date": day, "clockins": list(clockins_this_day)} for day, clockins_this_day in grouped]
+
+    normal_clockins, clockins_in_between_periods = get_projection_clockins(employer_id, start_date, talent_id, period_length)
 
     result = {}
     for i in range(period_length):
-        result[(start_date + timezone.timedelta(days=i)).strftime("%Y-%m-%d")] = {}
-    
-    for date in clockins_by_day:
-        result[date['date']] = { 
-            "clockins": [ClockinGetSerializer(clockin).data for clockin in date['clockins']],
-            "between_periods": []
-        }
-        
-    clockins_in_between_periods = Clockin.objects.filter(ended_at__gte=end_date, started_at__lte=end_date)
-    if talent_id is not None:
-        normal_clockins = clockins_in_between_periods.filter(employee__id=talent_id)
-    for clockin in clockins_in_between_periods:
-        date = clockin.started_at.strftime("%Y-%m-%d")
-        if date not in result:
-            result[date] = {
-                "clockins": [],
-                "between_periods": []
-            }
-        result[date]["between_periods"].append(ClockinGetSerializer(clockin).data)
-    
+        result[(start_date + timezone.timedelta(days=i)).strftime("%Y-%m-%d")] = { "clockins": 0, "hours": 0, "amount": 0 }
+    daily_totals = daily_hours_totals(employer_id, start_date, talent_id, period_length)
+    result.update(daily_totals)
+
+    for date, totals in result.items():
+        totals["between_periods"] = { "clockins": 0, "hours": 0, "amount": 0 }
+    for date, totals in projected_totals(clockins_in_between_periods).items():
+        day = result.setdefault(date, { "clockins": 0, "hours": 0, "amount": 0 })
+        day["between_periods"] = totals
+        # the rollup has them on the day they started, they only count between periods
+        if date in daily_totals:
+            day["clockins"] -= totals["clockins"]
+            day["hours"] = round(day["hours"] - totals["hours"], 2)
+            day["amount"] = round(day["amount"] - totals["amount"], 2)
+
     return result
-    
+
+def get_projected_clockins(employer_id, day, talent_id=None):
+    """
+    Detailed clockins of one day of the projection, only loaded when the day is opened
+    """
+    start_date = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+    clockins = Clockin.objects.filter(shift__employer__id=employer_id, ended_at__isnull=False,
+        started_at__gte=start_date, started_at__lt=start_date + timezone.timedelta(days=1))
+    if talent_id is not None:
+        clockins = clockins.filter(employee__id=talent_id)
+    return ClockinGetSerializer(clockins.order_by('started_at', 'id'), many=True).data
+
 def generate_period_periods(employer):
 
     if employer.payroll_period_type != 'DAYS':
         raise serializers.ValidationError('The only supported period type is DAYS (for now)')
     
-    h_hour = employer.payroll_period_starting_time.hour
-    m_hour = employer.payroll_period_starting_time.minute
-    s_hour = employer.payroll_period_starting_time.second
-    payments = PayrollPeriod.objects.filter(employer__id=employer.id).order_by('-starting_at')
-    
-    #if there is a previous period we generate from there, if not we generate since the company joined jobcore
-    last_period_ending_date = payments[0].ending_at  if len(payments) > 0 else (employer.created_at.replace(hour=h_hour, minute=m_hour, second=s_hour) - datetime.timedelta(seconds=1))
-    end_date = last_period_ending_date + datetime.timedelta(days=employer.payroll_period_length)
-    
-    generated_periods = []
-    while end_date < NOW:
-        start_date = end_date - datetime.timedelta(days=employer.payroll_period_length) + datetime.timedelta(seconds=1)
-        period = PayrollPeriod(
-            starting_at = start_date,
-            ending_at = end_date,
-            employer = employer,
-            length = employer.payroll_period_length,
-            length_type = employer.payroll_period_type
-        )
-        period.save()
-    
-        # move the end_date forward to make sture the loop stops eventually
-        end_date = end_date + datetime.timedelta(days=employer.payroll_period_length)
-        
-        try:
-            all_clockins = Clockin.objects.filter(
-                (Q(started_at__gte=period.starting_at) & Q(started_at__lte=period.ending_at)) | (Q(ended_at__gte=period.starting_at) & Q(ended_at__gte=period.ending_at)),
-                shift__employer__id=employer.id
-            )
-            for clockin in all_clockins:
-                # the payment needs to be inside the payment period
-                starting_time = clockin.started_at if clockin.started_at > period.starting_at else period.starting_at
-                ending_time = clockin.ended_at if clockin.ended_at < period.ending_at else period.ending_at
-                total_hours = (ending_time - starting_time).total_seconds() / 3600;
-                
-                # the projected payment varies depending on the payment period
-                projected_starting_time = clockin.shift.starting_at if clockin.shift.starting_at > period.starting_at else period.starting_at
-                projected_ending_time = clockin.shift.ending_at if clockin.shift.ending_at < period.ending_at else period.ending_at
-                projected_hours = (projected_ending_time - projected_starting_time).total_seconds() / 3600;
-                
-                payment = PayrollPeriodPayment(
-                    paryroll_period = period,
-                    employee = clockin.employee,
-                    shift = clockin.shift,
-                    regular_hours = total_hours,
-                    over_time = (total_hours - projected_hours) if (total_hours > projected_hours) else 0,
-                    hourly_rate = clockin.shift.minimum_hourly_rate,
-                    total_amount = clockin.shift.minimum_hourly_rate * decimal.Decimal(total_hours),
-                    splited_payment = False if clockin.started_at == starting_time and ending_time == clockin.ended_at else True
-                )
-                payment.save()
-                
-            if len(all_clockins) == 0:
-                period.delete()
-            else:
-                generated_periods.append(period)
-        
-        except Exception as e:
-            PayrollPeriodPayment.filter(paryroll_period__id = period.id).delete()
-            generated_periods = []
-            period.delete()
-            raise e
-    
-    return generated_periods
+    periods, report = payroll_actions.generate_periods(employer)
+    return periods
 
 def get_employee_payments(talent_id=None, start_date=None, employer_id=None, period_length=7, period_type='DAYS'):
 
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from api.utils.query_plan import QueryPlanMixin
 from api.serializers import profile_serializer
 from api.utils import notifier
 from api.models import Position, Rate, Employer, Shift, Employee, Clockin, Venue
@@ -29,7 +30,7 @@ class ShiftGetSmallSerializer(serializers.ModelSerializer):
 # MAIN
 #
         
-class RatingGetSerializer(serializers.ModelSerializer):
+class RatingGetSerializer(QueryPlanMixin, serializers.ModelSerializer):
     shift = ShiftGetSmallSerializer(read_only=True)
     
     class Meta:
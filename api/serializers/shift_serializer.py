@@ -4,6 +4,9 @@ from datetime import datetime
 from api.serializers import other_serializer, venue_serializer, employer_serializer, employee_serializer, favlist_serializer
 from rest_framework import serializers
 from api.utils import notifier
+from api.actions import invite_actions, roster_actions, shift_actions
+from api.utils.query_plan import QueryPlanMixin
+from django.db import transaction
 from django.db.models import Q
 from api.models import Shift, ShiftInvite, ShiftApplication, Employee, Employer, ShiftEmployee, Position, Venue,User,Profile
 
@@ -150,6 +153,8 @@ class ShiftCandidatesAndEmployeesSerializer(serializers.ModelSerializer):
             
         return data
 
+    # the candidates are not saved if the employees don't fit the shift
+    @transaction.atomic
     def update(self, shift, validated_data):
         # Sync candidates
         if 'candidates' in validated_data:
@@ -157,7 +162,10 @@ class ShiftCandidatesAndEmployeesSerializer(serializers.ModelSerializer):
             validated_data.pop('candidates')
         # Sync employees
         if 'employees' in validated_data:
-            talents_to_notify = update_shift_employees(shift, validated_data['employees'])
+            try:
+                talents_to_notify = update_shift_employees(shift, validated_data['employees'])
+            except ValueError as e:
+                raise serializers.ValidationError(str(e))
             notifier.notify_shift_candidate_update(user=self.context['request'].user, shift=shift, talents_to_notify=talents_to_notify)
             validated_data.pop('employees')
             
@@ -175,14 +183,43 @@ class ShiftPostSerializer(serializers.ModelSerializer):
         shift.status = "OPEN"
         shift.save()
 
-        talents = notifier.get_talents_to_notify(shift)
-        for talent in talents:
-            invite = ShiftInvite(employee=talent, sender=self.context['request'].user.profile, shift=shift)
-            invite.save()
-            notifier.notify_single_shift_invite(invite)
+        talents = notifier.get_talents_to_notify(shift).select_related('user')
+        invites = invite_actions.create_shift_invites(shift, self.context['request'].user.profile, talents)
+        notifier.notify_shift_invites(invites)
 
         return shift
 
+class ShiftRepeatSerializer(serializers.Serializer):
+    """
+    How a shift repeats: every interval days or weeks (on some weekdays, 0 is monday)
+    count times or until a date
+    """
+    frequency = serializers.ChoiceField(choices=list(shift_actions.SERIES_FREQUENCIES))
+    interval = serializers.IntegerField(min_value=1, default=1)
+    count = serializers.IntegerField(min_value=1, max_value=shift_actions.MAXIMUM_SERIES_SHIFTS, required=False)
+    until = serializers.DateTimeField(required=False)
+    weekdays = serializers.ListField(child=serializers.IntegerField(min_value=0, max_value=6), required=False)
+
+    def validate(self, data):
+        if 'count' not in data and 'until' not in data:
+            raise serializers.ValidationError('The shift needs to repeat a number of times (count) or until a date')
+        return data
+
+class ShiftSeriesSerializer(ShiftPostSerializer):
+    repeat = ShiftRepeatSerializer(write_only=True)
+
+    def validate(self, data):
+        # count is limited by its field, until can be any date
+        occurrences = shift_actions.series_occurrences(data['starting_at'], data['ending_at'], **data['repeat'],
+            limit=shift_actions.MAXIMUM_SERIES_SHIFTS + 1)
+        if len(occurrences) > shift_actions.MAXIMUM_SERIES_SHIFTS:
+            raise serializers.ValidationError({ "repeat": 'A series can have up to '+str(shift_actions.MAXIMUM_SERIES_SHIFTS)+' shifts' })
+        return data
+
+    def create(self, validated_data):
+        repeat = validated_data.pop('repeat')
+        return shift_actions.create_shift_series(validated_data, repeat, self.context['request'].user.profile)
+
 class ShiftGetSmallSerializer(serializers.ModelSerializer):
     venue = VenueGetSmallSerializer(read_only=True)
     position = PositionGetSmallSerializer(read_only=True)
@@ -193,7 +230,7 @@ class ShiftGetSmallSerializer(serializers.ModelSerializer):
         exclude = ('maximum_allowed_employees','minimum_allowed_rating', 'allowed_from_list','required_badges','candidates','employees',
         'rating','application_restriction','updated_at')
 
-class ShiftGetSerializer(serializers.ModelSerializer):
+class ShiftGetSerializer(QueryPlanMixin, serializers.ModelSerializer):
     venue = VenueGetSmallSerializer(read_only=True)
     position = PositionGetSmallSerializer(read_only=True)
     candidates = employee_serializer.EmployeeGetSerializer(many=True, read_only=True)
@@ -262,7 +299,7 @@ class ShiftCreateInviteSerializer(serializers.ModelSerializer):
         
         return invite
 
-class ShiftInviteGetSerializer(serializers.ModelSerializer):
+class ShiftInviteGetSerializer(QueryPlanMixin, serializers.ModelSerializer):
     shift = ShiftGetSmallSerializer(many=False, read_only=True)
     employee = EmployeeGetSmallSerializer(read_only=True)
     class Meta:
@@ -337,28 +374,8 @@ class ApplicantGetSmallSerializer(serializers.ModelSerializer):
 # REUSABLE FUNCTIONS
 ##
 def update_shift_employees(shift, updated_employees):
-    talents_to_notify = { "accepted": [], "rejected": [] }
-    current_employees = shift.employees.all()
-    new_employees = Employee.objects.filter(id__in=updated_employees)
-    for employee in current_employees:
-        if employee not in new_employees:
-            talents_to_notify["rejected"].append(employee)
-            ShiftEmployee.objects.filter(employee__id=employee.id, shift__id=shift.id).delete()
-    for employee in new_employees:
-        if employee not in current_employees:
-            talents_to_notify["accepted"].append(employee)
-            ShiftEmployee.objects.create(employee=employee, shift=shift)
-    
-    return talents_to_notify
+    return roster_actions.sync_shift_employees(shift, updated_employees)
 
 def update_shift_candidates(shift, updated_candidates):
-    current_candidates = shift.candidates.all()
-    new_candidates = Employee.objects.filter(id__in=updated_candidates)
-    for employee in current_candidates:
-        if employee not in new_candidates:
-            ShiftApplication.objects.filter(employee__id=employee.id, shift__id=shift.id).delete()
-    for employee in new_candidates:
-        if employee not in current_candidates:
-            ShiftApplication.objects.create(employee=employee, shift=shift)
-    
+    roster_actions.sync_shift_candidates(shift, updated_candidates)
     return None
\ No newline at end of file
@@ -0,0 +1,151 @@
+import datetime
+from django.test import TestCase
+from django.utils import timezone
+from mixer.backend.django import mixer
+from api.models import Clockin, EmployeeDailyHours
+from api.actions import clockin_actions, clock_sync_actions
+
+class ClockSyncActionsTestSuite(TestCase):
+    """
+    Tests for the sync of the clock ins and outs recorded offline
+    """
+
+    def setUp(self):
+        clockin_actions._venues.clear()
+        self.now = timezone.now()
+        self.venue = mixer.blend('api.Venue', title='Bayside', latitude=25.7617, longitude=-80.1918)
+        self.shift = mixer.blend('api.Shift', venue=self.venue, employer=mixer.blend('api.Employer', maximum_clockin_delta_minutes=None),
+            starting_at=self.now - datetime.timedelta(hours=4), ending_at=self.now + datetime.timedelta(hours=1))
+        self.employee = mixer.blend('api.Employee', user=mixer.blend('auth.User'))
+
+    def _event(self, key, type, hours_ago, latitude=25.7617, shift=None):
+        return {
+            "key": key,
+            "type": type,
+            "shift": shift or self.shift.id,
+            "at": (self.now - datetime.timedelta(hours=hours_ago)).isoformat(),
+            "latitude": latitude,
+            "longitude": -80.1918
+        }
+
+    def test_in_and_out(self):
+        """
+        A clock in and its clock out on the same batch create one closed clockin and its daily hours
+        """
+        results = clock_sync_actions.sync_clock_events(self.employee, [self._event('a', 'in', 3), self._event('b', 'out', 1)])
+
+        self.assertEqual([result['status'] for result in results], ['applied', 'applied'])
+        clockin = Clockin.objects.get(employee=self.employee)
+        self.assertEqual(results[0]['clockin'], clockin.id)
+        self.assertEqual(clockin.started_at, self.now - datetime.timedelta(hours=3))
+        self.assertEqual(clockin.ended_at, self.now - datetime.timedelta(hours=1))
+        self.assertEqual(EmployeeDailyHours.objects.filter(employee=self.employee).count(), 1)
+
+    def test_retry_is_duplicate(self):
+        """
+        Sending the same events again doesn't create anything and answers with the first result
+        """
+        events = [self._event('a', 'in', 3), self._event('b', 'out', 1)]
+        first = clock_sync_actions.sync_clock_events(self.employee, events)
+
+        second = clock_sync_actions.sync_clock_events(self.employee, events)
+
+        self.assertEqual([result['status'] for result in second], ['duplicate', 'duplicate'])
+        self.assertEqual(second[0]['clockin'], first[0]['clockin'])
+        self.assertEqual(Clockin.objects.filter(employee=self.employee).count(), 1)
+
+    def test_out_of_previous_sync(self):
+        """
+        A clock out closes the clockin opened on a previous sync
+        """
+        clock_sync_actions.sync_clock_events(self.employee, [self._event('a', 'in', 3)])
+
+        results = clock_sync_actions.sync_clock_events(self.employee, [self._event('b', 'out', 1)])
+
+        self.assertEqual(results[0]['status'], 'applied')
+        self.assertIsNotNone(Clockin.objects.get(employee=self.employee).ended_at)
+
+    def test_rejected_retry_is_checked_again(self):
+        """
+        A rejected event is not recorded, retried after the events it depends on it is applied
+        """
+        first = clock_sync_actions.sync_clock_events(self.employee, [self._event('b', 'out', 1)])
+        clock_sync_actions.sync_clock_events(self.employee, [self._event('a', 'in', 3)])
+
+        second = clock_sync_actions.sync_clock_events(self.employee, [self._event('b', 'out', 1)])
+
+        self.assertEqual(first[0]['status'], 'rejected')
+        self.assertEqual(second[0]['status'], 'applied')
+        self.assertIsNotNone(Clockin.objects.get(employee=self.employee).ended_at)
+
+    def test_new_clockin_ids(self):
+        """
+        The ids read back after the insert are the ones of the new clockins, not of an older
+        clockin of the talent that started at the same time
+        """
+        started_at = self.now - datetime.timedelta(hours=3)
+        older = mixer.blend('api.Clockin', employee=self.employee, shift=mixer.blend('api.Shift'),
+            started_at=started_at, ended_at=started_at + datetime.timedelta(minutes=30))
+
+        results = clock_sync_actions.sync_clock_events(self.employee, [self._event('a', 'in', 3)])
+
+        self.assertEqual(results[0]['status'], 'applied')
+        self.assertNotEqual(results[0]['clockin'], older.id)
+        self.assertEqual(Clockin.objects.get(id=results[0]['clockin']).shift_id, self.shift.id)
+
+    def test_rejected_events(self):
+        """
+        Invalid, far away or unknown events are rejected without stopping the rest of the batch
+        """
+        results = clock_sync_actions.sync_clock_events(self.employee, [
+            { "key": 'bad' },
+            self._event('far', 'in', 3, latitude=25.7617 + 1.0 / 69.0),
+            self._event('missing', 'in', 3, shift=self.shift.id + 1000),
+            self._event('orphan', 'out', 3),
+            self._event('a', 'in', 2),
+        ])
+
+        self.assertEqual([result['status'] for result in results], ['rejected'] * 4 + ['applied'])
+        self.assertIn('Bayside', results[1]['errors'][0])
+        self.assertEqual(Clockin.objects.filter(employee=self.employee).count(), 1)
+
+    def test_future_events(self):
+        """
+        Events later than now (plus the clock skew of the phone) are rejected
+        """
+        results = clock_sync_actions.sync_clock_events(self.employee, [
+            self._event('a', 'in', 3),
+            self._event('b', 'out', -2),
+            self._event('c', 'out', -1.0 / 60)
+        ])
+
+        self.assertEqual([result['status'] for result in results], ['applied', 'rejected', 'applied'])
+        self.assertIn('at', results[1]['errors'])
+
+    def test_old_events(self):
+        """
+        Events older than the offline window are rejected
+        """
+        results = clock_sync_actions.sync_clock_events(self.employee, [self._event('a', 'in', 49)])
+
+        self.assertEqual(results[0]['status'], 'rejected')
+        self.assertIn('at', results[0]['errors'])
+        self.assertEqual(Clockin.objects.filter(employee=self.employee).count(), 0)
+
+    def test_constant_queries(self):
+        """
+        The number of queries doesn't grow with the number of events
+        """
+        clockin_actions.get_venue(self.venue.id)
+        shifts = [mixer.blend('api.Shift', venue=self.venue, employer=self.shift.employer,
+            starting_at=self.now - datetime.timedelta(hours=24), ending_at=self.now + datetime.timedelta(hours=1)) for i in range(10)]
+        events = []
+        for i, shift in enumerate(shifts):
+            events.append(self._event('in' + str(i), 'in', 20 - i * 2, shift=shift.id))
+            events.append(self._event('out' + str(i), 'out', 19 - i * 2, shift=shift.id))
+
+        with self.assertNumQueries(15):
+            results = clock_sync_actions.sync_clock_events(self.employee, events)
+
+        self.assertTrue(all(result['status'] == 'applied' for result in results))
+        self.assertEqual(Clockin.objects.filter(employee=self.employee).exclude(ended_at=None).count(), 10)
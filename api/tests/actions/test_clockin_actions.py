@@ -0,0 +1,137 @@
+import datetime
+from django.test import TestCase
+from django.utils import timezone
+from mixer.backend.django import mixer
+from api.models import EmployeeDailyHours
+from api.actions import clockin_actions
+from api.serializers.clockin_serializer import ClockinSerializer
+
+class ClockinActionsTestSuite(TestCase):
+    """
+    Tests for the clock in fast path
+    """
+
+    def setUp(self):
+        clockin_actions._venues.clear()
+        now = timezone.now()
+        self.venue = mixer.blend('api.Venue', title='Bayside', latitude=25.7617, longitude=-80.1918)
+        self.shift = mixer.blend('api.Shift', venue=self.venue, employer=mixer.blend('api.Employer', maximum_clockin_delta_minutes=None),
+            starting_at=now - datetime.timedelta(hours=1), ending_at=now + datetime.timedelta(hours=3))
+        self.employee = mixer.blend('api.Employee', user=mixer.blend('auth.User'))
+
+    def _clockin(self, latitude, longitude):
+        return ClockinSerializer(data={
+            "employee": self.employee.id,
+            "shift": self.shift.id,
+            "started_at": timezone.now().isoformat(),
+            "latitude_in": round(latitude, 6),
+            "longitude_in": longitude
+        })
+
+    def test_distance_in_miles(self):
+        """
+        The distance is measured in miles, 0.08 miles away is close enough
+        """
+        # 0.08 miles to the north
+        self.assertTrue(self._clockin(25.7617 + 0.08 / 69.0, -80.1918).is_valid())
+        serializer = self._clockin(25.7617 + 0.2 / 69.0, -80.1918)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('Bayside', str(serializer.errors))
+
+    def test_one_query_per_clockin(self):
+        """
+        The talent and the shift (with employer and clockin state) are the only queries, the venue is cached
+        """
+        clockin_actions.get_venue(self.venue.id)
+
+        with self.assertNumQueries(2):
+            self.assertTrue(self._clockin(25.7617, -80.1918).is_valid())
+
+    def test_open_clockin(self):
+        """
+        Talents with a clockin still open can't clock in again
+        """
+        mixer.blend('api.Clockin', employee=self.employee, shift=mixer.blend('api.Shift'), ended_at=None)
+
+        serializer = self._clockin(25.7617, -80.1918)
+
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('clock out first', str(serializer.errors))
+
+    def test_venue_cache_is_invalidated(self):
+        """
+        Moving the venue drops it from the cache
+        """
+        self.assertTrue(self._clockin(25.7617, -80.1918).is_valid())
+        self.venue.latitude = 26.5
+        self.venue.save()
+
+        self.assertFalse(self._clockin(25.7617, -80.1918).is_valid())
+
+class AutoClockoutTestSuite(TestCase):
+    """
+    Tests for the auto clock out of the forgotten clockins
+    """
+
+    def setUp(self):
+        self.now = timezone.now().replace(microsecond=0)
+        self.employer = mixer.blend('api.Employer', maximum_clockout_delay_minutes=15)
+
+    def _open_clockin(self, employer, ended_minutes_ago, **shift_fields):
+        shift_ending_at = self.now - datetime.timedelta(minutes=ended_minutes_ago)
+        shift = mixer.blend('api.Shift', employer=employer, starting_at=shift_ending_at - datetime.timedelta(hours=4),
+            ending_at=shift_ending_at, minimum_hourly_rate=10, **shift_fields)
+        return mixer.blend('api.Clockin', shift=shift, employee=mixer.blend('api.Employee', user=mixer.blend('auth.User')),
+            started_at=shift.starting_at, ended_at=None)
+
+    def test_overdue_clockins_are_closed(self):
+        """
+        Only the clockins past the delay of their shift or employer are closed, at the end of the shift
+        """
+        overdue = [self._open_clockin(self.employer, 20) for i in range(3)]
+        recent = self._open_clockin(self.employer, 5)
+        anytime = self._open_clockin(mixer.blend('api.Employer', maximum_clockout_delay_minutes=None), 600, maximum_clockout_delay_minutes=None)
+
+        report = clockin_actions.close_overdue_clockins(now=self.now, batch_size=2)
+
+        self.assertEquals(report["scanned"], 4)
+        self.assertEquals(report["closed"], 3)
+        for clockin in overdue:
+            clockin.refresh_from_db()
+            self.assertEquals(clockin.ended_at, clockin.shift.ending_at)
+        recent.refresh_from_db()
+        anytime.refresh_from_db()
+        self.assertIsNone(recent.ended_at)
+        self.assertIsNone(anytime.ended_at)
+        self.assertEquals(EmployeeDailyHours.objects.count(), 3)
+
+    def test_delay_of_the_shift(self):
+        """
+        The delay of the shift (15 minutes by default) is used before the one of the employer
+        """
+        employer = mixer.blend('api.Employer', maximum_clockout_delay_minutes=None)
+        overdue = self._open_clockin(employer, 20)
+        recent = self._open_clockin(employer, 10)
+        longer = self._open_clockin(self.employer, 20, maximum_clockout_delay_minutes=30)
+
+        report = clockin_actions.close_overdue_clockins(now=self.now)
+
+        self.assertEquals(report["closed"], 1)
+        overdue.refresh_from_db()
+        recent.refresh_from_db()
+        longer.refresh_from_db()
+        self.assertEquals(overdue.ended_at, overdue.shift.ending_at)
+        self.assertIsNone(recent.ended_at)
+        self.assertIsNone(longer.ended_at)
+
+    def test_nothing_left(self):
+        """
+        Running it again does not find anything
+        """
+        self._open_clockin(self.employer, 20)
+        clockin_actions.close_overdue_clockins(now=self.now)
+
+        report = clockin_actions.close_overdue_clockins(now=self.now)
+
+        self.assertEquals(report["closed"], 0)
+        self.assertEquals(report["scanned"], 0)
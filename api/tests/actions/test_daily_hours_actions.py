@@ -0,0 +1,72 @@
+import datetime
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from mixer.backend.django import mixer
+from api.models import EmployeeDailyHours
+from api.actions import daily_hours_actions
+
+class DailyHoursActionsTestSuite(TestCase):
+    """
+    Tests for the daily hours rollup
+    """
+
+    def setUp(self):
+        self.day = timezone.now().replace(hour=8, minute=0, second=0, microsecond=0) - datetime.timedelta(days=3)
+        self.employer = mixer.blend('api.Employer')
+        self.shift = mixer.blend('api.Shift', employer=self.employer, minimum_hourly_rate=12)
+        self.employee = mixer.blend('api.Employee')
+
+    def _clockin(self, started_at, hours, shift=None):
+        return mixer.blend('api.Clockin', shift=shift or self.shift, employee=self.employee,
+            started_at=started_at, ended_at=started_at + datetime.timedelta(hours=hours) if hours is not None else None)
+
+    def test_refresh_adds_up_the_day(self):
+        """
+        Closed clockins of the same day are added in one row, open ones are ignored
+        """
+        self._clockin(self.day, 4)
+        self._clockin(self.day + datetime.timedelta(hours=5), 1.5)
+        self._clockin(self.day + datetime.timedelta(days=1), 2)
+        self._clockin(self.day + datetime.timedelta(days=2), None)
+
+        daily_hours_actions.refresh_daily_hours([(self.employee.id, self.shift.id)])
+
+        rows = EmployeeDailyHours.objects.filter(employer=self.employer).order_by('day')
+        self.assertEquals([(row.clockins, float(row.hours), float(row.amount)) for row in rows], [(2, 5.5, 66), (1, 2, 24)])
+        self.assertEquals(rows[0].day, self.day.date())
+
+    def test_refresh_after_edit(self):
+        """
+        Refreshing a pair replaces its rows, other pairs are untouched
+        """
+        clockin = self._clockin(self.day, 4)
+        other = self._clockin(self.day, 3, shift=mixer.blend('api.Shift', employer=self.employer, minimum_hourly_rate=10))
+        daily_hours_actions.refresh_daily_hours([(self.employee.id, self.shift.id), (self.employee.id, other.shift_id)])
+
+        clockin.ended_at = self.day + datetime.timedelta(hours=1)
+        clockin.save()
+        daily_hours_actions.refresh_daily_hours([(self.employee.id, self.shift.id)])
+
+        self.assertEquals(float(EmployeeDailyHours.objects.get(shift=self.shift).hours), 1)
+        self.assertEquals(float(EmployeeDailyHours.objects.get(shift_id=other.shift_id).hours), 3)
+
+        clockin.delete()
+        daily_hours_actions.refresh_daily_hours([(self.employee.id, self.shift.id)])
+        self.assertFalse(EmployeeDailyHours.objects.filter(shift=self.shift).exists())
+
+    def test_rebuild_command(self):
+        """
+        The rebuild command recomputes the rollup of every employer from scratch
+        """
+        self._clockin(self.day, 4)
+        self._clockin(self.day + datetime.timedelta(days=1), 2)
+        mixer.blend('api.EmployeeDailyHours', employer=self.employer, employee=self.employee, shift=self.shift,
+            day=self.day.date() - datetime.timedelta(days=10), hours=99)
+
+        out = StringIO()
+        call_command('rebuild_daily_hours', stdout=out)
+
+        self.assertEquals(EmployeeDailyHours.objects.filter(employer=self.employer).count(), 2)
+        self.assertIn('Employer {}: 2 rows'.format(self.employer.id), out.getvalue())
@@ -0,0 +1,41 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import mixer
+from api.models import ShiftInvite
+from api.actions.invite_actions import create_shift_invites
+
+class InviteActionsTestSuite(TestCase):
+    """
+    Tests for the bulk shift invite writer
+    """
+
+    def setUp(self):
+        self.sender = mixer.blend('api.Profile', user=mixer.blend('auth.User'))
+        self.shift = mixer.blend('api.Shift')
+        self.talents = [mixer.blend('api.Employee', user=mixer.blend('auth.User')) for i in range(5)]
+
+    def test_invites_are_created_in_batches(self):
+        """
+        All the talents get an invite using a couple of queries
+        """
+        with CaptureQueriesContext(connection) as queries:
+            invites = create_shift_invites(self.shift, self.sender, self.talents, batch_size=2)
+
+        # lookup + 3 inserts (+ fetching the ids on databases that don't return them)
+        self.assertLessEqual(len(queries), 5)
+
+        self.assertEquals(len(invites), 5)
+        self.assertTrue(all(invite.id is not None for invite in invites))
+        self.assertEquals(ShiftInvite.objects.filter(shift=self.shift).count(), 5)
+
+    def test_already_invited_talents_are_skipped(self):
+        """
+        Talents with a previous invite for the shift are not invited twice
+        """
+        mixer.blend('api.ShiftInvite', shift=self.shift, employee=self.talents[0], sender=self.sender)
+
+        invites = create_shift_invites(self.shift, self.sender, self.talents + [self.talents[1]])
+
+        self.assertEquals(sorted(invite.employee_id for invite in invites), sorted(talent.id for talent in self.talents[1:]))
+        self.assertEquals(ShiftInvite.objects.filter(shift=self.shift).count(), 5)
@@ -0,0 +1,92 @@
+import datetime
+from django.test import TestCase
+from django.utils import timezone
+from mixer.backend.django import mixer
+from api.models import PayrollPeriod, PayrollPeriodPayment
+from api.actions import payroll_actions
+
+class PayrollActionsTestSuite(TestCase):
+    """
+    Tests for the payroll period generation
+    """
+
+    def setUp(self):
+        self.now = timezone.now().replace(microsecond=0)
+        self.employer = mixer.blend('api.Employer', payroll_period_length=7, payroll_period_type='DAYS',
+            payroll_period_starting_time=self.now.replace(hour=0, minute=0, second=0))
+        # the employer joined 3 weeks ago
+        self.start = (self.now - datetime.timedelta(days=21)).replace(hour=0, minute=0, second=0)
+        mixer.blend('api.PayrollPeriod', employer=self.employer, starting_at=self.start - datetime.timedelta(days=7),
+            ending_at=self.start - datetime.timedelta(seconds=1))
+        self.employee = mixer.blend('api.Employee')
+
+    def _clockin(self, started_at, hours):
+        shift = mixer.blend('api.Shift', employer=self.employer, starting_at=started_at,
+            ending_at=started_at + datetime.timedelta(hours=hours), minimum_hourly_rate=10)
+        return mixer.blend('api.Clockin', shift=shift, employee=self.employee, started_at=started_at,
+            ended_at=started_at + datetime.timedelta(hours=hours))
+
+    def test_periods_are_bucketed_in_memory(self):
+        """
+        One clockin query for all the pending periods, empty periods are skipped
+        """
+        self._clockin(self.start + datetime.timedelta(days=1), 5)
+        self._clockin(self.start + datetime.timedelta(days=2), 3)
+        self._clockin(self.start + datetime.timedelta(days=15), 4)
+        # not finished yet, it can't be paid
+        mixer.blend('api.Clockin', shift=mixer.blend('api.Shift', employer=self.employer), employee=self.employee,
+            started_at=self.start + datetime.timedelta(days=3), ended_at=None)
+
+        # savepoint, employer lock, last period, clockins, periods, their ids (sqlite), payments, release savepoint
+        with self.assertNumQueries(8):
+            periods, report = payroll_actions.generate_periods(self.employer, now=self.now)
+
+        self.assertEquals(len(periods), 2)
+        self.assertEquals(report["payments"], 3)
+        self.assertEquals([period.starting_at for period in periods], [self.start, self.start + datetime.timedelta(days=14)])
+        self.assertEquals(PayrollPeriodPayment.objects.filter(paryroll_period=periods[0]).count(), 2)
+        self.assertEquals(PayrollPeriodPayment.objects.get(paryroll_period=periods[1]).regular_hours, 4)
+
+    def test_clockin_between_two_periods_is_split(self):
+        """
+        A clockin crossing the end of a period gets one payment on each side
+        """
+        self._clockin(self.start + datetime.timedelta(days=7) - datetime.timedelta(hours=2), 4)
+
+        periods, report = payroll_actions.generate_periods(self.employer, now=self.now)
+
+        payments = PayrollPeriodPayment.objects.order_by('paryroll_period__starting_at')
+        self.assertEquals(len(periods), 2)
+        self.assertEquals([payment.splited_payment for payment in payments], [True, True])
+        self.assertEquals(sum(payment.regular_hours for payment in payments), 4)
+
+    def test_weeks_cross_the_periods(self):
+        """
+        With 10 day periods the week that crosses two periods adds up the hours of both
+        """
+        monday = datetime.datetime(2026, 9, 21, tzinfo=timezone.utc)
+        employer = mixer.blend('api.Employer', payroll_period_length=10, payroll_period_type='DAYS')
+        mixer.blend('api.PayrollPeriod', employer=employer, starting_at=monday - datetime.timedelta(days=10),
+            ending_at=monday - datetime.timedelta(seconds=1))
+        self.employer = employer
+        # monday 28 to sunday 4, 6 hours every day: wednesday 30 ends the first period with 18 hours
+        for day in range(7, 14):
+            self._clockin(monday + datetime.timedelta(days=day, hours=8), 6)
+
+        periods, report = payroll_actions.generate_periods(employer, now=monday + datetime.timedelta(days=25))
+
+        self.assertEquals(len(periods), 2)
+        over_time = [list(PayrollPeriodPayment.objects.filter(paryroll_period=period).order_by('shift__starting_at')
+            .values_list('over_time', flat=True)) for period in periods]
+        self.assertEquals(over_time, [[0, 0, 0], [0, 0, 0, 2]])
+
+    def test_nothing_pending(self):
+        """
+        Running it again does not generate anything new
+        """
+        self._clockin(self.start + datetime.timedelta(days=1), 5)
+        payroll_actions.generate_periods(self.employer, now=self.now)
+
+        periods, report = payroll_actions.generate_periods(self.employer, now=self.now)
+        self.assertEquals(periods, [])
+        self.assertEquals(PayrollPeriod.objects.filter(employer=self.employer).count(), 2)
@@ -0,0 +1,104 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import mixer
+from api.models import Shift, ShiftEmployee, ShiftApplication
+from api.actions import roster_actions
+
+class RosterActionsTestSuite(TestCase):
+    """
+    Tests for the set based sync of the shift employees and candidates
+    """
+
+    def setUp(self):
+        self.shift = mixer.blend('api.Shift', status='OPEN', maximum_allowed_employees=0)
+        self.talents = [mixer.blend('api.Employee', user=mixer.blend('auth.User')) for i in range(6)]
+        for talent in self.talents[:3]:
+            ShiftEmployee.objects.create(shift=self.shift, employee=talent)
+
+    def test_employees_diff(self):
+        """
+        Only the talents that changed are accepted or rejected, with their users loaded
+        """
+        talents_to_notify = roster_actions.sync_shift_employees(self.shift, [talent.id for talent in self.talents[1:5]])
+
+        self.assertEqual([talent.id for talent in talents_to_notify['accepted']], [talent.id for talent in self.talents[3:5]])
+        self.assertEqual([talent.id for talent in talents_to_notify['rejected']], [self.talents[0].id])
+        with self.assertNumQueries(0):
+            [talent.user.email for talent in talents_to_notify['accepted'] + talents_to_notify['rejected']]
+        self.assertEqual(set(ShiftEmployee.objects.filter(shift=self.shift).values_list('employee_id', flat=True)),
+            set(talent.id for talent in self.talents[1:5]))
+
+    def _count_queries(self, size, change):
+        """
+        Queries to sync the employees of a new shift that already has size talents,
+        to the same roster or (change) to size other talents
+        """
+        shift = mixer.blend('api.Shift', status='OPEN', maximum_allowed_employees=0)
+        talents = [mixer.blend('api.Employee', user=mixer.blend('auth.User')) for i in range(size * 2 if change else size)]
+        for talent in talents[:size]:
+            ShiftEmployee.objects.create(shift=shift, employee=talent)
+
+        with CaptureQueriesContext(connection) as queries:
+            roster_actions.sync_shift_employees(shift, [talent.id for talent in talents[-size:]])
+        return len(queries)
+
+    def test_constant_queries(self):
+        """
+        The number of queries doesn't depend on the size of the roster
+        """
+        self.assertEqual(self._count_queries(5, change=True), self._count_queries(50, change=True))
+
+    def test_unknown_talents_are_ignored(self):
+        """
+        Ids of talents that don't exist are not added
+        """
+        roster_actions.sync_shift_candidates(self.shift, [self.talents[0].id, 999999])
+
+        self.assertEqual(list(ShiftApplication.objects.filter(shift=self.shift).values_list('employee_id', flat=True)), [self.talents[0].id])
+
+    def test_no_changes(self):
+        """
+        Sending the same roster doesn't write anything
+        """
+        talents_to_notify = roster_actions.sync_shift_employees(self.shift, [talent.id for talent in self.talents[:3]])
+
+        self.assertEqual(talents_to_notify, { "accepted": [], "rejected": [] })
+        self.assertEqual(self._count_queries(5, change=False), self._count_queries(50, change=False))
+        # and it doesn't reach the writes of a roster that changed
+        self.assertLess(self._count_queries(5, change=False), self._count_queries(5, change=True))
+
+    def test_employees_over_the_spots(self):
+        """
+        The employer can't accept more talents than spots, the roster doesn't change
+        """
+        Shift.objects.filter(id=self.shift.id).update(maximum_allowed_employees=4)
+
+        with self.assertRaises(ValueError):
+            roster_actions.sync_shift_employees(self.shift, [talent.id for talent in self.talents[:5]])
+
+        self.assertEqual(ShiftEmployee.objects.filter(shift=self.shift).count(), 3)
+        self.assertEqual(Shift.objects.get(id=self.shift.id).status, 'OPEN')
+
+    def test_last_spot_fills_the_shift(self):
+        """
+        Taking the last spot moves the shift to FILLED and the talents can't accept it anymore
+        """
+        Shift.objects.filter(id=self.shift.id).update(maximum_allowed_employees=4)
+
+        roster_actions.sync_shift_employees(self.shift, [talent.id for talent in self.talents[:4]])
+
+        self.assertEqual(Shift.objects.get(id=self.shift.id).status, 'FILLED')
+        self.assertEqual(roster_actions.fill_shift(self.shift.id, self.talents[5].id), roster_actions.SHIFT_FILLED)
+
+    def test_freed_spot_opens_the_shift(self):
+        """
+        Removing talents from a FILLED shift moves it back to OPEN so talents can accept it again
+        """
+        Shift.objects.filter(id=self.shift.id).update(maximum_allowed_employees=3, status='FILLED')
+
+        roster_actions.sync_shift_employees(self.shift, [talent.id for talent in self.talents[:2]])
+
+        self.assertEqual(Shift.objects.get(id=self.shift.id).status, 'OPEN')
+        self.assertEqual(roster_actions.fill_shift(self.shift.id, self.talents[5].id), roster_actions.ACCEPTED)
+        self.assertEqual(Shift.objects.get(id=self.shift.id).status, 'FILLED')
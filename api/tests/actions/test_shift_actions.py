@@ -0,0 +1,101 @@
+import datetime
+from django.test import TestCase
+from django.utils import timezone
+from mixer.backend.django import mixer
+from api.models import Shift, ShiftInvite, ShiftEmployee
+from api.actions import shift_actions
+
+class ShiftLifecycleTestSuite(TestCase):
+    """
+    Tests for the automatic FILLED, EXPIRED and COMPLETED transitions
+    """
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.talents = [mixer.blend('api.Employee', user=mixer.blend('auth.User')) for i in range(2)]
+        self.sender = mixer.blend('api.Profile', user=mixer.blend('auth.User'))
+
+    def _shift(self, status, ended_hours_ago, maximum_allowed_employees=0):
+        ending_at = self.now - datetime.timedelta(hours=ended_hours_ago)
+        return mixer.blend('api.Shift', status=status, maximum_allowed_employees=maximum_allowed_employees,
+            starting_at=ending_at - datetime.timedelta(hours=4), ending_at=ending_at)
+
+    def _status(self, shift):
+        return Shift.objects.values_list('status', flat=True).get(id=shift.id)
+
+    def test_ended_shifts_expire(self):
+        """
+        OPEN and FILLED shifts that ended are EXPIRED with their pending invites, the rest don't change
+        """
+        ended = [self._shift('OPEN', 2), self._shift('FILLED', 1), self._shift('OPEN', 3)]
+        running = self._shift('OPEN', -1)
+        draft = self._shift('DRAFT', 2)
+        pending = mixer.blend('api.ShiftInvite', shift=ended[0], employee=self.talents[0], status='PENDING', sender=self.sender)
+        applied = mixer.blend('api.ShiftInvite', shift=ended[0], employee=self.talents[1], status='APPLIED', sender=self.sender)
+
+        report = shift_actions.update_shift_statuses(now=self.now, batch_size=2)
+
+        self.assertEqual(report["expired"], 3)
+        self.assertEqual([self._status(shift) for shift in ended], ['EXPIRED'] * 3)
+        self.assertEqual(self._status(running), 'OPEN')
+        self.assertEqual(self._status(draft), 'DRAFT')
+        self.assertEqual(ShiftInvite.objects.get(id=pending.id).status, 'EXPIRED')
+        self.assertEqual(ShiftInvite.objects.get(id=applied.id).status, 'APPLIED')
+
+    def test_full_shifts_are_filled(self):
+        """
+        OPEN shifts with all the spots taken are FILLED, shifts without a maximum stay OPEN
+        """
+        full = self._shift('OPEN', -5, maximum_allowed_employees=2)
+        unlimited = self._shift('OPEN', -5)
+        for talent in self.talents:
+            ShiftEmployee.objects.create(shift=full, employee=talent)
+            ShiftEmployee.objects.create(shift=unlimited, employee=talent)
+        invite = mixer.blend('api.ShiftInvite', shift=full, employee=mixer.blend('api.Employee', user=mixer.blend('auth.User')), status='PENDING', sender=self.sender)
+
+        report = shift_actions.update_shift_statuses(now=self.now)
+
+        self.assertEqual(report["filled"], 1)
+        self.assertEqual(self._status(full), 'FILLED')
+        self.assertEqual(self._status(unlimited), 'OPEN')
+        self.assertEqual(ShiftInvite.objects.get(id=invite.id).status, 'EXPIRED')
+
+    def test_paid_shifts_are_completed(self):
+        """
+        EXPIRED shifts are COMPLETED once all their payments are paid
+        """
+        paid = self._shift('EXPIRED', 48)
+        unpaid = self._shift('EXPIRED', 48)
+        mixer.blend('api.PayrollPeriodPayment', shift=paid, employee=self.talents[0], status='PAID')
+        mixer.blend('api.PayrollPeriodPayment', shift=unpaid, employee=self.talents[0], status='PAID')
+        mixer.blend('api.PayrollPeriodPayment', shift=unpaid, employee=self.talents[1], status='PENDING', sender=self.sender)
+
+        report = shift_actions.update_shift_statuses(now=self.now)
+
+        self.assertEqual(report["completed"], 1)
+        self.assertEqual(self._status(paid), 'COMPLETED')
+        self.assertEqual(self._status(unpaid), 'EXPIRED')
+
+    def test_status_changed_after_the_read(self):
+        """
+        A shift cancelled by the employer after the batch was read is not moved and keeps its invites
+        """
+        shifts = [self._shift('OPEN', 2), self._shift('OPEN', 1)]
+        invites = [mixer.blend('api.ShiftInvite', shift=shift, employee=self.talents[0], sender=self.sender, status='PENDING') for shift in shifts]
+        read = Shift.objects.filter(id__in=[shift.id for shift in shifts])
+        Shift.objects.filter(id=shifts[1].id).update(status='CANCELLED')
+
+        moved, expired = shift_actions.move_shifts(read, ['OPEN', 'FILLED'], 'EXPIRED', batch_size=10, expire_invites=True)
+
+        self.assertEqual((moved, expired), (1, 1))
+        self.assertEqual([self._status(shift) for shift in shifts], ['EXPIRED', 'CANCELLED'])
+        self.assertEqual(ShiftInvite.objects.get(id=invites[1].id).status, 'PENDING')
+
+    def test_nothing_to_do(self):
+        """
+        A run without shifts to move only reads once per transition
+        """
+        self._shift('OPEN', -5, maximum_allowed_employees=2)
+
+        with self.assertNumQueries(9):
+            shift_actions.update_shift_statuses(now=self.now)
@@ -0,0 +1,109 @@
+import time
+import threading
+from django.db import connection, connections, OperationalError
+from django.test import TestCase, TransactionTestCase
+from mixer.backend.django import mixer
+from api.models import Shift, ShiftEmployee
+from api.actions import roster_actions
+
+class ShiftFillTestSuite(TestCase):
+    """
+    Tests for accepting talents on a shift with limited spots
+    """
+
+    def setUp(self):
+        self.shift = mixer.blend('api.Shift', status='OPEN', maximum_allowed_employees=2)
+        self.talents = [mixer.blend('api.Employee', user=mixer.blend('auth.User')) for i in range(3)]
+
+    def test_last_spot_fills_the_shift(self):
+        """
+        The shift is FILLED as soon as the last spot is taken and the next talents are rejected
+        """
+        self.assertEqual(roster_actions.fill_shift(self.shift.id, self.talents[0].id), roster_actions.ACCEPTED)
+        self.assertEqual(roster_actions.fill_shift(self.shift.id, self.talents[1].id), roster_actions.ACCEPTED)
+        self.assertEqual(Shift.objects.get(id=self.shift.id).status, 'FILLED')
+
+        with self.assertNumQueries(4):
+            self.assertEqual(roster_actions.fill_shift(self.shift.id, self.talents[2].id), roster_actions.SHIFT_FILLED)
+        self.assertEqual(ShiftEmployee.objects.filter(shift=self.shift).count(), 2)
+
+    def test_accept_twice(self):
+        """
+        A talent accepted twice has only one ShiftEmployee
+        """
+        roster_actions.fill_shift(self.shift.id, self.talents[0].id)
+
+        self.assertEqual(roster_actions.fill_shift(self.shift.id, self.talents[0].id), roster_actions.ALREADY_ACCEPTED)
+        self.assertEqual(ShiftEmployee.objects.filter(shift=self.shift).count(), 1)
+
+    def test_shift_not_open(self):
+        """
+        Talents accepted on shifts that are not OPEN or FILLED are not told the shift is full
+        """
+        for status in ['DRAFT', 'PAUSED', 'CANCELLED']:
+            Shift.objects.filter(id=self.shift.id).update(status=status)
+            self.assertEqual(roster_actions.fill_shift(self.shift.id, self.talents[0].id), roster_actions.SHIFT_NOT_OPEN)
+        self.assertEqual(ShiftEmployee.objects.filter(shift=self.shift).count(), 0)
+
+    def test_no_limit(self):
+        """
+        Shifts without maximum_allowed_employees are never filled
+        """
+        Shift.objects.filter(id=self.shift.id).update(maximum_allowed_employees=0)
+
+        for talent in self.talents:
+            self.assertEqual(roster_actions.fill_shift(self.shift.id, talent.id), roster_actions.ACCEPTED)
+        self.assertEqual(Shift.objects.get(id=self.shift.id).status, 'OPEN')
+
+class ShiftFillConcurrencyTestSuite(TransactionTestCase):
+    """
+    Many talents accepted on the same shift at the same time, every worker has its own connection.
+    sqlite locks whole tables so the race only really shows up on postgres (read committed)
+    """
+    WORKERS = 8
+    TALENTS = 40
+    SPOTS = 5
+    # sqlite answers "database is locked" right away, the workers wait and try again
+    RETRIES = 200
+    RETRY_SECONDS = 0.01
+
+    def setUp(self):
+        self.shift = mixer.blend('api.Shift', status='OPEN', maximum_allowed_employees=self.SPOTS)
+        self.talents = [mixer.blend('api.Employee', user=mixer.blend('auth.User')) for i in range(self.TALENTS)]
+
+    def _worker(self, talents, results, start):
+        start.wait()
+        try:
+            for talent in talents:
+                # every talent taps accept twice
+                for attempt in range(2):
+                    for retry in range(self.RETRIES):
+                        try:
+                            results.append(roster_actions.fill_shift(self.shift.id, talent.id))
+                            break
+                        except OperationalError:
+                            # sqlite doesn't wait for the lock of the other connections, postgres does
+                            if connection.vendor != 'sqlite' or retry == self.RETRIES - 1:
+                                raise
+                            time.sleep(self.RETRY_SECONDS)
+        finally:
+            connections.close_all()
+
+    def test_parallel_accepts(self):
+        """
+        The shift never gets more talents than spots or the same talent twice
+        """
+        results = []
+        start = threading.Barrier(self.WORKERS)
+        workers = [threading.Thread(target=self._worker, args=(self.talents[i::self.WORKERS], results, start)) for i in range(self.WORKERS)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        employee_ids = list(ShiftEmployee.objects.filter(shift=self.shift).values_list('employee_id', flat=True))
+        self.assertEqual(len(employee_ids), self.SPOTS)
+        self.assertEqual(len(set(employee_ids)), self.SPOTS)
+        self.assertEqual(results.count(roster_actions.ACCEPTED), self.SPOTS)
+        self.assertEqual(len(results), self.TALENTS * 2)
+        self.assertEqual(Shift.objects.get(id=self.shift.id).status, 'FILLED')
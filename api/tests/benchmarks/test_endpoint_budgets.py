@@ -0,0 +1,212 @@
+import os
+import json
+import inspect
+import time
+import datetime
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern
+from django.utils import timezone
+from mixer.backend.django import mixer
+from rest_framework.test import APIClient
+from rest_framework_jwt.settings import api_settings
+import api.utils.jwt
+from api.urls import urlpatterns
+
+jwt_encode_handler = api_settings.JWT_ENCODE_HANDLER
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), 'budgets.json')
+
+# where the measurements are written (one json document per run), only when it is set
+REPORT_PATH = os.environ.get('ENDPOINT_REPORT')
+
+# GET on these routes changes or deletes data, they are not measured
+SKIPPED_ROUTES = [
+    'hook/delete_all_shifts',
+    'hook/create_default_availablity_blocks',
+    'employer/<int:employer_id>/generate_periods',
+]
+
+# these routes are called as the talent, everything else as the employer
+TALENT_PREFIXES = ('employees/me', 'shifts/invites', 'applications/')
+
+SHIFTS = 20
+TALENTS = 15
+
+def accepts_get(pattern):
+    """
+    The view has a GET handler that takes the arguments of the route
+    (some routes only exist for their PUT or DELETE)
+    """
+    get = getattr(getattr(pattern.callback, 'view_class', None), 'get', None)
+    if get is None:
+        return False
+    parameters = inspect.signature(get).parameters
+    if any(parameter.kind == parameter.VAR_KEYWORD for parameter in parameters.values()):
+        return True
+    return set(pattern.pattern.converters) | set(pattern.default_args) <= set(parameters)
+
+def get_routes():
+    return [str(pattern.pattern) for pattern in urlpatterns if isinstance(pattern, URLPattern) and accepts_get(pattern)]
+
+@override_settings(STATICFILES_STORAGE=None)
+class EndpointBudgetTestSuite(TestCase):
+    """
+    Calls every route in api/urls.py against a seeded dataset and compares the
+    number of queries and the time spent with the budgets in budgets.json
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.employer = mixer.blend('api.Employer')
+        cls.employer_user = mixer.blend('auth.User', is_staff=True)
+        cls.employer_profile = mixer.blend('api.Profile', user=cls.employer_user, employer=cls.employer, employee=None)
+
+        cls.position = mixer.blend('api.Position')
+        cls.badge = mixer.blend('api.Badge')
+        cls.venue = mixer.blend('api.Venue', employer=cls.employer, latitude=25.76, longitude=-80.19)
+        cls.favlist = mixer.blend('api.FavoriteList', employer=cls.employer)
+
+        cls.talents = []
+        for i in range(TALENTS):
+            talent = mixer.blend('api.Employee')
+            mixer.blend('api.Profile', user=talent.user, employee=talent, employer=None, latitude=25.7, longitude=-80.2)
+            talent.positions.add(cls.position)
+            talent.badges.add(cls.badge)
+            cls.favlist.employees.add(talent)
+            mixer.blend('api.AvailabilityBlock', employee=talent)
+            cls.talents.append(talent)
+        cls.talent = cls.talents[0]
+
+        cls.shifts = []
+        for i in range(SHIFTS):
+            shift = mixer.blend('api.Shift', employer=cls.employer, venue=cls.venue, position=cls.position,
+                status='OPEN', starting_at=now + datetime.timedelta(days=i), ending_at=now + datetime.timedelta(days=i, hours=5))
+            shift.allowed_from_list.add(cls.favlist)
+            shift.required_badges.add(cls.badge)
+            for talent in cls.talents[:5]:
+                mixer.blend('api.ShiftApplication', shift=shift, employee=talent)
+                mixer.blend('api.ShiftEmployee', shift=shift, employee=talent)
+                mixer.blend('api.ShiftInvite', shift=shift, employee=talent, sender=cls.employer_profile)
+                mixer.blend('api.Clockin', shift=shift, employee=talent, author=cls.employer_profile,
+                    started_at=shift.starting_at, ended_at=shift.ending_at)
+            mixer.blend('api.Rate', shift=shift, employee=cls.talent, employer=None, sender=cls.employer_profile)
+            cls.shifts.append(shift)
+        cls.shift = cls.shifts[0]
+
+        cls.period = mixer.blend('api.PayrollPeriod', employer=cls.employer, starting_at=now - datetime.timedelta(days=7), ending_at=now)
+        for shift in cls.shifts[:5]:
+            mixer.blend('api.PayrollPeriodPayment', paryroll_period=cls.period, employee=cls.talent, shift=shift)
+        cls.jobcore_invite = mixer.blend('api.JobCoreInvite', sender=cls.employer_profile, shift=cls.shift)
+        cls.device = mixer.blend('api.FCMDevice', user=cls.talent.user, registration_id='talent-device-token')
+
+    def _kwargs(self, route):
+        application = self.shift.shiftapplication_set.first()
+        values = {
+            'id': self.shift.id,
+            'employee_id': self.talent.id,
+            'employer_id': self.employer.id,
+            'period_id': self.period.id,
+            'application_id': application.id,
+            'block_id': self.talent.availabilityblock_set.first().id,
+            'device_id': self.device.registration_id,
+            'clockin_id': self.shift.clockin_set.first().id,
+            'catalog_type': 'employees',
+            'slug': 'new_shift',
+            'action': 'apply',
+        }
+        # the id of the resource the route is about
+        ids = [
+            ('employers/<int:id>', self.employer.id),
+            ('user/<int:id>', self.employer_user.id),
+            ('jobcore-invites/<int:id>', self.jobcore_invite.id),
+            ('ratings/<int:id>', self.shift.rate_set.first().id),
+            ('badges/<int:id>', self.badge.id),
+            ('employees/<int:id>', self.talent.id),
+            ('positions/<int:id>', self.position.id),
+            ('invites/<int:id>', self.shift.shiftinvite_set.first().id),
+            ('venues/<int:id>', self.venue.id),
+            ('favlists/<int:id>', self.favlist.id),
+        ]
+        for suffix, value in ids:
+            if route.endswith(suffix):
+                values['id'] = value
+        return values
+
+    def _params(self, route):
+        token = jwt_encode_handler(api.utils.jwt.jwt_payload_handler({ "user_id": self.talent.user.id }))
+        return {
+            'user/password/reset': { "token": token },
+            'user/email/validate': { "token": token },
+            'employer/<int:employer_id>/payroll_projection': { "starting_at": self.period.starting_at.isoformat() },
+        }.get(route, {})
+
+    def _url(self, route):
+        url = route
+        for key, value in self._kwargs(route).items():
+            for converter in ('int', 'str'):
+                url = url.replace('<{}:{}>'.format(converter, key), str(value))
+        return '/api/' + url
+
+    def _measure(self, route):
+        client = APIClient()
+        client.force_authenticate(user=self.talent.user if route.startswith(TALENT_PREFIXES) else self.employer_user)
+
+        url = self._url(route)
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            try:
+                status_code = client.get(url, self._params(route)).status_code
+            except Exception as e:
+                status_code = e.__class__.__name__
+            wall_time = time.perf_counter() - started
+
+        return {
+            "route": route,
+            "url": url,
+            "status": status_code,
+            "queries": len(context.captured_queries),
+            "db_ms": round(sum(float(query['time']) for query in context.captured_queries) * 1000, 2),
+            "wall_ms": round(wall_time * 1000, 2)
+        }
+
+    def _write_report(self, results):
+        if not REPORT_PATH:
+            return
+        directory = os.path.dirname(REPORT_PATH)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(REPORT_PATH, 'w') as report:
+            json.dump({
+                "created_at": timezone.now().isoformat(),
+                "dataset": { "shifts": SHIFTS, "talents": TALENTS },
+                "endpoints": results
+            }, report, indent=2)
+
+    def test_endpoints_are_within_budget(self):
+        """
+        No endpoint runs more queries or takes longer than its budget
+        """
+        with open(BUDGETS_PATH) as budgets_file:
+            budgets = json.load(budgets_file)
+
+        results = [self._measure(route) for route in get_routes() if route not in SKIPPED_ROUTES]
+        self._write_report(results)
+
+        # an error is not a measurement
+        failed = ['{route}: {status}'.format(**result) for result in results
+            if not isinstance(result["status"], int) or result["status"] >= 300]
+        self.assertEquals(failed, [], 'Some endpoints failed')
+
+        exceeded = []
+        for result in results:
+            budget = budgets["endpoints"].get(result["route"], budgets["default"])
+            if result["queries"] > budget["queries"]:
+                exceeded.append('{route}: {queries} queries'.format(**result) + ' (budget {})'.format(budget["queries"]))
+            if result["wall_ms"] > budget.get("wall_ms", budgets["default"]["wall_ms"]):
+                exceeded.append('{route}: {wall_ms}ms'.format(**result) + ' (budget {}ms)'.format(budget.get("wall_ms", budgets["default"]["wall_ms"])))
+
+        self.assertEquals(exceeded, [], 'Some endpoints are over budget, set ENDPOINT_REPORT=<path> for the full report')
@@ -0,0 +1,115 @@
+import os
+import time
+import random
+import decimal
+import datetime
+from unittest import skipUnless
+from django.test import TestCase
+from django.utils import timezone
+from mixer.backend.django import mixer
+from api.models import Clockin
+from api.actions import payroll_actions
+
+# the timing comparison only runs when this is set, PAYROLL_BENCHMARK_CLOCKINS=100000 for the full size run (about a minute on sqlite)
+CLOCKINS = int(os.environ.get('PAYROLL_BENCHMARK_CLOCKINS', 0))
+TALENTS = 50
+SHIFTS = 100
+
+def row_by_row(clockins, starting_at, ending_at):
+    """
+    The previous computation: one clockin instance at a time with Decimal amounts
+    and overtime measured against the scheduled shift length
+    """
+    results = []
+    for clockin in clockins:
+        shift = clockin.shift
+        starting_time = clockin.started_at if clockin.started_at > starting_at else starting_at
+        ending_time = clockin.ended_at if clockin.ended_at < ending_at else ending_at
+        total_hours = (ending_time - starting_time).total_seconds() / 3600
+        projected_starting_time = shift.starting_at if shift.starting_at > starting_at else starting_at
+        projected_ending_time = shift.ending_at if shift.ending_at < ending_at else ending_at
+        projected_hours = (projected_ending_time - projected_starting_time).total_seconds() / 3600
+        results.append((
+            total_hours,
+            (total_hours - projected_hours) if (total_hours > projected_hours) else 0,
+            shift.minimum_hourly_rate * decimal.Decimal(total_hours),
+            False if clockin.started_at == starting_time and ending_time == clockin.ended_at else True
+        ))
+    return results
+
+def load_rows():
+    return [(employee_id, shift_id, started_at.timestamp(), ended_at.timestamp(), rate)
+        for employee_id, shift_id, started_at, ended_at, rate in Clockin.objects.values_list(
+            'employee_id', 'shift_id', 'started_at', 'ended_at', 'shift__minimum_hourly_rate').order_by('started_at', 'id')]
+
+class PayrollComputeTestSuite(TestCase):
+    """
+    The columnar payroll math gives the same hours and amounts as the previous loop
+    """
+
+    def setUp(self):
+        self.starting_at = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0) - datetime.timedelta(days=7)
+        self.ending_at = self.starting_at + datetime.timedelta(days=7)
+        employer = mixer.blend('api.Employer')
+        shifts = [mixer.blend('api.Shift', employer=employer, minimum_hourly_rate=rate) for rate in (10, 15)]
+        # under 40 hours a week per talent: no overtime on either side
+        for i in range(3):
+            talent = mixer.blend('api.Employee', user=mixer.blend('auth.User'))
+            for started_at, hours in [(self.starting_at - datetime.timedelta(hours=2), 5), (self.starting_at + datetime.timedelta(days=2, hours=9), 8),
+                (self.ending_at - datetime.timedelta(hours=3), 6)]:
+                mixer.blend('api.Clockin', employee=talent, shift=shifts[i % 2], started_at=started_at + datetime.timedelta(minutes=i * 7),
+                    ended_at=started_at + datetime.timedelta(minutes=i * 7, hours=hours))
+
+    def test_columnar_matches_loop(self):
+        """
+        Hours, amounts and split flags are the same for every clockin
+        """
+        expected = row_by_row(Clockin.objects.select_related('shift').order_by('started_at', 'id'), self.starting_at, self.ending_at)
+
+        payments = payroll_actions.build_payments(load_rows(), self.starting_at, self.ending_at)
+
+        self.assertEquals(len(payments), 9)
+        for payment, (total_hours, over_time, amount, splited) in zip(payments, expected):
+            self.assertEquals(payment.over_time, 0)
+            self.assertAlmostEqual(payment.regular_hours, total_hours, places=2)
+            self.assertAlmostEqual(payment.total_amount, float(amount), places=2)
+            self.assertEquals(payment.splited_payment, splited)
+
+@skipUnless(CLOCKINS, 'set PAYROLL_BENCHMARK_CLOCKINS to compare the timings')
+class PayrollComputeBenchmark(TestCase):
+    """
+    Compares the columnar payroll math with the previous row by row loop on a large number of clockins
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        rand = random.Random(42)
+        cls.starting_at = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0) - datetime.timedelta(days=14)
+        cls.ending_at = cls.starting_at + datetime.timedelta(days=14)
+        employer = mixer.blend('api.Employer')
+        talents = [mixer.blend('api.Employee', user=mixer.blend('auth.User')) for i in range(TALENTS)]
+        shifts = mixer.cycle(SHIFTS).blend('api.Shift', employer=employer, minimum_hourly_rate=mixer.RANDOM(8, 10, 12, 15))
+
+        clockins = []
+        for i in range(CLOCKINS):
+            started_at = cls.starting_at + datetime.timedelta(minutes=rand.randint(-600, 14 * 24 * 60))
+            clockins.append(Clockin(employee=rand.choice(talents), shift=rand.choice(shifts),
+                started_at=started_at, ended_at=started_at + datetime.timedelta(minutes=rand.randint(120, 600))))
+        Clockin.objects.bulk_create(clockins, batch_size=500)
+
+    def test_columnar_is_faster(self):
+        """
+        Loading the columns and computing the payments (weekly overtime included) is faster than the old loop
+        """
+        started = time.perf_counter()
+        clockins = Clockin.objects.select_related('shift').order_by('started_at', 'id')
+        row_by_row(clockins, self.starting_at, self.ending_at)
+        loop_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        payments = payroll_actions.build_payments(load_rows(), self.starting_at, self.ending_at)
+        columnar_seconds = time.perf_counter() - started
+
+        self.assertEquals(len(payments), CLOCKINS)
+        self.assertLess(columnar_seconds, loop_seconds,
+            '{} clockins: row by row {:.3f}s, columnar {:.3f}s'.format(CLOCKINS, loop_seconds, columnar_seconds))
@@ -0,0 +1,69 @@
+import datetime
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+from mixer.backend.django import mixer
+from api.models import PayrollPeriod
+from api.actions import payroll_actions
+
+class GeneratePayrollPeriodsTestSuite(TestCase):
+    """
+    Tests for manage.py generate_payroll_periods
+    """
+
+    def setUp(self):
+        now = timezone.now()
+        self.employers = []
+        for i in range(3):
+            employer = mixer.blend('api.Employer', payroll_period_length=7, payroll_period_type='DAYS',
+                payroll_period_starting_time=now.replace(hour=0, minute=0, second=0, microsecond=0))
+            started_at = now - datetime.timedelta(days=10)
+            employer.created_at = started_at - datetime.timedelta(days=1)
+            employer.save()
+            shift = mixer.blend('api.Shift', employer=employer, starting_at=started_at,
+                ending_at=started_at + datetime.timedelta(hours=4), minimum_hourly_rate=10)
+            mixer.blend('api.Clockin', shift=shift, started_at=started_at, ended_at=started_at + datetime.timedelta(hours=4))
+            self.employers.append(employer)
+
+    def test_every_employer(self):
+        """
+        Every employer gets its periods and its own line on the report
+        """
+        out = StringIO()
+        call_command('generate_payroll_periods', concurrency=1, stdout=out)
+
+        self.assertEquals(PayrollPeriod.objects.values('employer').distinct().count(), 3)
+        self.assertIn('3 employers', out.getvalue())
+        self.assertIn('1 payments', out.getvalue())
+
+    def test_failing_employer_is_isolated(self):
+        """
+        One employer failing does not stop the others, the command fails at the end
+        """
+        generate_periods = payroll_actions.generate_periods
+        failing = self.employers[0]
+
+        def flaky(employer, now=None):
+            if employer.id == failing.id:
+                raise Exception('Broken employer')
+            return generate_periods(employer, now)
+
+        err = StringIO()
+        with patch('api.actions.payroll_actions.generate_periods', side_effect=flaky):
+            with self.assertRaises(CommandError):
+                call_command('generate_payroll_periods', concurrency=1, stdout=StringIO(), stderr=err)
+
+        self.assertIn('Broken employer', err.getvalue())
+        self.assertFalse(PayrollPeriod.objects.filter(employer=failing).exists())
+        self.assertEquals(PayrollPeriod.objects.exclude(employer=failing).values('employer').distinct().count(), 2)
+
+    def test_only_some_employers(self):
+        """
+        --employer limits the run to those employers
+        """
+        call_command('generate_payroll_periods', concurrency=1, employers=[self.employers[1].id], stdout=StringIO())
+
+        self.assertEquals(list(PayrollPeriod.objects.values_list('employer', flat=True).distinct()), [self.employers[1].id])
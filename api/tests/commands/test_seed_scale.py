@@ -0,0 +1,69 @@
+import datetime
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+from django.db.models import Sum
+from api.models import Employer, Employee, Profile, Shift, ShiftInvite, Clockin, PayrollPeriod, EmployeeDailyHours
+
+class SeedScaleTestSuite(TestCase):
+    """
+    Tests for the synthetic dataset generator (manage.py seed_scale)
+    """
+
+    def _seed(self, **options):
+        defaults = dict(employers=2, venues=2, employees=30, shifts=10, invites=4, applications=2, workers=2, periods=3, batch_size=7, stdout=StringIO())
+        defaults.update(options)
+        call_command('seed_scale', **defaults)
+
+    def test_volumes(self):
+        """
+        The requested volumes are created and linked together
+        """
+        self._seed()
+
+        self.assertEquals(Employer.objects.count(), 2)
+        self.assertEquals(Employee.objects.count(), 30)
+        self.assertEquals(Profile.objects.exclude(geohash='').count(), 30)
+        self.assertEquals(Shift.objects.count(), 20)
+        self.assertEquals(ShiftInvite.objects.count(), 80)
+        self.assertEquals(PayrollPeriod.objects.count(), 6)
+        self.assertEquals(Shift.objects.filter(venue__employer=None).count(), 0)
+        for clockin in Clockin.objects.select_related('shift'):
+            self.assertTrue(clockin.shift.employees.filter(id=clockin.employee_id).exists())
+        # the payroll screens read the daily hours, not the clockins
+        self.assertEquals(EmployeeDailyHours.objects.aggregate(total=Sum('clockins'))['total'], Clockin.objects.count())
+
+    def test_same_seed_same_dataset(self):
+        """
+        The dataset only depends on the seed
+        """
+        self._seed(prefix='first')
+        first = list(Shift.objects.order_by('id').values_list('status', 'starting_at', 'position__title'))
+        Shift.objects.all().delete()
+
+        self._seed(prefix='second')
+        second = list(Shift.objects.order_by('id').values_list('status', 'starting_at', 'position__title'))
+
+        self.assertEquals(first, second)
+
+    def test_dates_come_from_the_anchor(self):
+        """
+        The shifts are placed around the anchor and their status doesn't depend on the day it runs
+        """
+        self._seed(anchor=datetime.datetime(2025, 3, 10, tzinfo=timezone.utc))
+
+        anchor_noon = datetime.datetime(2025, 3, 10, 12, tzinfo=timezone.utc)
+        for status, ending_at in Shift.objects.values_list('status', 'ending_at'):
+            self.assertTrue(anchor_noon - datetime.timedelta(days=61) < ending_at < anchor_noon + datetime.timedelta(days=32))
+            self.assertEquals(status in ['COMPLETED', 'EXPIRED'], ending_at < anchor_noon)
+        self.assertEquals(Clockin.objects.filter(ended_at__gt=anchor_noon + datetime.timedelta(minutes=10)).count(), 0)
+
+    def test_prefix_must_be_unique(self):
+        """
+        Running it twice with the same prefix fails instead of duplicating users
+        """
+        self._seed()
+        with self.assertRaises(CommandError):
+            self._seed()
@@ -0,0 +1,139 @@
+import datetime
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from mixer.backend.django import mixer
+from rest_framework.test import APIClient
+from api.models import Employer, Shift, Clockin
+from api.actions import roster_actions, shift_actions, clockin_actions, employer_actions
+
+class EmployerSummaryTestSuite(TestCase):
+    """
+    Endpoint tests for the employer dashboard summary
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.employer = mixer.blend('api.Employer')
+        self.user = mixer.blend('auth.User')
+        mixer.blend('api.Profile', user=self.user, employer=self.employer)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        sender = mixer.blend('api.Profile', user=mixer.blend('auth.User'))
+        talents = [mixer.blend('api.Employee', user=mixer.blend('auth.User')) for i in range(3)]
+        self.shifts = [mixer.blend('api.Shift', employer=self.employer, status=status) for status in ['OPEN', 'OPEN', 'FILLED', 'DRAFT']]
+        mixer.blend('api.ShiftApplication', shift=self.shifts[0], employee=talents[0])
+        for talent in talents:
+            mixer.blend('api.ShiftInvite', shift=self.shifts[1], employee=talent, sender=sender, status='PENDING')
+        mixer.blend('api.ShiftInvite', shift=self.shifts[1], employee=talents[0], sender=sender, status='APPLIED')
+        self.clockin = mixer.blend('api.Clockin', shift=self.shifts[2], employee=talents[1], ended_at=None)
+        period = mixer.blend('api.PayrollPeriod', employer=self.employer)
+        mixer.blend('api.PayrollPeriodPayment', paryroll_period=period, shift=self.shifts[2], employee=talents[1],
+            status='PENDING', regular_hours=8, over_time=2)
+        mixer.blend('api.PayrollPeriodPayment', paryroll_period=period, shift=self.shifts[2], employee=talents[2],
+            status='PAID', regular_hours=5, over_time=0)
+
+        # another employer doesn't count
+        other = mixer.blend('api.Shift', status='OPEN')
+        mixer.blend('api.ShiftApplication', shift=other, employee=talents[2])
+
+    def test_summary(self):
+        """
+        All the counts come from two queries
+        """
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/employers/me/summary')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            "open_shifts": 2,
+            "filled_shifts": 1,
+            "draft_shifts": 1,
+            "pending_applicants": 1,
+            "pending_invites": 3,
+            "open_clockins": 1,
+            "unpaid_hours": 10.0
+        })
+
+    def test_cached_until_a_write(self):
+        """
+        The summary is cached and recomputed after the employer data changes
+        """
+        self.client.get('/api/employers/me/summary')
+        with self.assertNumQueries(0):
+            self.client.get('/api/employers/me/summary')
+
+        clockin = Clockin.objects.get(id=self.clockin.id)
+        clockin.ended_at = timezone.now()
+        clockin.save()
+        response = self.client.get('/api/employers/me/summary')
+        self.assertEqual(response.data["open_clockins"], 0)
+
+        self.shifts[3].status = 'OPEN'
+        self.shifts[3].save()
+
+        response = self.client.get('/api/employers/me/summary')
+        self.assertEqual(response.data["open_shifts"], 3)
+
+    def test_fill_shift_drops_the_summary(self):
+        """
+        An accept on a shift with all the spots taken moves it to FILLED with an update and drops the summary
+        """
+        Shift.objects.filter(id=self.shifts[0].id).update(maximum_allowed_employees=1)
+        mixer.blend('api.ShiftEmployee', shift=self.shifts[0], employee=mixer.blend('api.Employee', user=mixer.blend('auth.User')))
+        self.client.get('/api/employers/me/summary')
+
+        talent = mixer.blend('api.Employee', user=mixer.blend('auth.User'))
+        self.assertEqual(roster_actions.fill_shift(self.shifts[0].id, talent.id), roster_actions.SHIFT_FILLED)
+
+        response = self.client.get('/api/employers/me/summary')
+        self.assertEqual(response.data["open_shifts"], 1)
+        self.assertEqual(response.data["filled_shifts"], 2)
+
+    def test_shift_lifecycle_drops_the_summary(self):
+        """
+        Expiring the shifts and their invites in batches drops the summary of their employer
+        """
+        now = timezone.now()
+        Shift.objects.filter(employer=self.employer).update(ending_at=now + datetime.timedelta(days=1), maximum_allowed_employees=0)
+        Shift.objects.filter(id=self.shifts[1].id).update(ending_at=now - datetime.timedelta(hours=1))
+        self.client.get('/api/employers/me/summary')
+
+        shift_actions.update_shift_statuses(now=now)
+
+        response = self.client.get('/api/employers/me/summary')
+        self.assertEqual(response.data["open_shifts"], 1)
+        self.assertEqual(response.data["pending_invites"], 0)
+
+    def test_auto_clockout_drops_the_summary(self):
+        """
+        Closing the overdue clockins in batches drops the summary of their employer
+        """
+        now = timezone.now()
+        Employer.objects.filter(id=self.employer.id).update(maximum_clockout_delay_minutes=10)
+        Shift.objects.filter(id=self.shifts[2].id).update(ending_at=now - datetime.timedelta(hours=1))
+        Clockin.objects.filter(id=self.clockin.id).update(started_at=now - datetime.timedelta(hours=3))
+        self.client.get('/api/employers/me/summary')
+
+        clockin_actions.close_overdue_clockins(now=now)
+
+        response = self.client.get('/api/employers/me/summary')
+        self.assertEqual(response.data["open_clockins"], 0)
+
+class EmployerSummaryCommitTestSuite(TransactionTestCase):
+    """
+    The summary dropped inside a transaction is dropped again when it commits
+    """
+
+    def test_dropped_after_commit(self):
+        """
+        A summary cached by another request before the write commits doesn't survive the commit
+        """
+        employer = mixer.blend('api.Employer')
+        with transaction.atomic():
+            employer_actions.forget_employer_summary(employer.id)
+            cache.set(employer_actions.summary_key(employer.id), { "open_shifts": 0 })
+
+        self.assertIsNone(cache.get(employer_actions.summary_key(employer.id)))
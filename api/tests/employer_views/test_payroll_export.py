@@ -0,0 +1,112 @@
+import io
+import csv
+import json
+import datetime
+from django.test import TestCase
+from django.utils import timezone
+from mixer.backend.django import mixer
+from rest_framework.test import APIClient
+
+class PayrollExportTestSuite(TestCase):
+    """
+    Endpoint tests for the streaming payroll downloads
+    """
+
+    def setUp(self):
+        self.start = timezone.now().replace(microsecond=0) - datetime.timedelta(days=10)
+        self.employer = mixer.blend('api.Employer')
+        self.user = mixer.blend('auth.User')
+        mixer.blend('api.Profile', user=self.user, employer=self.employer)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.shift = mixer.blend('api.Shift', employer=self.employer, minimum_hourly_rate=10)
+        self.clockins = [mixer.blend('api.Clockin', shift=self.shift, started_at=self.start + datetime.timedelta(days=i),
+            ended_at=self.start + datetime.timedelta(days=i, hours=4)) for i in range(3)]
+        # another employer, it should not be exported
+        mixer.blend('api.Clockin', shift=mixer.blend('api.Shift'), started_at=self.start, ended_at=self.start)
+
+    def _content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_clockins_csv(self):
+        """
+        One line per clockin of the employer after the header
+        """
+        response = self.client.get('/api/employers/me/clockins/export')
+
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(response['Content-Type'], 'text/csv')
+        lines = list(csv.reader(io.StringIO(self._content(response))))
+        self.assertEquals(len(lines), 4)
+        self.assertEquals(lines[0][:2], ['clockin', 'employee'])
+        self.assertEquals(lines[1][0], str(self.clockins[0].id))
+
+    def test_clockins_ndjson_range(self):
+        """
+        NDJSON is one object per line, the range is applied on the clockin start
+        """
+        response = self.client.get('/api/employers/me/clockins/export', {
+            "output": "ndjson",
+            "starting_at": (self.start + datetime.timedelta(days=1)).isoformat()
+        })
+
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEquals([row["clockin"] for row in rows], [self.clockins[1].id, self.clockins[2].id])
+        self.assertEquals(rows[0]["hours"], 4)
+
+    def test_period_payments(self):
+        """
+        The payments of the employer periods are exported
+        """
+        period = mixer.blend('api.PayrollPeriod', employer=self.employer, starting_at=self.start, ending_at=self.start + datetime.timedelta(days=7))
+        mixer.blend('api.PayrollPeriodPayment', paryroll_period=period, shift=self.shift, regular_hours=4, hourly_rate=10, total_amount=40)
+        mixer.blend('api.PayrollPeriodPayment', paryroll_period=mixer.blend('api.PayrollPeriod'), regular_hours=1)
+
+        response = self.client.get('/api/employers/me/periods/export', { "output": "ndjson" })
+
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEquals(len(rows), 1)
+        self.assertEquals(rows[0]["period"], period.id)
+        self.assertEquals(rows[0]["regular_hours"], "4.0")
+
+    def test_date_range(self):
+        """
+        The range can be dates, the ending day is included, and anything else is a 400
+        """
+        response = self.client.get('/api/employers/me/clockins/export', {
+            "output": "ndjson",
+            "starting_at": (self.start + datetime.timedelta(days=1)).date().isoformat(),
+            "ending_at": (self.start + datetime.timedelta(days=1)).date().isoformat()
+        })
+
+        self.assertEquals(response.status_code, 200)
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEquals([row["clockin"] for row in rows], [self.clockins[1].id])
+
+        response = self.client.get('/api/employers/me/periods/export', { "starting_at": "2026-13-01" })
+        self.assertEquals(response.status_code, 400)
+        response = self.client.get('/api/employers/me/clockins/export', { "ending_at": "yesterday" })
+        self.assertEquals(response.status_code, 400)
+
+    def test_csv_formulas(self):
+        """
+        The names that start like a spreadsheet formula are written as text
+        """
+        self.clockins[0].employee.user.first_name = '=HYPERLINK("http://evil")'
+        self.clockins[0].employee.user.last_name = '-Smith'
+        self.clockins[0].employee.user.save()
+
+        response = self.client.get('/api/employers/me/clockins/export')
+
+        lines = list(csv.reader(io.StringIO(self._content(response))))
+        self.assertEquals(lines[1][2:4], ["'=HYPERLINK(\"http://evil\")", "'-Smith"])
+
+    def test_invalid_output(self):
+        """
+        Only csv and ndjson can be exported
+        """
+        response = self.client.get('/api/employers/me/clockins/export', { "output": "xlsx" })
+
+        self.assertEquals(response.status_code, 400)
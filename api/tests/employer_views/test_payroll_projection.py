@@ -0,0 +1,97 @@
+import datetime
+from django.test import TestCase
+from django.utils import timezone
+from mixer.backend.django import mixer
+from rest_framework.test import APIClient
+from api.actions import daily_hours_actions
+
+class PayrollProjectionTestSuite(TestCase):
+    """
+    Endpoint tests for the payroll projection of an employer
+    """
+
+    def setUp(self):
+        self.start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0) - datetime.timedelta(days=10)
+        self.employer = mixer.blend('api.Employer')
+        self.user = mixer.blend('auth.User')
+        mixer.blend('api.Profile', user=self.user, employer=self.employer)
+        self.employee = mixer.blend('api.Employee')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _clockin(self, employer, started_at, hours, rate=10, employee=None):
+        shift = mixer.blend('api.Shift', employer=employer, minimum_hourly_rate=rate)
+        clockin = mixer.blend('api.Clockin', shift=shift, employee=employee or self.employee,
+            started_at=started_at, ended_at=started_at + datetime.timedelta(hours=hours))
+        daily_hours_actions.refresh_daily_hours([(clockin.employee_id, shift.id)])
+        return clockin
+
+    def _get(self, **params):
+        return self.client.get('/api/employer/{}/payroll_projection'.format(self.employer.id), params)
+
+    def test_totals_per_day(self):
+        """
+        Hours and amounts are read per day from the rollup, for this employer only
+        """
+        day = self.start + datetime.timedelta(days=1)
+        self._clockin(self.employer, day + datetime.timedelta(hours=8), 4, rate=10)
+        self._clockin(self.employer, day + datetime.timedelta(hours=14), 2, rate=15)
+        self._clockin(self.employer, self.start + datetime.timedelta(days=3, hours=8), 1)
+        # another employer, it should not be counted
+        self._clockin(mixer.blend('api.Employer'), day + datetime.timedelta(hours=8), 5)
+        # overnight clockin at the end of the period
+        self._clockin(self.employer, self.start + datetime.timedelta(days=6, hours=22), 4)
+
+        # the daily hours of the period, one aggregate for the clockins between periods
+        with self.assertNumQueries(2):
+            response = self._get(starting_at=self.start.isoformat())
+
+        self.assertEquals(response.status_code, 200)
+        days = response.data["days"]
+        self.assertEquals(len(days), 7)
+        self.assertEquals(days[day.strftime("%Y-%m-%d")], {
+            "clockins": 2, "hours": 6, "amount": 70,
+            "between_periods": { "clockins": 0, "hours": 0, "amount": 0 }
+        })
+        self.assertEquals(days[(self.start + datetime.timedelta(days=3)).strftime("%Y-%m-%d")]["hours"], 1)
+        # only counted between periods, not on the day it started
+        self.assertEquals(days[(self.start + datetime.timedelta(days=6)).strftime("%Y-%m-%d")], {
+            "clockins": 0, "hours": 0, "amount": 0,
+            "between_periods": { "clockins": 1, "hours": 4, "amount": 40 }
+        })
+
+    def test_filtered_by_talent(self):
+        """
+        The totals only include the clockins of the talent
+        """
+        day = self.start + datetime.timedelta(days=2)
+        self._clockin(self.employer, day + datetime.timedelta(hours=8), 4)
+        self._clockin(self.employer, day + datetime.timedelta(hours=8), 3, employee=mixer.blend('api.Employee'))
+
+        response = self._get(starting_at=self.start.isoformat(), employee=self.employee.id)
+
+        self.assertEquals(response.data["days"][day.strftime("%Y-%m-%d")]["hours"], 4)
+
+    def test_clockins_of_one_day(self):
+        """
+        The detailed clockins are only loaded for the requested day
+        """
+        day = self.start + datetime.timedelta(days=1)
+        first = self._clockin(self.employer, day + datetime.timedelta(hours=8), 4)
+        second = self._clockin(self.employer, day + datetime.timedelta(hours=14), 2)
+        self._clockin(self.employer, day + datetime.timedelta(days=1, hours=8), 4)
+
+        response = self._get(day=day.strftime("%Y-%m-%d"))
+
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals([clockin["id"] for clockin in response.data["clockins"]], [first.id, second.id])
+        self.assertEquals(self._get(day='yesterday').status_code, 400)
+
+    def test_day_that_does_not_exist(self):
+        """
+        A well formed date that is not a real day is a bad request
+        """
+        response = self._get(day='2020-02-31')
+
+        self.assertEquals(response.status_code, 400)
+        self.assertIn('2020-02-31', str(response.data))
@@ -0,0 +1,113 @@
+import json
+import datetime
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from mixer.backend.django import mixer
+from rest_framework.test import APIClient
+from api.models import Shift, ShiftInvite, NotificationOutbox
+from api.actions import shift_actions
+
+class ShiftSeriesTestSuite(TestCase):
+    """
+    Endpoint tests for the creation of a recurring shift series
+    """
+
+    def setUp(self):
+        self.start = (timezone.now() + datetime.timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
+        self.employer = mixer.blend('api.Employer')
+        self.user = mixer.blend('auth.User')
+        mixer.blend('api.Profile', user=self.user, employer=self.employer)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.venue = mixer.blend('api.Venue', employer=self.employer, latitude=0, longitude=0)
+        self.position = mixer.blend('api.Position')
+        self.badge = mixer.blend('api.Badge')
+        self.talents = [mixer.blend('api.Employee', user=mixer.blend('auth.User'), rating=None, minimum_hourly_rate=5,
+            stop_receiving_invites=False) for i in range(3)]
+        mixer.blend('api.Employee', user=mixer.blend('auth.User'), rating=None, minimum_hourly_rate=5, stop_receiving_invites=True)
+
+    def _post(self, repeat):
+        return self.client.post('/api/employers/me/shifts/series', {
+            "venue": self.venue.id,
+            "position": self.position.id,
+            "minimum_hourly_rate": 10,
+            "maximum_allowed_employees": 2,
+            "starting_at": self.start.isoformat(),
+            "ending_at": (self.start + datetime.timedelta(hours=6)).isoformat(),
+            "required_badges": [self.badge.id],
+            "repeat": repeat
+        }, format='json')
+
+    def test_weekly_series(self):
+        """
+        Every occurrence is created with its badges and every talent gets one notification for all of them
+        """
+        response = self._post({ "frequency": "WEEKLY", "count": 4 })
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 4)
+        shifts = list(Shift.objects.filter(employer=self.employer).order_by('starting_at'))
+        self.assertEqual([shift.starting_at for shift in shifts], [self.start + datetime.timedelta(weeks=i) for i in range(4)])
+        self.assertTrue(all(shift.status == 'OPEN' and shift.ending_at - shift.starting_at == datetime.timedelta(hours=6) for shift in shifts))
+        self.assertEqual(Shift.required_badges.through.objects.filter(shift__in=shifts, badge=self.badge).count(), 4)
+
+        self.assertEqual(ShiftInvite.objects.filter(shift__in=shifts).count(), 12)
+        emails = NotificationOutbox.objects.filter(slug='invite_to_shift_series', channel='EMAIL')
+        self.assertEqual(sorted(emails.values_list('email', flat=True)), sorted(talent.user.email for talent in self.talents))
+        self.assertEqual(json.loads(emails[0].data)["SHIFTS"], 4)
+
+    def test_constant_queries(self):
+        """
+        The number of queries doesn't grow with the number of occurrences
+        """
+        self._post({ "frequency": "DAILY", "count": 2 })
+        Shift.objects.all().delete()
+
+        with self.assertNumQueries(21):
+            response = self._post({ "frequency": "DAILY", "count": 20 })
+        self.assertEqual(len(response.data), 20)
+
+    def test_rule_needs_an_end(self):
+        """
+        A series without count or until is rejected
+        """
+        response = self._post({ "frequency": "WEEKLY" })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Shift.objects.count(), 0)
+
+    def test_too_many_shifts(self):
+        """
+        A series until a date with more shifts than the limit is rejected instead of cut
+        """
+        response = self._post({ "frequency": "DAILY", "until": (self.start + datetime.timedelta(days=365)).isoformat() })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('repeat', response.data)
+        self.assertEqual(Shift.objects.count(), 0)
+
+    def test_occurrences_on_weekdays(self):
+        """
+        Weekly series can repeat on several days of the week until a date
+        """
+        monday = datetime.datetime(2026, 10, 19, 9, tzinfo=timezone.utc)
+
+        occurrences = shift_actions.series_occurrences(monday, monday + datetime.timedelta(hours=8), 'WEEKLY',
+            interval=2, weekdays=[0, 2], until=monday + datetime.timedelta(days=16))
+
+        self.assertEqual([start.day for start, end in occurrences], [19, 21, 2, 4])
+        self.assertTrue(all(end - start == datetime.timedelta(hours=8) for start, end in occurrences))
+
+    @override_settings(TIME_ZONE='America/New_York')
+    def test_occurrences_keep_the_local_hour(self):
+        """
+        A weekly series keeps the local starting hour when daylight saving time ends
+        """
+        monday = timezone.make_aware(datetime.datetime(2026, 10, 26, 9))
+
+        occurrences = shift_actions.series_occurrences(monday, monday + datetime.timedelta(hours=8), 'WEEKLY', count=3)
+
+        self.assertEqual([timezone.localtime(start).hour for start, end in occurrences], [9, 9, 9])
+        self.assertEqual([start.hour for start, end in occurrences], [13, 14, 14])
+        self.assertTrue(all(end - start == datetime.timedelta(hours=8) for start, end in occurrences))
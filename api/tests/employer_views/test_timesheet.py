@@ -0,0 +1,75 @@
+import datetime
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import mixer
+from rest_framework.test import APIClient
+from api.models import Clockin, EmployeeDailyHours
+
+class TimesheetTestSuite(TestCase):
+    """
+    Endpoint tests for the batch timesheet edit (PUT payroll)
+    """
+
+    def setUp(self):
+        self.start = timezone.now().replace(microsecond=0) - datetime.timedelta(days=3)
+        self.employer = mixer.blend('api.Employer')
+        self.user = mixer.blend('auth.User')
+        mixer.blend('api.Profile', user=self.user, employer=self.employer)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        self.shift = mixer.blend('api.Shift', employer=self.employer, minimum_hourly_rate=10)
+        self.employees = [mixer.blend('api.Employee', user=mixer.blend('auth.User')) for i in range(3)]
+        self.clockins = [mixer.blend('api.Clockin', shift=self.shift, employee=employee, started_at=self.start,
+            ended_at=self.start + datetime.timedelta(hours=4), status='PENDING') for employee in self.employees]
+
+    def _put(self, entries):
+        return self.client.put('/api/payroll', entries, format='json')
+
+    def test_bulk_edit(self):
+        """
+        Edits and new clockins are applied with a constant number of queries
+        """
+        entries = [{ "id": clockin.id, "ended_at": (self.start + datetime.timedelta(hours=6)).isoformat(), "status": "APPROVED" } for clockin in self.clockins]
+        entries.append({ "employee": self.employees[0].id, "shift": self.shift.id,
+            "started_at": (self.start + datetime.timedelta(days=1)).isoformat(), "ended_at": (self.start + datetime.timedelta(days=1, hours=2)).isoformat() })
+
+        response = self._put(entries)
+
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(len(response.data), 4)
+        self.assertEquals(Clockin.objects.filter(status='APPROVED').count(), 3)
+        self.assertEquals(Clockin.objects.get(id=self.clockins[1].id).ended_at, self.start + datetime.timedelta(hours=6))
+        self.assertIsNotNone(response.data[3]["id"])
+        self.assertEquals(float(EmployeeDailyHours.objects.filter(employee=self.employees[0]).order_by('day').first().hours), 6)
+
+    def test_constant_queries(self):
+        """
+        The number of queries does not grow with the size of the timesheet
+        """
+        def count(clockins):
+            entries = [{ "id": clockin.id, "status": "APPROVED" } for clockin in clockins]
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEquals(self._put(entries).status_code, 200)
+            return len(queries)
+
+        self.assertEquals(count(self.clockins[:1]), count(self.clockins))
+
+    def test_all_or_nothing(self):
+        """
+        One invalid entry rejects the whole timesheet
+        """
+        other_shift = mixer.blend('api.Shift')
+        response = self._put([
+            { "id": self.clockins[0].id, "status": "APPROVED" },
+            { "id": self.clockins[1].id, "shift": other_shift.id },
+            { "id": self.clockins[2].id, "ended_at": (self.start - datetime.timedelta(hours=1)).isoformat() },
+        ])
+
+        self.assertEquals(response.status_code, 400)
+        self.assertEquals(response.data[0], {})
+        self.assertIn('shift', response.data[1])
+        self.assertIn('non_field_errors', response.data[2])
+        self.assertFalse(Clockin.objects.filter(status='APPROVED').exists())
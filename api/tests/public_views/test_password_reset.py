@@ -37,13 +37,13 @@ class PasswordResetTestSuite(TestCase):
         test_profile.save()
         return test_user
 
-    @patch('api.utils.email.requests')
+    @patch('api.utils.email.get_transport')
     @override_settings(EMAIL_NOTIFICATIONS_ENABLED=True)
-    def test_send_link_with_good_input_notify_enabled(self, mocked_requests):
+    def test_send_link_with_good_input_notify_enabled(self, mocked_transport):
         """
         Send password change email with good data
         """
-        mocked_requests.post.return_value.status_code = 200
+        mocked_transport.return_value.send.return_value = True
 
         payload = {
             'email': 'test_user@testdoma.in',
@@ -58,13 +58,13 @@ class PasswordResetTestSuite(TestCase):
             200,
             'It should return a success response')
         self.assertEquals(
-            mocked_requests.post.called,
+            mocked_transport.return_value.send.called,
             True,
             'It should have called requests.post to send mail')
 
-    @patch('api.utils.email.requests')
+    @patch('api.utils.email.get_transport')
     @override_settings(EMAIL_NOTIFICATIONS_ENABLED=False)
-    def test_send_link_with_good_input_notify_disabled(self, mocked_requests):
+    def test_send_link_with_good_input_notify_disabled(self, mocked_transport):
         """
         Send password change email (actually dont) with good data.
         """
@@ -81,12 +81,12 @@ class PasswordResetTestSuite(TestCase):
             200,
             'It should return a success response')
         self.assertEquals(
-            mocked_requests.post.called,
+            mocked_transport.return_value.send.called,
             False,
             'It should NOT have called requests.post to send mail')
 
-    @patch('api.utils.email.requests')
-    def test_change_pw_non_existing_user(self, mocked_requests):
+    @patch('api.utils.email.get_transport')
+    def test_change_pw_non_existing_user(self, mocked_transport):
         """
         Send password change email (actually dont) with good data.
         """
@@ -104,12 +104,12 @@ class PasswordResetTestSuite(TestCase):
             'It should return an error response')
 
         self.assertEquals(
-            mocked_requests.post.called,
+            mocked_transport.return_value.send.called,
             False,
             'It should NOT have called requests.post to send mail')
 
-    @patch('api.utils.email.requests')
-    def test_change_pw_no_mail(self, mocked_requests):
+    @patch('api.utils.email.get_transport')
+    def test_change_pw_no_mail(self, mocked_transport):
         """
         Send password change email (actually dont) with good data.
         """
@@ -125,7 +125,7 @@ class PasswordResetTestSuite(TestCase):
             400,
             'It should return an error response')
         self.assertEquals(
-            mocked_requests.post.called,
+            mocked_transport.return_value.send.called,
             False,
             'It should NOT have called requests.post to send mail')
 
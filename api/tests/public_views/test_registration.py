@@ -57,9 +57,9 @@ class RegistrationTestSuite(TestCase):
 
         self.assertEquals(response.status_code, 400)
 
-    @patch('api.utils.email.requests')
+    @patch('api.utils.email.get_transport')
     @override_settings(EMAIL_NOTIFICATIONS_ENABLED=True)
-    def test_employee_all_good(self, mocked_requests):
+    def test_employee_all_good(self, mocked_transport):
         payload = {
             'username': 'test',
             'first_name': 'Alpha',
@@ -74,7 +74,7 @@ class RegistrationTestSuite(TestCase):
         self.assertEquals(response.status_code, 201)
 
         self.assertEquals(
-            mocked_requests.post.called,
+            mocked_transport.return_value.send.called,
             True,
             'It should have called requests.post to send mail')
 
@@ -95,9 +95,9 @@ class RegistrationTestSuite(TestCase):
             Profile.objects.filter(user_id=uid).count(),
             1)
 
-    @patch('api.utils.email.requests')
+    @patch('api.utils.email.get_transport')
     @override_settings(EMAIL_NOTIFICATIONS_ENABLED=True)
-    def test_employee_passing_id(self, mocked_requests):
+    def test_employee_passing_id(self, mocked_transport):
         """
         ID Should be ignored from payload
         """
@@ -121,13 +121,13 @@ class RegistrationTestSuite(TestCase):
         self.assertNotEquals(jsonresp['id'], payload['id'])
 
         self.assertEquals(
-            mocked_requests.post.called,
+            mocked_transport.return_value.send.called,
             True,
             'It should have called requests.post to send mail')
 
-    @patch('api.utils.email.requests')
+    @patch('api.utils.email.get_transport')
     @override_settings(EMAIL_NOTIFICATIONS_ENABLED=True)
-    def test_employer_all_good(self, mocked_requests):
+    def test_employer_all_good(self, mocked_transport):
         """
         """
 
@@ -145,7 +145,7 @@ class RegistrationTestSuite(TestCase):
 
         self.assertEquals(response.status_code, 201)
         self.assertEquals(
-            mocked_requests.post.called,
+            mocked_transport.return_value.send.called,
             True,
             'It should have called requests.post to send mail')
         Profile = apps.get_model('api.Profile')
@@ -153,9 +153,9 @@ class RegistrationTestSuite(TestCase):
         jsonresp = response.json()
         self.assertEquals(1, Profile.objects.filter(user_id=jsonresp['id']).count())
 
-    @patch('api.utils.email.requests')
+    @patch('api.utils.email.get_transport')
     @override_settings(EMAIL_NOTIFICATIONS_ENABLED=True)
-    def test_employer_invalid(self, mocked_requests):
+    def test_employer_invalid(self, mocked_transport):
         """
         """
 
@@ -173,13 +173,13 @@ class RegistrationTestSuite(TestCase):
 
         self.assertEquals(response.status_code, 400)
         self.assertEquals(
-            mocked_requests.post.called,
+            mocked_transport.return_value.send.called,
             False,
             'It should have called requests.post to send mail')
 
-    @patch('api.utils.email.requests')
+    @patch('api.utils.email.get_transport')
     @override_settings(EMAIL_NOTIFICATIONS_ENABLED=True)
-    def test_employer_invalid_string(self, mocked_requests):
+    def test_employer_invalid_string(self, mocked_transport):
         """
         """
 
@@ -197,14 +197,14 @@ class RegistrationTestSuite(TestCase):
 
         self.assertEquals(response.status_code, 400)
         self.assertEquals(
-            mocked_requests.post.called,
+            mocked_transport.return_value.send.called,
             False,
             'It should have called requests.post to send mail')
 
     @expectedFailure
-    @patch('api.utils.email.requests')
+    @patch('api.utils.email.get_transport')
     @override_settings(EMAIL_NOTIFICATIONS_ENABLED=True)
-    def test_employee_repeat_email(self, mocked_requests):
+    def test_employee_repeat_email(self, mocked_transport):
         """
         Repeating email on registration
 
@@ -227,14 +227,14 @@ class RegistrationTestSuite(TestCase):
         self.assertEquals(response.status_code, 400)
 
         self.assertEquals(
-            mocked_requests.post.called,
+            mocked_transport.return_value.send.called,
             False,
             'It should have called requests.post to send mail')
 
     @expectedFailure
-    @patch('api.utils.email.requests')
+    @patch('api.utils.email.get_transport')
     @override_settings(EMAIL_NOTIFICATIONS_ENABLED=True)
-    def test_wrong_account_type(self, mocked_requests):
+    def test_wrong_account_type(self, mocked_transport):
         """
         Wrong account type
         @todo:
@@ -256,6 +256,6 @@ class RegistrationTestSuite(TestCase):
         self.assertEquals(response.status_code, 400)
 
         self.assertEquals(
-            mocked_requests.post.called,
+            mocked_transport.return_value.send.called,
             False,
             'It should have called requests.post to send mail')
@@ -0,0 +1,107 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from django.test import TestCase, override_settings
+from mixer.backend.django import mixer
+from mock import patch
+from api.utils import email
+
+class FakeFCMHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8'))
+        # pyfcm uses "to" when there is only one device
+        registration_ids = body["registration_ids"] if "registration_ids" in body else [body["to"]]
+        FakeFCMHandler.requests.append(registration_ids)
+        response = json.dumps({
+            "multicast_id": 1,
+            "success": len(registration_ids),
+            "failure": 0,
+            "canonical_ids": 0,
+            "results": [{ "message_id": str(i) } for i in range(len(registration_ids))]
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+@override_settings(STATICFILES_STORAGE=None)
+class FCMBatchTestSuite(TestCase):
+    """
+    Tests for the batched push notifications against a fake FCM server
+    """
+
+    def setUp(self):
+        FakeFCMHandler.requests = []
+        self.server = HTTPServer(('127.0.0.1', 0), FakeFCMHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.original_end_point = email.push_service.FCM_END_POINT
+        self.original_max_recipients = email.push_service.FCM_MAX_RECIPIENTS
+        email.push_service.FCM_END_POINT = 'http://127.0.0.1:{}/fcm/send'.format(self.server.server_port)
+
+    def tearDown(self):
+        email.push_service.FCM_END_POINT = self.original_end_point
+        email.push_service.FCM_MAX_RECIPIENTS = self.original_max_recipients
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _make_user_with_devices(self, devices):
+        user = mixer.blend('auth.User')
+        for i in range(devices):
+            mixer.blend('api.FCMDevice', user=user)
+        return user
+
+    def _data(self, shift_id):
+        return {
+            "COMPANY": "JobCore",
+            "POSITION": "Server",
+            "DATE": "01/01/2019",
+            "DATA": { "type": "shift", "id": shift_id }
+        }
+
+    def test_same_payload_is_sent_once(self):
+        """
+        Recipients with the same payload share one multicast request
+        """
+        users = [self._make_user_with_devices(2) for i in range(3)]
+
+        with self.assertNumQueries(1):
+            email.send_fcm_notifications('new_shift', [(user.id, self._data(1)) for user in users])
+
+        self.assertEquals(len(FakeFCMHandler.requests), 1)
+        self.assertEquals(len(FakeFCMHandler.requests[0]), 6)
+
+    def test_payloads_are_grouped_and_chunked(self):
+        """
+        Every distinct payload gets its own requests, chunked by the provider limit
+        """
+        email.push_service.FCM_MAX_RECIPIENTS = 2
+        first = [self._make_user_with_devices(1) for i in range(3)]
+        second = self._make_user_with_devices(1)
+        without_devices = mixer.blend('auth.User')
+
+        email.send_fcm_notifications('new_shift',
+            [(user.id, self._data(1)) for user in first] + [(second.id, self._data(2)), (without_devices.id, self._data(3))])
+
+        sizes = sorted(len(request) for request in FakeFCMHandler.requests)
+        self.assertEquals(sizes, [1, 1, 2])
+
+    def test_unused_data_does_not_split_the_request(self):
+        """
+        Data the push template does not render (the talent name) is not part of the message
+        """
+        users = [self._make_user_with_devices(1) for i in range(3)]
+
+        with patch('api.utils.email.get_template_content', wraps=email.get_template_content) as mocked_render:
+            email.send_fcm_notifications('new_shift', [(user.id, dict(self._data(1), EMAIL=user.username)) for user in users])
+            self.assertEquals(mocked_render.call_count, 1)
+
+        self.assertEquals(len(FakeFCMHandler.requests), 1)
+        self.assertEquals(len(FakeFCMHandler.requests[0]), 3)
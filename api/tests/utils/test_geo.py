@@ -0,0 +1,71 @@
+from decimal import Decimal
+from django.test import TestCase
+from mixer.backend.django import mixer
+from api.models import Employee
+from api.utils import geo
+from api.utils.notifier import get_talents_to_notify
+
+# Miami downtown
+VENUE_LAT = Decimal('25.774266')
+VENUE_LNG = Decimal('-80.193659')
+
+class GeoTestSuite(TestCase):
+    """
+    Tests for the geospatial talent matching
+    """
+
+    def _make_talent(self, latitude, longitude, **kwargs):
+        user = mixer.blend('auth.User')
+        employee = mixer.blend('api.Employee', user=user, rating=None, minimum_hourly_rate=8, stop_receiving_invites=False, **kwargs)
+        mixer.blend('api.Profile', user=user, employee=employee, employer=None, latitude=latitude, longitude=longitude)
+        return employee
+
+    def test_geohash_known_value(self):
+        """
+        Encode a well known coordinate
+        """
+        self.assertEquals(geo.encode_geohash(57.64911, 10.40744, 11), 'u4pruydqqvj')
+
+    def test_profile_geohash_is_synced(self):
+        """
+        The geohash column follows the profile coordinates
+        """
+        talent = self._make_talent(VENUE_LAT, VENUE_LNG)
+        profile = talent.profile_set.first()
+        self.assertEquals(profile.geohash, geo.encode_geohash(VENUE_LAT, VENUE_LNG))
+
+        profile.latitude = 0
+        profile.longitude = 0
+        profile.save()
+        self.assertEquals(profile.geohash, '')
+
+    def test_filter_talents_near(self):
+        """
+        Only talents inside their own maximum_job_distance_miles are matched
+        """
+        # Fort Lauderdale, ~25 miles away
+        near = self._make_talent(Decimal('26.122439'), Decimal('-80.137317'), maximum_job_distance_miles=50)
+        too_far_for_him = self._make_talent(Decimal('26.122439'), Decimal('-80.137317'), maximum_job_distance_miles=10)
+        # Orlando, ~200 miles away
+        far = self._make_talent(Decimal('28.538336'), Decimal('-81.379234'), maximum_job_distance_miles=100)
+
+        talents = geo.filter_talents_near(Employee.objects.all(), VENUE_LAT, VENUE_LNG)
+        ids = [talent.id for talent in talents]
+
+        self.assertIn(near.id, ids)
+        self.assertNotIn(too_far_for_him.id, ids)
+        self.assertNotIn(far.id, ids)
+
+    def test_get_talents_to_notify_uses_venue(self):
+        """
+        Shift broadcasts only reach talents around the venue
+        """
+        near = self._make_talent(Decimal('25.790654'), Decimal('-80.130045'))
+        far = self._make_talent(Decimal('40.712776'), Decimal('-74.005974'))
+
+        venue = mixer.blend('api.Venue', latitude=VENUE_LAT, longitude=VENUE_LNG)
+        shift = mixer.blend('api.Shift', venue=venue, status='OPEN', minimum_hourly_rate=10, minimum_allowed_rating=0)
+
+        ids = [talent.id for talent in get_talents_to_notify(shift)]
+        self.assertIn(near.id, ids)
+        self.assertNotIn(far.id, ids)
@@ -0,0 +1,95 @@
+import json
+import threading
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from django.test import TestCase, override_settings
+from mock import patch
+from api.utils import email, mail_transports
+from api.utils.mail_transports import MailgunTransport
+
+class FakeMailgunHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    requests = []
+    connections = set()
+
+    def do_POST(self):
+        body = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8'))
+        FakeMailgunHandler.requests.append(body)
+        FakeMailgunHandler.connections.add(self.client_address)
+        response = json.dumps({ "id": "<1@mailgun.jobcore.co>", "message": "Queued. Thank you." }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+@override_settings(STATICFILES_STORAGE=None, EMAIL_NOTIFICATIONS_ENABLED=True)
+class MailgunTransportTestSuite(TestCase):
+    """
+    Tests for the batched emails against a fake mailgun server
+    """
+
+    def setUp(self):
+        FakeMailgunHandler.requests = []
+        FakeMailgunHandler.connections = set()
+        self.server = HTTPServer(('127.0.0.1', 0), FakeMailgunHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.transport = MailgunTransport(
+            api_url='http://127.0.0.1:{}/v3/mailgun.jobcore.co'.format(self.server.server_port),
+            api_key='key', sender='JobCore', timeout=5)
+        self.patcher = patch('api.utils.email.get_transport', return_value=self.transport)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.transport.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _data(self):
+        return {
+            "COMPANY": "JobCore",
+            "POSITION": "Server",
+            "DATE": "01/01/2019",
+            "DATA": { "type": "shift", "id": 1 }
+        }
+
+    def test_batch_is_sent_in_one_request(self):
+        """
+        All the recipients go in one request with their own recipient-variables
+        """
+        recipients = [('talent{}@mail.tld'.format(i), { "TOKEN": 'token{}'.format(i) }) for i in range(3)]
+
+        self.assertTrue(email.send_email_messages('new_shift', recipients, self._data()))
+
+        self.assertEquals(len(FakeMailgunHandler.requests), 1)
+        request = FakeMailgunHandler.requests[0]
+        self.assertEquals(request["to"], [recipient[0] for recipient in recipients])
+        self.assertIn('%recipient.TOKEN%', request["html"][0])
+        self.assertEquals(json.loads(request["recipient-variables"][0])['talent1@mail.tld'], { "TOKEN": "token1" })
+
+    def test_batch_is_chunked_and_reuses_the_connection(self):
+        """
+        Batches are split by the provider limit, every request goes through the same connection
+        """
+        recipients = [('talent{}@mail.tld'.format(i), { "TOKEN": 'token{}'.format(i) }) for i in range(5)]
+
+        with patch.object(mail_transports, 'MAILGUN_BATCH_LIMIT', 2):
+            email.send_email_messages('new_shift', recipients, self._data())
+        email.send_email_message('new_shift', 'talent@mail.tld', dict(self._data(), TOKEN='token'))
+
+        self.assertEquals([len(request["to"]) for request in FakeMailgunHandler.requests], [2, 2, 1, 1])
+        self.assertEquals(len(FakeMailgunHandler.connections), 1)
+
+class RecipientVariablesTestSuite(TestCase):
+    """
+    Transports that don't support batches replace the placeholders themselves
+    """
+
+    def test_replace_recipient_variables(self):
+        content = 'token=' + mail_transports.recipient_placeholder('TOKEN')
+        self.assertEquals(mail_transports.replace_recipient_variables(content, { "TOKEN": "abc" }), 'token=abc')
@@ -0,0 +1,53 @@
+from django.test import TestCase, override_settings
+from mock import patch
+from api.utils import notification_templates
+from api.utils.notification_templates import get_template_content, rendering_key, template_variables
+
+@override_settings(STATICFILES_STORAGE=None)
+class NotificationTemplatesTestSuite(TestCase):
+    """
+    Tests for the compiled notification templates
+    """
+
+    def test_templates_are_compiled_once(self):
+        """
+        After startup rendering does not load any template file
+        """
+        notification_templates.load_templates()
+        with patch('api.utils.notification_templates.get_template') as mocked_get_template:
+            content = get_template_content('new_shift', { "COMPANY": "JobCore", "POSITION": "Server", "DATE": "01/01/2019" }, ["email", "fms"])
+            self.assertFalse(mocked_get_template.called)
+
+        self.assertEquals(content["fms"], 'Server on 01/01/2019 for JobCore')
+        self.assertIn('JobCore', content["html"])
+
+    def test_every_notification_has_an_email(self):
+        """
+        Every slug with a subject can render its email
+        """
+        for slug in ["invite_to_jobcore", "new_shift", "invite_to_shift", "cancelled_shift", "applicant_accepted", "applicant_rejected"]:
+            content = get_template_content(slug, {}, ["email"])
+            self.assertIn("html", content)
+
+    def test_template_variables(self):
+        """
+        The variables of a template include the ones from the template it extends
+        """
+        templates = notification_templates.get_compiled_templates('new_shift')
+        self.assertEquals(template_variables(templates["fms"]), set(["COMPANY", "DATE", "POSITION"]))
+        self.assertIn("SUBJECT", template_variables(templates["html"]))
+        self.assertIn("TOKEN", template_variables(templates["html"]))
+
+    def test_rendering_key_ignores_unused_data(self):
+        """
+        Payloads that only differ on variables the template does not render share the key
+        """
+        data = { "COMPANY": "JobCore", "POSITION": "Server", "DATE": "01/01/2019" }
+        self.assertEquals(
+            rendering_key('new_shift', dict(data, EMAIL='John Doe'), ["fms"]),
+            rendering_key('new_shift', dict(data, EMAIL='Jane Doe'), ["fms"])
+        )
+        self.assertNotEqual(
+            rendering_key('new_shift', dict(data, POSITION='Cook'), ["fms"]),
+            rendering_key('new_shift', data, ["fms"])
+        )
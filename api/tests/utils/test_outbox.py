@@ -0,0 +1,151 @@
+import datetime
+from django.test import TestCase
+from django.utils import timezone
+from mixer.backend.django import mixer
+from mock import patch
+from api.models import NotificationOutbox
+from api.utils import outbox, notifier
+
+class OutboxTestSuite(TestCase):
+    """
+    Tests for the notification outbox and its worker
+    """
+
+    def setUp(self):
+        self.user = mixer.blend('auth.User')
+
+    def test_enqueue_does_not_send(self):
+        """
+        Queuing a notification only inserts rows
+        """
+        with patch('api.utils.outbox.send_email_messages') as mocked_email:
+            outbox.enqueue([
+                outbox.email_message('new_shift', 'a@mail.tld', {"DATE": timezone.now()}),
+                outbox.push_message('new_shift', self.user.id, {"DATA": {"id": 1}})
+            ])
+            self.assertFalse(mocked_email.called)
+
+        self.assertEquals(NotificationOutbox.objects.filter(status='PENDING').count(), 2)
+
+    def test_dates_survive_the_queue(self):
+        """
+        Datetimes are rendered the same way after going through the outbox
+        """
+        now = timezone.now().replace(microsecond=0)
+        message = outbox.email_message('new_shift', 'a@mail.tld', {"DATE": now, "COMPANY": "JobCore"})
+        data = outbox.load_data(message)
+        self.assertEquals(data["DATE"], now)
+        self.assertEquals(data["COMPANY"], "JobCore")
+
+    @patch('api.utils.outbox.send_fcm_notifications')
+    @patch('api.utils.outbox.send_email_messages', return_value=True)
+    def test_process_batch(self, mocked_email, mocked_push):
+        """
+        The worker delivers every pending message and flags it as sent
+        """
+        outbox.enqueue([
+            outbox.email_message('new_shift', 'a@mail.tld', {}),
+            outbox.push_message('new_shift', self.user.id, {})
+        ])
+
+        sent, failed = outbox.process_batch(concurrency=1)
+
+        self.assertEquals((sent, failed), (2, 0))
+        mocked_email.assert_called_once_with('new_shift', [('a@mail.tld', {})], {})
+        mocked_push.assert_called_once_with('new_shift', [(self.user.id, {})])
+        self.assertEquals(NotificationOutbox.objects.filter(status='SENT').count(), 2)
+        self.assertEquals(outbox.process_batch(concurrency=1), (0, 0))
+
+    @patch('api.utils.outbox.send_email_messages', return_value=True)
+    def test_emails_with_the_same_data_are_batched(self, mocked_email):
+        """
+        Emails that only differ on their recipient data are sent together
+        """
+        outbox.enqueue([
+            outbox.email_message('new_shift', 'a@mail.tld', {"COMPANY": "JobCore"}, {"TOKEN": "a"}),
+            outbox.email_message('new_shift', 'b@mail.tld', {"COMPANY": "JobCore"}, {"TOKEN": "b"}),
+            outbox.email_message('new_shift', 'c@mail.tld', {"COMPANY": "Other"}, {"TOKEN": "c"})
+        ])
+
+        self.assertEquals(outbox.process_batch(concurrency=1), (3, 0))
+
+        self.assertEquals(mocked_email.call_count, 2)
+        recipients = sorted(call[0][1] for call in mocked_email.call_args_list)
+        self.assertEquals(recipients, [
+            [('a@mail.tld', {"TOKEN": "a"}), ('b@mail.tld', {"TOKEN": "b"})],
+            [('c@mail.tld', {"TOKEN": "c"})]
+        ])
+
+    @patch('api.utils.outbox.send_email_messages', side_effect=Exception('Mailgun is down'))
+    def test_failed_delivery_is_retried_later(self, mocked_email):
+        """
+        Failed messages go back to the queue with a backoff
+        """
+        outbox.queue_email_message('new_shift', 'a@mail.tld', {})
+
+        self.assertEquals(outbox.process_batch(concurrency=1), (0, 1))
+
+        message = NotificationOutbox.objects.get()
+        self.assertEquals(message.status, 'PENDING')
+        self.assertEquals(message.attempts, 1)
+        self.assertEquals(message.last_error, 'Mailgun is down')
+        self.assertTrue(message.available_at > timezone.now())
+
+    @patch('api.utils.outbox.EMAIL_BATCH_SIZE', 2)
+    @patch('api.utils.outbox.send_email_messages', side_effect=[True, Exception('Mailgun is down')])
+    def test_only_the_failed_chunk_is_retried(self, mocked_email):
+        """
+        The chunks already delivered are not sent again when a later chunk fails
+        """
+        outbox.enqueue([outbox.email_message('new_shift', str(i) + '@mail.tld', {}, {"TOKEN": i}) for i in range(4)])
+
+        self.assertEquals(outbox.process_batch(concurrency=1), (2, 2))
+
+        self.assertEquals(sorted(NotificationOutbox.objects.filter(status='SENT').values_list('email', flat=True)), ['0@mail.tld', '1@mail.tld'])
+        self.assertEquals(sorted(NotificationOutbox.objects.filter(status='PENDING').values_list('email', flat=True)), ['2@mail.tld', '3@mail.tld'])
+
+    @patch('api.utils.outbox.send_email_messages', return_value=True)
+    def test_same_address_goes_in_separate_batches(self, mocked_email):
+        """
+        Two messages to the same address are both delivered, each one with its own recipient data
+        """
+        outbox.enqueue([
+            outbox.email_message('new_shift', 'a@mail.tld', {}, {"TOKEN": "first"}),
+            outbox.email_message('new_shift', 'a@mail.tld', {}, {"TOKEN": "second"})
+        ])
+
+        self.assertEquals(outbox.process_batch(concurrency=1), (2, 0))
+
+        self.assertEquals([call[0][1] for call in mocked_email.call_args_list], [
+            [('a@mail.tld', {"TOKEN": "first"})],
+            [('a@mail.tld', {"TOKEN": "second"})]
+        ])
+
+    @patch('api.utils.outbox.send_email_messages', return_value=True)
+    def test_shift_invites_are_one_batch(self, mocked_email):
+        """
+        The invites of a shift are emailed to the talents with one call to the provider
+        """
+        sender = mixer.blend('api.Profile', user=mixer.blend('auth.User'), employer=mixer.blend('api.Employer'))
+        shift = mixer.blend('api.Shift')
+        talents = [mixer.blend('api.Employee', user=mixer.blend('auth.User')) for i in range(5)]
+        invites = [mixer.blend('api.ShiftInvite', shift=shift, sender=sender, employee=talent) for talent in talents]
+
+        notifier.notify_shift_invites(invites)
+        with patch('api.utils.outbox.send_fcm_notifications'):
+            outbox.process_batch(concurrency=1)
+
+        mocked_email.assert_called_once()
+        recipients = mocked_email.call_args[0][1]
+        self.assertEquals(sorted(email for email, data in recipients), sorted(talent.user.email for talent in talents))
+        self.assertTrue(all('token=' in data["LINK"] for email, data in recipients))
+
+    def test_stale_claims_are_released(self):
+        """
+        Messages claimed by a worker that died are picked up again
+        """
+        mixer.blend('api.NotificationOutbox', channel='EMAIL', status='PROCESSING',
+            claimed_at=timezone.now() - outbox.CLAIM_TIMEOUT - datetime.timedelta(minutes=1))
+        mixer.blend('api.NotificationOutbox', channel='EMAIL', status='PROCESSING', claimed_at=timezone.now())
+
+        self.assertEquals(len(outbox.claim_batch()), 1)
@@ -0,0 +1,66 @@
+import datetime
+from django.test import TestCase
+from django.utils import timezone
+from mixer.backend.django import mixer
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from api.models import Shift
+from api.pagination import KeysetPagination, StartingAtPagination
+
+class KeysetPaginationTestSuite(TestCase):
+    """
+    Tests for the cursor pagination used on the list endpoints
+    """
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        start = timezone.now().replace(microsecond=123456)
+        # two shifts on every starting time so the id breaks the ties
+        self.shifts = [mixer.blend('api.Shift', starting_at=start + datetime.timedelta(hours=i // 2)) for i in range(7)]
+
+    def _page(self, paginator, params={}):
+        request = Request(self.factory.get('/api/employers/me/shifts', params))
+        results = paginator.paginate_queryset(Shift.objects.all(), request)
+        return results, paginator.get_paginated_response([shift.id for shift in results]).data
+
+    def test_pages_follow_the_cursor(self):
+        """
+        Following the next cursor walks every row once, in order
+        """
+        ids = []
+        params = { "limit": 3 }
+        while True:
+            results, data = self._page(StartingAtPagination(), params)
+            ids += data["results"]
+            if data["cursor"] is None:
+                break
+            self.assertIn("cursor=", data["next"])
+            params = { "limit": 3, "cursor": data["cursor"] }
+
+        self.assertEquals(ids, [shift.id for shift in self.shifts])
+
+    def test_deep_pages_use_one_query(self):
+        """
+        A page after the cursor is one query no matter how deep it is
+        """
+        results, data = self._page(StartingAtPagination(), { "limit": 5 })
+        with self.assertNumQueries(1):
+            results, data = self._page(StartingAtPagination(), { "limit": 5, "cursor": data["cursor"] })
+        self.assertEquals(data["results"], [shift.id for shift in self.shifts[5:]])
+
+    def test_page_size_is_capped(self):
+        """
+        Clients can't ask for more rows than the maximum page size
+        """
+        paginator = KeysetPagination()
+        paginator.max_page_size = 2
+        results, data = self._page(paginator, { "limit": 1000 })
+        self.assertEquals(len(results), 2)
+
+    def test_invalid_cursor(self):
+        """
+        Cursors are opaque, anything we did not generate is rejected
+        """
+        with self.assertRaises(NotFound):
+            self._page(KeysetPagination(), { "cursor": "not-a-cursor" })
@@ -0,0 +1,76 @@
+import datetime
+from django.test import TestCase
+from django.utils import timezone
+from api.utils.payroll import compute_payroll, week_of
+
+class PayrollTestSuite(TestCase):
+    """
+    Tests for the columnar payroll math
+    """
+
+    def setUp(self):
+        # a monday, the overtime weeks start on mondays
+        self.starting_at = datetime.datetime(2026, 10, 5, tzinfo=timezone.utc)
+        self.ending_at = self.starting_at + datetime.timedelta(days=14)
+
+    def _at(self, days, hours=0):
+        return (self.starting_at + datetime.timedelta(days=days, hours=hours)).timestamp()
+
+    def test_weekly_overtime(self):
+        """
+        The hours after the weekly threshold of each talent are overtime, the week after starts again
+        """
+        # talent 1 works 5 days of 9 hours, the fifth one crosses 40 hours
+        employees = [1, 1, 1, 1, 1, 2, 1]
+        starts = [self._at(day, 8) for day in range(5)] + [self._at(0, 8), self._at(7, 8)]
+        ends = [self._at(day, 17) for day in range(5)] + [self._at(0, 17), self._at(7, 17)]
+        rates = [10.0] * 7
+
+        hours = compute_payroll(employees, starts, ends, rates, self.starting_at, self.ending_at, threshold=40, multiplier=1.5)
+
+        self.assertEquals(hours.over_time, [0, 0, 0, 0, 5, 0, 0])
+        self.assertEquals(hours.regular_hours[4], 4)
+        self.assertEquals(hours.amount[4], 4 * 10 + 5 * 15)
+        self.assertEquals(sum(hours.total_hours), 9 * 7)
+
+    def test_overtime_follows_the_order_worked(self):
+        """
+        The clockins can come in any order, the overtime goes to the last hours worked
+        """
+        employees = [1, 1]
+        starts = [self._at(3), self._at(1)]
+        ends = [self._at(3, 10), self._at(1, 35)]
+
+        hours = compute_payroll(employees, starts, ends, [10.0, 10.0], self.starting_at, self.ending_at, threshold=40)
+
+        self.assertEquals(hours.over_time, [5, 0])
+
+    def test_split_clockins(self):
+        """
+        Clockins crossing the period limits only count the hours inside
+        """
+        starts = [self._at(-1, 22), self._at(13, 22)]
+        ends = [self._at(0, 2), self._at(14, 3)]
+
+        hours = compute_payroll([1, 2], starts, ends, [10.0, 10.0], self.starting_at, self.ending_at)
+
+        self.assertEquals(hours.total_hours, [2, 2])
+        self.assertEquals(hours.splited, [True, True])
+
+    def test_weeks_dont_depend_on_the_period(self):
+        """
+        A 10 day period starting on a thursday counts the week from monday with the hours carried
+        from the previous period, and its last days are the start of another week
+        """
+        starting_at = self.starting_at + datetime.timedelta(days=3)
+        ending_at = starting_at + datetime.timedelta(days=10)
+        # thursday to sunday, then monday to saturday of the next week, 8 hours every day
+        days = list(range(3, 13))
+        starts = [self._at(day, 8) for day in days]
+        ends = [self._at(day, 16) for day in days]
+
+        hours = compute_payroll([1] * 10, starts, ends, [10.0] * 10, starting_at, ending_at, threshold=40,
+            carried={ (1, week_of(self._at(0))): 24 })
+
+        # 24 carried + 8 + 8 crosses 40 on saturday, the next week has 6 days of 8 hours
+        self.assertEquals(hours.over_time, [0, 0, 8, 8, 0, 0, 0, 0, 0, 8])
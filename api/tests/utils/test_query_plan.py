@@ -0,0 +1,57 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import mixer
+from api.models import Shift, Employee
+from api.serializers import shift_serializer
+from api.utils.query_plan import get_query_plan
+
+class QueryPlanTestSuite(TestCase):
+    """
+    Tests for the prefetches declared by the read serializers
+    """
+
+    def _make_shifts(self, employer, count):
+        for i in range(count):
+            shift = mixer.blend('api.Shift', employer=employer)
+            favorite_list = mixer.blend('api.FavoriteList', employer=employer)
+            for j in range(3):
+                employee = mixer.blend('api.Employee')
+                mixer.blend('api.Profile', user=employee.user, employee=employee)
+                favorite_list.employees.add(employee)
+                mixer.blend('api.ShiftApplication', shift=shift, employee=employee)
+                mixer.blend('api.ShiftEmployee', shift=shift, employee=employee)
+            shift.allowed_from_list.add(favorite_list)
+            shift.required_badges.add(mixer.blend('api.Badge'))
+
+    def _count_queries(self, data):
+        with CaptureQueriesContext(connection) as context:
+            shift_serializer.ShiftGetSerializer(data, many=True).data
+        return len(context.captured_queries)
+
+    def test_shift_plan(self):
+        """
+        The plan is derived from the nested serializers
+        """
+        select_related, prefetch_related = get_query_plan(shift_serializer.ShiftGetSerializer)
+        self.assertIn('venue', select_related)
+        self.assertIn('candidates__user__profile', prefetch_related)
+        self.assertIn('employees__favoritelist_set', prefetch_related)
+        self.assertIn('allowed_from_list__employees__user', prefetch_related)
+
+    def test_shift_list_runs_a_constant_number_of_queries(self):
+        """
+        Serializing more shifts does not run more queries
+        """
+        employer = mixer.blend('api.Employer')
+        self._make_shifts(employer, 2)
+        few = self._count_queries(Shift.objects.filter(employer=employer))
+        few_page = self._count_queries(list(Shift.objects.filter(employer=employer)))
+
+        self._make_shifts(employer, 6)
+        many = self._count_queries(Shift.objects.filter(employer=employer))
+        many_page = self._count_queries(list(Shift.objects.filter(employer=employer)))
+
+        self.assertEquals(few, many)
+        # a page (list of shifts) gets the same plan with prefetches
+        self.assertEquals(few_page, many_page)
@@ -64,8 +64,11 @@ urlpatterns = [
     
     path('employers/me/periods', employer_views.EmployerPayrollPeriodView.as_view(), name="employer-periods"),
     path('employers/me', employer_views.EmployerMeView.as_view(), name="employer-me"),
+    path('employers/me/summary',employer_views.EmployerMeSummaryView.as_view(), name="employer-summary"),
     path('employers/me/users',employer_views.EmployerMeUsersView.as_view(), name="get-employer-users"),
     path('employers/me/periods/<int:period_id>',employer_views.EmployerPayrollPeriodView.as_view(), name="employer-single-periods"),
+    path('employers/me/periods/export',employer_views.EmployerPayrollExportView.as_view(), { "kind": "periods" }, name="employer-periods-export"),
+    path('employers/me/clockins/export',employer_views.EmployerPayrollExportView.as_view(), { "kind": "clockins" }, name="employer-clockins-export"),
     path('employers/me/jobcore-invites',general_views.JobCoreInviteView.as_view(), name="get-jcinvites"),
     path('employers/me/jobcore-invites/<int:id>',general_views.JobCoreInviteView.as_view(), name="id-jcinvites"),
     path('employers/me/applications',employer_views.ApplicantsView.as_view(), name="get-applicants"),
@@ -86,6 +89,7 @@ urlpatterns = [
     path('employers/me/shifts/<int:id>/candidates',employer_views.EmployerShiftCandidatesView.as_view(), name="update-shift-candidates"),
     path('employers/me/shifts/<int:id>/employees',employer_views.EmployerShiftEmployeesView.as_view(), name="update-shift-employees"),
     path('employers/me/shifts',employer_views.EmployerShiftView.as_view(), name="get-shifts"),
+    path('employers/me/shifts/series',employer_views.EmployerShiftSeriesView.as_view(), name="shift-series"),
     path('employers/me/shifts/<int:id>',employer_views.EmployerShiftView.as_view(), name="id-shifts"),
 
     #
@@ -104,6 +108,7 @@ urlpatterns = [
     path('employees/me/devices',employee_views.EmployeeDeviceMeView.as_view(), name="me-all-device"),
     path('employees/me/devices/<str:device_id>',employee_views.EmployeeDeviceMeView.as_view(), name="me-device"),
     path('employees/me/clockins',employee_views.ClockinsMeView.as_view(), name="me-employees"),
+    path('employees/me/clockins/sync',employee_views.ClockinsSyncView.as_view(), name="me-clockins-sync"),
     path('employees/me/clockins/<str:clockin_id>',employee_views.ClockinsMeView.as_view(), name="me-employees"),
     path('employees/me/applications',employee_views.EmployeeMeApplicationsView.as_view(), name="me-employee-applications"),
     path('employees/me/applications/<int:application_id>',employee_views.EmployeeMeApplicationsView.as_view(), name="me-single-application"),
@@ -0,0 +1,28 @@
+from django.db.models import Case, When, Value
+
+# rows updated on each query
+UPDATE_BATCH_SIZE = 200
+
+def bulk_update(instances, fields, batch_size=UPDATE_BATCH_SIZE):
+    """
+    Save some fields of many instances of the same model with one UPDATE per batch,
+    every column is set with CASE WHEN id = ... THEN ... (QuerySet.bulk_update
+    only exists from django 2.2). Returns how many rows were updated
+    """
+    instances = list(instances)
+    if len(instances) == 0:
+        return 0
+
+    model = type(instances[0])
+    updated = 0
+    for offset in range(0, len(instances), batch_size):
+        batch = instances[offset:offset + batch_size]
+        values = {}
+        for name in fields:
+            field = model._meta.get_field(name)
+            values[field.attname] = Case(
+                *[When(pk=instance.pk, then=Value(getattr(instance, field.attname), output_field=field)) for instance in batch],
+                output_field=field
+            )
+        updated += model.objects.filter(pk__in=[instance.pk for instance in batch]).update(**values)
+    return updated
@@ -1,33 +1,51 @@
 from django.core.mail import EmailMultiAlternatives
 from rest_framework.exceptions import APIException
 import os
-from django.template.loader import get_template
-from django.template import Context
 from pyfcm import FCMNotification
 from api.models import FCMDevice
 from django.conf import settings
-import requests
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from api.utils.mail_transports import get_transport, recipient_placeholder
+from api.utils.notification_templates import get_template_content, get_template_info, rendering_key
 
 FIREBASE_KEY = os.environ.get('FIREBASE_KEY')
 push_service = FCMNotification(api_key=FIREBASE_KEY)
+# point it to a local fake server for load tests
+if os.environ.get('FCM_END_POINT'):
+    push_service.FCM_END_POINT = os.environ.get('FCM_END_POINT')
 
 def send_email_message(slug, to, data={}):
     if settings.EMAIL_NOTIFICATIONS_ENABLED:
         template = get_template_content(slug, data, ["email"])
         # print('Email notification '+slug+' sent')
-        return requests.post(
-            "https://api.mailgun.net/v3/mailgun.jobcore.co/messages",
-            auth=("api", os.environ.get('MAILGUN_API_KEY')),
-            data={
-                "from": os.environ.get('MAILGUN_FROM')+" <mailgun@mailgun.jobcore.co>",
-                "to": to,
-                "subject": template['subject'],
-                "text": template['text'],
-                "html": template['html']
-            }).status_code == 200
+        return get_transport().send(to, template['subject'], template['text'], template['html'])
     else:
         # print('Email not sent because notifications are not enabled')
         return True
+
+def send_email_messages(slug, recipients, data={}):
+    """
+    Send the same template to many people: recipients is a list of (email, recipient_data).
+    The template is rendered only once, the recipient_data keys are rendered as
+    %recipient.KEY% placeholders that the transport replaces for every recipient
+    """
+    if len(recipients) == 0:
+        return True
+        
+    if settings.EMAIL_NOTIFICATIONS_ENABLED:
+        context = data.copy()
+        for email, recipient_data in recipients:
+            for key in recipient_data:
+                context[key] = recipient_placeholder(key)
+        template = get_template_content(slug, context, ["email"])
+        
+        recipient_variables = {}
+        for email, recipient_data in recipients:
+            recipient_variables[email] = recipient_data
+        return get_transport().send_batch(recipient_variables, template['subject'], template['text'], template['html'])
+    else:
+        return True
             
 def send_fcm(slug, registration_ids, data={}):
     if(len(registration_ids) > 0):
@@ -54,88 +72,33 @@ def send_fcm(slug, registration_ids, data={}):
         return False
             
 def send_fcm_notification(slug, user_id, data={}):
-    device_set = FCMDevice.objects.filter(user = user_id)
-    registration_ids = [device.registration_id for device in device_set]
-    send_fcm(slug, registration_ids, data)
-        
-def get_template_content(slug, data={}, formats=None):
-    info = get_template_info(slug)
-    
-    #d = Context({ 'username': username })
-    con = {
-        'EMPLOYEE_URL': os.environ.get('EMPLOYEE_URL'),
-        'EMPLOYER_URL': os.environ.get('EMPLOYER_URL'),
-        'API_URL': os.environ.get('API_URL'),
-        'COMPANY_NAME': 'JobCore',
-        'COMPANY_LEGAL_NAME': 'JobCore LLC',
-        'COMPANY_ADDRESS': '270 Catalonia, Coral Gables, 33134'
-    }
-    z = con.copy()   # start with x's keys and values
-    z.update(data)
+    return send_fcm_notifications(slug, [(user_id, data)])
 
-    templates = {
-        "subject": info['subject']
-    }
-    
-    if formats is None or "email" in formats:
-        plaintext = get_template(info['type']+'/'+slug+'.txt')
-        html = get_template(info['type']+'/'+slug+'.html')
-        templates["text"] = plaintext.render(z)
-        templates["html"] = html.render(z)
+def send_fcm_notifications(slug, recipients):
+    """
+    Push the same notification to many users: recipients is a list of (user_id, data).
+    All the devices are loaded with one query and the users that would get the same
+    message get one multicast request (chunked to the maximum recipients FCM allows)
+    """
+    if len(recipients) == 0:
+        return []
         
-    if formats is not None and "fms" in formats:
-        fms = get_template(info['type']+'/'+slug+'.fms')
-        templates["fms"] = fms.render(z)
+    registration_ids = {}
+    for user_id, registration_id in FCMDevice.objects.filter(user__in=set(user_id for user_id, data in recipients)).values_list('user_id', 'registration_id'):
+        registration_ids.setdefault(user_id, []).append(registration_id)
     
-    return templates
+    # the message is only rendered once for all the users that would get the same content
+    groups = {}
+    for user_id, data in recipients:
+        key = rendering_key(slug, data, ["fms"]) + json.dumps(data.get('DATA'), sort_keys=True, cls=DjangoJSONEncoder)
+        if key not in groups:
+            groups[key] = { "data": data, "registration_ids": [] }
+        groups[key]["registration_ids"] += registration_ids.get(user_id, [])
     
-def get_template_info(slug):
-    subjects = {
-        "invite_to_jobcore":{ 
-            "type": "employee", 
-            "subject": "A job is waiting for you", 
-        },
-        "email_validated":   { "type": "views", "subject": "Your email has been validated"},
-        "reset_password_form":   { "type": "views", "subject": "Reset your password"},
-        "registration":   { "type": "registration", "subject": "Welcome to JobCore"},
-        "password_reset_link":   { "type": "registration", "subject": "About your password reset"},
-        "password_reset":   { "type": "registration", "subject": "You password has been reset"},
-        
-        # more complex notifications
-        "invite_to_shift":  { 
-            "type": "invite", 
-            "subject": "You have been invited to work on a shift"
-        },
-        "invite_accepted":  { 
-            "type": "registration", 
-            "subject": "Someone you invited has join JobCore"
-        },
-        "cancelled_shift":  { 
-            "type": "shift", 
-            "subject": "One of your upcoming shifts have been cancelled"
-        },
-        "updated_shift":  { 
-            "type": "shift", 
-            "subject": "Atention Needed: One of your upcoming shifts was updated"
-        },
-        "new_shift": { 
-            "type": "invite", 
-            "subject": "There is a new shift waiting for you to apply"
-        },
-        "new_rating": { 
-            "type": "rating", 
-            "subject": "You have received a new rating"
-        },
-        "applicant_accepted": { 
-            "type": "shift", 
-            "subject": "Job application accepted, time to work :)"
-        },
-        "applicant_rejected": { 
-            "type": "shift", 
-            "subject": "Job application rejected, we are sorry :("
-        },
-    }
-    if slug in subjects:
-        return subjects[slug]
-    else:
-        raise ValueError('Invalid template slug: "'+slug+"' no subject found")
\ No newline at end of file
+    results = []
+    for group in groups.values():
+        ids = group["registration_ids"]
+        for i in range(0, len(ids), push_service.FCM_MAX_RECIPIENTS):
+            results.append(send_fcm(slug, ids[i:i + push_service.FCM_MAX_RECIPIENTS], group["data"]))
+    
+    return results
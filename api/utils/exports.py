@@ -0,0 +1,65 @@
+import csv
+import json
+import decimal
+import datetime
+from django.http import StreamingHttpResponse
+
+# rows fetched from the database on every round-trip
+EXPORT_CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson"
+}
+
+class Echo(object):
+    """
+    File-like object for csv.writer that returns the line instead of storing it
+    """
+    def write(self, value):
+        return value
+
+def export_value(value):
+    if isinstance(value, datetime.timedelta):
+        return round(value.total_seconds() / 3600, 2)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+# spreadsheets run the cells that start with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+def csv_value(value):
+    # the text comes from the users (names), numbers and dates are written as they are
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return export_value(value)
+
+def csv_lines(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([csv_value(value) for value in row])
+
+def ndjson_lines(columns, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(columns, [export_value(value) for value in row]))) + "\n"
+
+def streaming_export(queryset, columns, output, filename):
+    """
+    Stream a queryset as CSV or NDJSON, columns is a list of (title, lookup).
+    The rows are read in chunks and written one by one so the memory stays flat
+    no matter how many rows are exported
+    """
+    if output not in CONTENT_TYPES:
+        raise ValueError('The output must be one of: ' + ', '.join(sorted(CONTENT_TYPES.keys())))
+
+    titles = [title for title, lookup in columns]
+    rows = queryset.values_list(*[lookup for title, lookup in columns]).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    lines = csv_lines(titles, rows) if output == 'csv' else ndjson_lines(titles, rows)
+
+    response = StreamingHttpResponse(lines, content_type=CONTENT_TYPES[output])
+    response['Content-Disposition'] = 'attachment; filename="{}.{}"'.format(filename, output)
+    return response
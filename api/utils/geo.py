@@ -0,0 +1,174 @@
+import functools
+import operator
+from math import radians, cos, sin, asin, sqrt
+from django.db.models import Q
+
+EARTH_RADIUS_MILES = 3959
+
+# talents can't pick a maximum_job_distance_miles bigger than this one (see EmployeeSettingsSerializer)
+MAXIMUM_JOB_DISTANCE_MILES = 100
+
+# precision used for the geohash column stored on every profile (~0.6 miles per cell)
+GEOHASH_PRECISION = 6
+
+# if the bounding box needs more cells than this we only rely on the lat/long range
+MAXIMUM_GEOHASH_CELLS = 64
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """
+    Encode a coordinate into a geohash string, nearby coordinates share
+    the same prefix so the column can be filtered with an index
+    """
+    lat_interval = [-90.0, 90.0]
+    lng_interval = [-180.0, 180.0]
+    latitude = float(latitude)
+    longitude = float(longitude)
+
+    geohash = []
+    bits = [16, 8, 4, 2, 1]
+    bit = 0
+    ch = 0
+    even = True
+    while len(geohash) < precision:
+        if even:
+            mid = (lng_interval[0] + lng_interval[1]) / 2
+            if longitude > mid:
+                ch |= bits[bit]
+                lng_interval[0] = mid
+            else:
+                lng_interval[1] = mid
+        else:
+            mid = (lat_interval[0] + lat_interval[1]) / 2
+            if latitude > mid:
+                ch |= bits[bit]
+                lat_interval[0] = mid
+            else:
+                lat_interval[1] = mid
+        even = not even
+        if bit < 4:
+            bit += 1
+        else:
+            geohash.append(_BASE32[ch])
+            bit = 0
+            ch = 0
+
+    return ''.join(geohash)
+
+def geohash_cell_size(precision):
+    """
+    Height and width (in degrees) of a geohash cell for the given precision
+    """
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = (5 * precision) // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+def geohash_precision_for(miles):
+    """
+    Biggest precision whose cells are still larger than the searched radius,
+    that way the bounding box is covered by a handful of cells
+    """
+    precision = 1
+    while precision < GEOHASH_PRECISION:
+        lat_size, lng_size = geohash_cell_size(precision + 1)
+        if lat_size * 69 < miles:
+            break
+        precision += 1
+    return precision
+
+def bounding_box(latitude, longitude, miles):
+    """
+    Returns (min_lat, min_lng, max_lat, max_lng) of the square that contains
+    the circle of the given radius around the coordinate
+    """
+    latitude = float(latitude)
+    longitude = float(longitude)
+    lat_delta = miles / 69.0
+    lng_delta = miles / max(69.0 * cos(radians(latitude)), 0.0001)
+    return (
+        max(latitude - lat_delta, -90.0),
+        max(longitude - lng_delta, -180.0),
+        min(latitude + lat_delta, 90.0),
+        min(longitude + lng_delta, 180.0)
+    )
+
+def geohash_cells_in_bbox(box, precision):
+    """
+    All the geohash prefixes that intersect the bounding box, returns None
+    if there are too many of them to be useful in a query
+    """
+    min_lat, min_lng, max_lat, max_lng = box
+    lat_size, lng_size = geohash_cell_size(precision)
+    if ((max_lat - min_lat) / lat_size + 2) * ((max_lng - min_lng) / lng_size + 2) > MAXIMUM_GEOHASH_CELLS:
+        return None
+
+    cells = set()
+    lat = min_lat
+    while True:
+        lng = min_lng
+        while True:
+            cells.add(encode_geohash(lat, lng, precision))
+            if lng >= max_lng:
+                break
+            lng = min(lng + lng_size, max_lng)
+        if lat >= max_lat:
+            break
+        lat = min(lat + lat_size, max_lat)
+
+    return sorted(cells)
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """
+    Great circle distance in miles between two points (in decimal degrees)
+    """
+    lon1, lat1, lon2, lat2 = map(radians, [float(lon1), float(lat1), float(lon2), float(lat2)])
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+    return 2 * EARTH_RADIUS_MILES * asin(sqrt(a))
+
+def distances_in_miles(latitude, longitude, points):
+    """
+    Distance from one origin to a list of (lat, lng) points, the origin
+    trigonometry is computed only once for the whole batch. It's a plain loop,
+    numpy is not a dependency of the project
+    """
+    lat1 = radians(float(latitude))
+    lon1 = radians(float(longitude))
+    cos_lat1 = cos(lat1)
+
+    distances = []
+    for lat2, lon2 in points:
+        lat2 = radians(float(lat2))
+        lon2 = radians(float(lon2))
+        a = sin((lat2 - lat1)/2)**2 + cos_lat1 * cos(lat2) * sin((lon2 - lon1)/2)**2
+        distances.append(2 * EARTH_RADIUS_MILES * asin(sqrt(a)))
+
+    return distances
+
+def has_location(latitude, longitude):
+    return latitude is not None and longitude is not None and (latitude != 0 or longitude != 0)
+
+def filter_talents_near(talents, latitude, longitude, miles=MAXIMUM_JOB_DISTANCE_MILES):
+    """
+    Narrow an Employee queryset to the talents that are willing to travel
+    to the given coordinate.
+    1) the geohash column and a lat/long bounding box are filtered in SQL
+    2) an exact haversine pass checks every maximum_job_distance_miles
+    """
+    box = bounding_box(latitude, longitude, miles)
+    candidates = talents.filter(
+        profile__latitude__range=(box[0], box[2]),
+        profile__longitude__range=(box[1], box[3])
+    )
+
+    cells = geohash_cells_in_bbox(box, geohash_precision_for(miles))
+    if cells is not None:
+        candidates = candidates.filter(functools.reduce(operator.or_, [Q(profile__geohash__startswith=cell) for cell in cells]))
+
+    rows = list(candidates.values_list('id', 'profile__latitude', 'profile__longitude', 'maximum_job_distance_miles').distinct())
+    distances = distances_in_miles(latitude, longitude, [(row[1], row[2]) for row in rows])
+    ids = [row[0] for row, distance in zip(rows, distances) if distance <= row[3]]
+
+    return talents.model.objects.filter(id__in=ids).select_related('user')
@@ -0,0 +1,104 @@
+import json
+import requests
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+# mailgun does not accept more recipients on a single batch message
+MAILGUN_BATCH_LIMIT = 1000
+
+def recipient_placeholder(key):
+    """
+    Placeholder rendered on batch templates, it gets replaced with the
+    value of every recipient (mailgun syntax)
+    """
+    return '%recipient.' + key + '%'
+
+def replace_recipient_variables(content, variables):
+    for key, value in variables.items():
+        content = content.replace(recipient_placeholder(key), str(value))
+    return content
+
+class MailgunTransport(object):
+    """
+    Sends the emails using the mailgun HTTP API, the connections are kept alive
+    and reused between messages
+    """
+    def __init__(self, api_url=None, api_key=None, sender=None, timeout=None, pool_size=10):
+        self.api_url = api_url or settings.MAILGUN_API_URL
+        self.api_key = api_key or settings.MAILGUN_API_KEY
+        self.sender = sender or settings.MAILGUN_FROM
+        self.timeout = timeout or settings.EMAIL_TRANSPORT_TIMEOUT
+
+        self.session = requests.Session()
+        self.session.auth = ("api", self.api_key)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def post(self, data):
+        data["from"] = str(self.sender) + " <mailgun@mailgun.jobcore.co>"
+        return self.session.post(self.api_url + "/messages", data=data, timeout=self.timeout).status_code == 200
+
+    def send(self, to, subject, text, html):
+        return self.post({
+            "to": to,
+            "subject": subject,
+            "text": text,
+            "html": html
+        })
+
+    def send_batch(self, recipient_variables, subject, text, html):
+        """
+        One API call for up to 1000 recipients, every recipient only sees
+        his own address and gets his own %recipient.*% values
+        """
+        recipients = list(recipient_variables.keys())
+        success = True
+        for i in range(0, len(recipients), MAILGUN_BATCH_LIMIT):
+            chunk = recipients[i:i + MAILGUN_BATCH_LIMIT]
+            success = self.post({
+                "to": chunk,
+                "subject": subject,
+                "text": text,
+                "html": html,
+                "recipient-variables": json.dumps({ email: recipient_variables[email] for email in chunk }, cls=DjangoJSONEncoder)
+            }) and success
+        return success
+
+class SMTPTransport(object):
+    """
+    Sends the emails with the django SMTP backend (EMAIL_HOST, EMAIL_PORT),
+    useful to point the application to a local stand-in for load testing
+    """
+    def __init__(self, sender=None, timeout=None):
+        self.sender = sender or settings.MAILGUN_FROM
+        self.timeout = timeout or settings.EMAIL_TRANSPORT_TIMEOUT
+
+    def message(self, to, subject, text, html):
+        message = EmailMultiAlternatives(subject, text, self.sender, [to])
+        message.attach_alternative(html, "text/html")
+        return message
+
+    def send(self, to, subject, text, html):
+        return self.send_batch({ to: {} }, subject, text, html)
+
+    def send_batch(self, recipient_variables, subject, text, html):
+        messages = [
+            self.message(to, subject, replace_recipient_variables(text, variables), replace_recipient_variables(html, variables))
+            for to, variables in recipient_variables.items()
+        ]
+        connection = get_connection('django.core.mail.backends.smtp.EmailBackend', timeout=self.timeout)
+        return connection.send_messages(messages) == len(messages)
+
+_transport = None
+
+def get_transport():
+    """
+    The transport configured on settings.EMAIL_TRANSPORT, created only once per process
+    """
+    global _transport
+    if _transport is None:
+        _transport = import_string(settings.EMAIL_TRANSPORT)()
+    return _transport
@@ -0,0 +1,190 @@
+import os
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.template import TemplateDoesNotExist
+from django.template.base import TextNode, VariableNode
+from django.template.loader import get_template
+from django.template.loader_tags import BlockNode, ExtendsNode
+from django.templatetags.static import StaticNode
+from django.template.defaulttags import LoadNode
+
+# every notification: the folder where its templates live and the subject
+SUBJECTS = {
+    "invite_to_jobcore":{
+        "type": "employee",
+        "subject": "A job is waiting for you",
+    },
+    "email_validated":   { "type": "views", "subject": "Your email has been validated"},
+    "reset_password_form":   { "type": "views", "subject": "Reset your password"},
+    "registration":   { "type": "registration", "subject": "Welcome to JobCore"},
+    "password_reset_link":   { "type": "registration", "subject": "About your password reset"},
+    "password_reset":   { "type": "registration", "subject": "You password has been reset"},
+
+    # more complex notifications
+    "invite_to_shift":  {
+        "type": "invite",
+        "subject": "You have been invited to work on a shift"
+    },
+    "invite_accepted":  {
+        "type": "registration",
+        "subject": "Someone you invited has join JobCore"
+    },
+    "cancelled_shift":  {
+        "type": "shift",
+        "subject": "One of your upcoming shifts have been cancelled"
+    },
+    "updated_shift":  {
+        "type": "shift",
+        "subject": "Atention Needed: One of your upcoming shifts was updated"
+    },
+    "invite_to_shift_series":  {
+        "type": "invite",
+        "subject": "You have been invited to work on a series of shifts"
+    },
+    "new_shift": {
+        "type": "invite",
+        "subject": "There is a new shift waiting for you to apply"
+    },
+    "new_rating": {
+        "type": "rating",
+        "subject": "You have received a new rating"
+    },
+    "applicant_accepted": {
+        "type": "shift",
+        "subject": "Job application accepted, time to work :)"
+    },
+    "applicant_rejected": {
+        "type": "application",
+        "subject": "Job application rejected, we are sorry :("
+    },
+}
+
+# format name -> file extension
+FORMATS = {
+    "text": "txt",
+    "html": "html",
+    "fms": "fms"
+}
+
+# the nodes we know how to inspect, templates with anything else (if, for...)
+# are considered to depend on all the data
+SIMPLE_NODES = (TextNode, VariableNode, BlockNode, ExtendsNode, LoadNode, StaticNode)
+
+BASE_CONTEXT = {
+    'EMPLOYEE_URL': os.environ.get('EMPLOYEE_URL'),
+    'EMPLOYER_URL': os.environ.get('EMPLOYER_URL'),
+    'API_URL': os.environ.get('API_URL'),
+    'COMPANY_NAME': 'JobCore',
+    'COMPANY_LEGAL_NAME': 'JobCore LLC',
+    'COMPANY_ADDRESS': '270 Catalonia, Coral Gables, 33134'
+}
+
+# slug -> { format: compiled template }, filled once per process
+_compiled = {}
+
+# template file -> variable names it renders (or None if it could use anything)
+_variables = {}
+
+def get_template_info(slug):
+    if slug in SUBJECTS:
+        return SUBJECTS[slug]
+    else:
+        raise ValueError('Invalid template slug: "'+slug+"' no subject found")
+
+def get_compiled_templates(slug):
+    """
+    Compiled templates of a notification, the files are only read and parsed
+    the first time, missing formats are simply not included
+    """
+    if slug not in _compiled:
+        info = get_template_info(slug)
+        compiled = {}
+        for name, extension in FORMATS.items():
+            try:
+                compiled[name] = get_template(info['type']+'/'+slug+'.'+extension)
+            except TemplateDoesNotExist:
+                pass
+        _compiled[slug] = compiled
+    return _compiled[slug]
+
+def load_templates():
+    """
+    Compile every notification template, called when the application starts
+    """
+    for slug in SUBJECTS:
+        get_compiled_templates(slug)
+
+def template_variables(template):
+    """
+    Names of the context variables a compiled template renders, including the
+    templates it extends, returns None when it uses tags we can't inspect
+    """
+    origin = template.template.origin.name
+    if origin in _variables:
+        return _variables[origin]
+
+    names = set()
+    nodes = template.template.nodelist.get_nodes_by_type(object)
+    for node in nodes:
+        if not isinstance(node, SIMPLE_NODES):
+            names = None
+            break
+        if isinstance(node, VariableNode) and node.filter_expression.var is not None:
+            var = node.filter_expression.var
+            if hasattr(var, 'var'):
+                names.add(var.var.split('.')[0])
+        if isinstance(node, ExtendsNode):
+            parent = node.parent_name.var
+            parent_names = template_variables(get_template(parent)) if isinstance(parent, str) else None
+            if parent_names is None:
+                names = None
+                break
+            names |= parent_names
+
+    _variables[origin] = names
+    return names
+
+def get_template_content(slug, data={}, formats=None):
+    templates = get_compiled_templates(slug)
+
+    context = BASE_CONTEXT.copy()
+    context.update(data)
+
+    content = {
+        "subject": get_template_info(slug)['subject']
+    }
+
+    names = []
+    if formats is None or "email" in formats:
+        names += ["text", "html"]
+    if formats is not None and "fms" in formats:
+        names += ["fms"]
+
+    for name in names:
+        if name in templates:
+            content[name] = templates[name].render(context)
+        elif name != "fms":
+            info = get_template_info(slug)
+            raise TemplateDoesNotExist(info['type']+'/'+slug+'.'+FORMATS[name])
+
+    return content
+
+def rendering_key(slug, data, formats):
+    """
+    Two payloads with the same key render exactly the same content: only the
+    variables used by the templates of the requested formats are compared
+    """
+    templates = get_compiled_templates(slug)
+    used = set()
+    for name in formats:
+        if name not in templates:
+            continue
+        names = template_variables(templates[name])
+        if names is None:
+            used = None
+            break
+        used |= names
+
+    if used is not None:
+        data = { key: value for key, value in data.items() if key in used }
+    return json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
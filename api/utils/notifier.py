@@ -5,6 +5,9 @@ from django.db.models import Q
 from base64 import b64encode, b64decode
 from api.models import Employee, ShiftInvite, Shift, Profile
 from api.utils.email import send_email_message, send_fcm_notification
+from api.utils.geo import filter_talents_near, has_location
+from api.utils import outbox
+from api.actions.invite_actions import create_shift_invites
 import api.utils.jwt
 import rest_framework_jwt
 API_URL = os.environ.get('API_URL')
@@ -31,6 +34,11 @@ def get_talents_to_notify(shift):
                 #the employer gets to pick employers only from his favlists
                 Q(favoritelist__in=favorite_lists)
             )
+        
+        # only talents willing to travel that far from the venue
+        venue = shift.venue
+        if has_location(venue.latitude, venue.longitude):
+            talents_to_notify = filter_talents_near(talents_to_notify, venue.latitude, venue.longitude)
     
     elif shift.status == 'CANCELLED' or shift.status == 'DRAFT':
         talents_to_notify = shift.candidates.all() | shift.employees.all()
@@ -64,38 +72,36 @@ def notify_shift_update(user, shift, status='being_updated', old_data=None):
     shift = Shift.objects.get(id=shift.id) #IMPORTANT: override the shift
     talents_to_notify = get_talents_to_notify(shift)
 
+    # the messages are only queued here, the notification worker delivers them
+    messages = []
     if status == 'being_updated':
         print("Talents to notify: "+str(len(talents_to_notify)))
         
-        for talent in talents_to_notify:
+        # only the talents that were not invited before get notified
+        invites = create_shift_invites(shift, user.profile, talents_to_notify)
+        for invite in invites:
+            talent = invite.employee
             payload = api.utils.jwt.jwt_payload_handler({
                 "user_id": talent.user.id,
                 "shift_id": shift.id
             })
             token = jwt_encode_handler(payload)
 
-            ShiftInvite.objects.create(
-                sender=user.profile, 
-                shift=shift, 
-                employee=talent
-            )
-
-            send_email_message('new_shift', talent.user.email, {
+            messages.append(outbox.email_message('new_shift', talent.user.email, {
                 "COMPANY": shift.employer.title,
                 "POSITION": shift.position.title,
-                "TOKEN": token,
                 "DATE": shift.starting_at,
                 "DATA": { "type": "shift", "id": shift.id }
-            })
+            }, { "TOKEN": token }))
             
-            send_fcm_notification("new_shift", talent.user.id, {
+            messages.append(outbox.push_message("new_shift", talent.user.id, {
                 "EMAIL": talent.user.first_name + ' ' + talent.user.last_name,
                 "COMPANY": user.profile.employer.title,
                 "POSITION": shift.position.title,
                 "LINK": EMPLOYER_URL,
                 "DATE": shift.starting_at.strftime('%m/%d/%Y'),
                 "DATA": { "type": "shift", "id": shift.id }
-            })
+            }))
             
     if status == 'being_cancelled':
         for talent in talents_to_notify:
@@ -106,65 +112,67 @@ def notify_shift_update(user, shift, status='being_updated', old_data=None):
             })
             token = jwt_encode_handler(payload)
             
-            send_email_message('cancelled_shift', talent.user.email, {
+            messages.append(outbox.email_message('cancelled_shift', talent.user.email, {
                 "COMPANY": shift.employer.title,
                 "POSITION": shift.position.title,
-                "TOKEN": token,
                 "DATE": shift.starting_at,
                 "DATA": { "type": "shift", "id": shift.id }
-            })
+            }, { "TOKEN": token }))
             
-            send_fcm_notification("cancelled_shift", talent.user.id, {
+            messages.append(outbox.push_message("cancelled_shift", talent.user.id, {
                 "EMAIL": talent.user.first_name + ' ' + talent.user.last_name,
                 "COMPANY": user.profile.employer.title,
                 "POSITION": shift.position.title,
                 "LINK": EMPLOYER_URL,
                 "DATE": shift.starting_at.strftime('%m/%d/%Y'),
                 "DATA": { "type": "shift", "id": shift.id }
-            })
+            }))
+    
+    outbox.enqueue(messages)
 
 
 def notify_shift_candidate_update(user, shift, talents_to_notify=[]):
 
+    messages = []
     for talent in talents_to_notify['accepted']:
         payload = api.utils.jwt.jwt_payload_handler({
             "user_id": talent.user.id,
             "shift_id": shift.id
         })
-        send_email_message('applicant_accepted', talent.user.email, {
+        messages.append(outbox.email_message('applicant_accepted', talent.user.email, {
             "COMPANY": shift.employer.title,
             "POSITION": shift.position.title,
-            "TOKEN": jwt_encode_handler(payload),
             "DATE": shift.starting_at,
             "DATA": { "type": "shift", "id": shift.id }
-        })
-        send_fcm_notification('applicant_accepted', talent.user.id, {
+        }, { "TOKEN": jwt_encode_handler(payload) }))
+        messages.append(outbox.push_message('applicant_accepted', talent.user.id, {
             "COMPANY": shift.employer.title,
             "POSITION": shift.position.title,
             "TOKEN": jwt_encode_handler(payload),
             "DATE": shift.starting_at,
             "DATA": { "type": "shift", "id": shift.id }
-        })
+        }))
     
     for talent in talents_to_notify['rejected']:
         payload = api.utils.jwt.jwt_payload_handler({
             "user_id": talent.user.id,
             "shift_id": shift.id
         })
-        send_email_message('applicant_rejected', talent.user.email, {
+        messages.append(outbox.email_message('applicant_rejected', talent.user.email, {
             "COMPANY": shift.employer.title,
             "POSITION": shift.position.title,
-            "TOKEN": jwt_encode_handler(payload),
             "DATE": shift.starting_at,
-            "DATA": { "type": "invite", "id": invite.id }
-        })
-        send_fcm_notification('applicant_rejected', talent.user.id, {
+            "DATA": { "type": "shift", "id": shift.id }
+        }, { "TOKEN": jwt_encode_handler(payload) }))
+        messages.append(outbox.push_message('applicant_rejected', talent.user.id, {
             "COMPANY": shift.employer.title,
             "POSITION": shift.position.title,
             "TOKEN": jwt_encode_handler(payload),
             "DATE": shift.starting_at,
-            "DATA": { "type": "invite", "id": invite.id }
-        })
+            "DATA": { "type": "shift", "id": shift.id }
+        }))
+    
+    outbox.enqueue(messages)
 
 # manual invite
 def notify_jobcore_invite(invite):
@@ -192,32 +200,65 @@ def notify_invite_accepted(invite):
     })
 
 # manual invite
+def notify_shift_invites(invites):
+    """
+    Email and push every invited talent, the invite link goes into the recipient
+    data so the emails of the same shift are delivered in one batch
+    """
+    messages = []
+    for invite in invites:
+        payload = api.utils.jwt.jwt_payload_handler({
+            "sender_id": invite.sender.id,
+            "invite_id": invite.id
+        })
+        link = EMPLOYEE_URL+'/invite?token='+jwt_encode_handler(payload)
+        data = {
+            "SENDER": invite.sender.user.first_name + ' ' + invite.sender.user.last_name,
+            "COMPANY": invite.sender.user.profile.employer.title,
+            "POSITION": invite.shift.position.title,
+            "DATE": invite.shift.starting_at.strftime('%m/%d/%Y')
+        }
+        messages.append(outbox.email_message("invite_to_shift", invite.employee.user.email, data, { "LINK": link }))
+        messages.append(outbox.push_message("invite_to_shift", invite.employee.user.id, dict(data,
+            LINK=link,
+            DATA={ "type": "invite", "id": invite.id }
+        )))
+    if len(messages) == 0:
+        return []
+    return outbox.enqueue(messages)
+
 def notify_single_shift_invite(invite):
-    
-    payload = api.utils.jwt.jwt_payload_handler({
-        "sender_id": invite.sender.id,
-        "invite_id": invite.id
-    })
-    token = jwt_encode_handler(payload)
-    
-    # invite.employee.user.email
-    send_email_message("invite_to_shift", invite.sender.user.email, {
-        "SENDER": invite.sender.user.first_name + ' ' + invite.sender.user.last_name,
-        "COMPANY": invite.sender.user.profile.employer.title,
-        "POSITION": invite.shift.position.title,
-        "DATE": invite.shift.starting_at.strftime('%m/%d/%Y'),
-        "LINK": EMPLOYEE_URL+'/invite?token='+token,
-        "DATA": { "type": "invite", "id": invite.id }
-    })
-    
-    send_fcm_notification("invite_to_shift", invite.employee.user.id, {
-        "SENDER": invite.sender.user.first_name + ' ' + invite.sender.user.last_name,
-        "COMPANY": invite.sender.user.profile.employer.title,
-        "POSITION": invite.shift.position.title,
-        "DATE": invite.shift.starting_at.strftime('%m/%d/%Y'),
-        "LINK": EMPLOYEE_URL+'/invite?token='+token,
-        "DATA": { "type": "invite", "id": invite.id }
-    })
+    return notify_shift_invites([invite])
+
+def notify_shift_series_invites(shifts, invites):
+    """
+    One message per talent for all the shifts of a series, invites are the
+    invites of the first shift (the link opens that one)
+    """
+    if len(invites) == 0:
+        return []
+
+    shift = shifts[0]
+    data = {
+        "COMPANY": shift.employer.title,
+        "POSITION": shift.position.title,
+        "SHIFTS": len(shifts),
+        "DATE": shift.starting_at.strftime('%m/%d/%Y'),
+        "DATES": ", ".join(item.starting_at.strftime('%m/%d/%Y') for item in shifts)
+    }
+    messages = []
+    for invite in invites:
+        payload = api.utils.jwt.jwt_payload_handler({
+            "sender_id": invite.sender.id,
+            "invite_id": invite.id
+        })
+        link = EMPLOYEE_URL+'/invite?token='+jwt_encode_handler(payload)
+        messages.append(outbox.email_message("invite_to_shift_series", invite.employee.user.email, data, { "LINK": link }))
+        messages.append(outbox.push_message("invite_to_shift_series", invite.employee.user.id, dict(data,
+            LINK=link,
+            DATA={ "type": "invite", "id": invite.id }
+        )))
+    return outbox.enqueue(messages)
 
 def notify_new_rating(rating):
     
@@ -0,0 +1,194 @@
+import json
+import datetime
+import logging
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from api.models import (NotificationOutbox, OUTBOX_EMAIL, OUTBOX_PUSH, OUTBOX_PENDING, OUTBOX_PROCESSING,
+    OUTBOX_SENT, OUTBOX_FAILED)
+from api.utils.email import send_email_messages, send_fcm_notifications
+from api.utils.mail_transports import MAILGUN_BATCH_LIMIT
+
+logger = logging.getLogger(__name__)
+
+# how many rows are inserted on each bulk_create
+INSERT_BATCH_SIZE = 500
+
+# emails sent on each call to the provider
+EMAIL_BATCH_SIZE = MAILGUN_BATCH_LIMIT
+
+# after this many failed deliveries the message is marked as FAILED
+MAXIMUM_ATTEMPTS = 5
+
+# messages claimed by a worker that died are released after this time
+CLAIM_TIMEOUT = datetime.timedelta(minutes=10)
+
+def email_message(slug, to, data={}, recipient_data={}):
+    """
+    Build (without saving) an outbox row for an email notification, the values
+    that change on every recipient (tokens, links) go into recipient_data so
+    the emails that share everything else can be sent in one batch
+    """
+    return NotificationOutbox(channel=OUTBOX_EMAIL, slug=slug, email=to,
+        data=json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True),
+        recipient_data=json.dumps(recipient_data, cls=DjangoJSONEncoder) if recipient_data else '')
+
+def push_message(slug, user_id, data={}):
+    """
+    Build (without saving) an outbox row for a push notification to all the user devices
+    """
+    return NotificationOutbox(channel=OUTBOX_PUSH, slug=slug, user_id=user_id, data=json.dumps(data, cls=DjangoJSONEncoder))
+
+def enqueue(messages):
+    """
+    Insert a list of outbox rows, the actual delivery happens later on the
+    worker (python manage.py send_notifications)
+    """
+    return NotificationOutbox.objects.bulk_create(messages, batch_size=INSERT_BATCH_SIZE)
+
+def queue_email_message(slug, to, data={}, recipient_data={}):
+    return enqueue([email_message(slug, to, data, recipient_data)])
+
+def queue_fcm_notification(slug, user_id, data={}):
+    return enqueue([push_message(slug, user_id, data)])
+
+def load_data(message):
+    """
+    Dates go into the outbox as iso strings, they are parsed back so the
+    templates render them the same way they did before queuing
+    """
+    data = json.loads(message.data) if message.data else {}
+    for key, value in data.items():
+        if isinstance(value, str):
+            try:
+                parsed = parse_datetime(value)
+            except ValueError:
+                parsed = None
+            if parsed is not None:
+                data[key] = parsed
+    return data
+
+def claim_batch(batch_size=100):
+    """
+    Lock a batch of messages that are ready to be sent and flag them as
+    PROCESSING, locked rows are skipped so several workers can run at the same time
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        messages = list(
+            NotificationOutbox.objects.select_for_update(skip_locked=True).filter(
+                Q(status=OUTBOX_PENDING, available_at__lte=now) |
+                Q(status=OUTBOX_PROCESSING, claimed_at__lt=now - CLAIM_TIMEOUT)
+            ).order_by('available_at', 'id')[:batch_size]
+        )
+        if len(messages) > 0:
+            NotificationOutbox.objects.filter(id__in=[message.id for message in messages]).update(status=OUTBOX_PROCESSING, claimed_at=now)
+    return messages
+
+def email_chunks(messages, size):
+    """
+    Split the messages in chunks of at most size with only one message per
+    address on each chunk (the recipient variables of a batch are keyed by email),
+    every chunk is one call to the email provider
+    """
+    chunks = []
+    for message in messages:
+        for chunk, emails in chunks:
+            if len(chunk) < size and message.email not in emails:
+                break
+        else:
+            chunk, emails = [], set()
+            chunks.append((chunk, emails))
+        chunk.append(message)
+        emails.add(message.email)
+    return [chunk for chunk, emails in chunks]
+
+def deliver_email_batch(slug, messages):
+    """
+    Emails with the same template and the same shared data are sent together
+    (mailgun batch sending), returns one error (or None) for each message.
+    A failed chunk only sends its own messages back to the queue
+    """
+    errors = {}
+    for chunk in email_chunks(messages, EMAIL_BATCH_SIZE):
+        try:
+            recipients = [(message.email, json.loads(message.recipient_data) if message.recipient_data else {}) for message in chunk]
+            error = None
+            if send_email_messages(slug, recipients, load_data(chunk[0])) == False:
+                error = 'The email provider rejected the message'
+        except Exception as e:
+            logger.exception('Error delivering emails %s', slug)
+            error = str(e) or e.__class__.__name__
+        for message in chunk:
+            errors[id(message)] = error
+    return [errors[id(message)] for message in messages]
+
+def deliver_push_batch(slug, messages):
+    """
+    Push notifications with the same template are sent together (multicast),
+    returns one error (or None) for each message
+    """
+    try:
+        send_fcm_notifications(slug, [(message.user_id, load_data(message)) for message in messages])
+        return [None for message in messages]
+    except Exception as e:
+        logger.exception('Error delivering push notifications %s', slug)
+        return [str(e) or e.__class__.__name__ for message in messages]
+
+def _deliver_emails_in_thread(group):
+    try:
+        return deliver_email_batch(*group)
+    finally:
+        # every thread gets its own database connection, don't leave them open
+        connection.close()
+
+def process_batch(batch_size=100, concurrency=8):
+    """
+    Claim and deliver one batch, returns a tuple (sent, failed)
+    """
+    messages = claim_batch(batch_size)
+    if len(messages) == 0:
+        return (0, 0)
+
+    emails = sorted([message for message in messages if message.channel == OUTBOX_EMAIL], key=lambda message: (message.slug, message.data))
+    pushes = sorted([message for message in messages if message.channel == OUTBOX_PUSH], key=lambda message: message.slug)
+    unknown = [message for message in messages if message.channel not in (OUTBOX_EMAIL, OUTBOX_PUSH)]
+    messages = emails + pushes + unknown
+
+    email_groups = [(key[0], list(group)) for key, group in itertools.groupby(emails, key=lambda message: (message.slug, message.data))]
+    if concurrency > 1 and len(email_groups) > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(_deliver_emails_in_thread, email_groups))
+    else:
+        results = [deliver_email_batch(slug, group) for slug, group in email_groups]
+    errors = [error for result in results for error in result]
+
+    for slug, group in itertools.groupby(pushes, key=lambda message: message.slug):
+        errors += deliver_push_batch(slug, list(group))
+
+    errors += ['Unknown channel '+message.channel for message in unknown]
+
+    now = timezone.now()
+    sent_ids = [message.id for message, error in zip(messages, errors) if error is None]
+    if len(sent_ids) > 0:
+        NotificationOutbox.objects.filter(id__in=sent_ids).update(status=OUTBOX_SENT, sent_at=now, last_error='')
+
+    failed = 0
+    for message, error in zip(messages, errors):
+        if error is None:
+            continue
+        failed += 1
+        attempts = message.attempts + 1
+        NotificationOutbox.objects.filter(id=message.id).update(
+            status=OUTBOX_FAILED if attempts >= MAXIMUM_ATTEMPTS else OUTBOX_PENDING,
+            attempts=attempts,
+            last_error=error,
+            # exponential backoff: 1, 2, 4, 8... minutes
+            available_at=now + datetime.timedelta(minutes=2 ** (attempts - 1))
+        )
+
+    return (len(sent_ids), failed)
@@ -0,0 +1,66 @@
+import datetime
+import collections
+from django.conf import settings
+
+HOUR = 3600
+WEEK = 7 * 24 * HOUR
+# the overtime weeks are ISO weeks, from monday 00:00 UTC
+WEEK_ORIGIN = datetime.datetime(1970, 1, 5, tzinfo=datetime.timezone.utc).timestamp()
+
+# hours per talent and week paid as regular time, the rest is overtime
+WEEKLY_OVERTIME_HOURS = getattr(settings, 'PAYROLL_WEEKLY_OVERTIME_HOURS', 40)
+OVERTIME_MULTIPLIER = getattr(settings, 'PAYROLL_OVERTIME_MULTIPLIER', 1.5)
+
+PayrollHours = collections.namedtuple('PayrollHours', ['total_hours', 'regular_hours', 'over_time', 'amount', 'splited'])
+
+def week_of(timestamp):
+    return int((timestamp - WEEK_ORIGIN) // WEEK)
+
+def week_start(timestamp):
+    return WEEK_ORIGIN + week_of(timestamp) * WEEK
+
+def compute_payroll(employees, starts, ends, rates, starting_at, ending_at,
+    threshold=WEEKLY_OVERTIME_HOURS, multiplier=OVERTIME_MULTIPLIER, carried=None):
+    """
+    Hours and amounts of a period computed on columns instead of row by row:
+    employees (ids), starts, ends (timestamps) and rates (floats) are parallel lists,
+    one position per clockin. The overtime goes to the clockins that cross the weekly
+    threshold of each talent. The weeks don't depend on the period (week_of), a period
+    that starts in the middle of a week continues it: carried has the hours
+    { (employee, week): hours } worked in that week before the period started
+    """
+    if carried is None:
+        carried = {}
+    period_start = starting_at.timestamp()
+    period_end = ending_at.timestamp()
+
+    # clip every clockin to the period
+    clipped_starts = [start if start > period_start else period_start for start in starts]
+    clipped_ends = [end if end < period_end else period_end for end in ends]
+    total_hours = [(end - start) / HOUR for start, end in zip(clipped_starts, clipped_ends)]
+    splited = [clipped_start != start or clipped_end != end
+        for clipped_start, start, clipped_end, end in zip(clipped_starts, starts, clipped_ends, ends)]
+
+    # running total of every talent and week, in the order the hours were worked.
+    # (talent, week, start) is packed in one integer so the sort compares numbers instead of tuples
+    first_week = week_of(period_start)
+    weeks = week_of(period_end) - first_week + 1
+    seconds = int(period_end - period_start) + 1
+    keys = [(employee * weeks + week_of(start) - first_week) * seconds + int(start - period_start)
+        for employee, start in zip(employees, clipped_starts)]
+    over_time = [0.0] * len(employees)
+    worked = 0.0
+    current = None
+    for i in sorted(range(len(keys)), key=keys.__getitem__):
+        group = keys[i] // seconds
+        if group != current:
+            current = group
+            employee, week = divmod(group, weeks)
+            worked = carried.get((employee, first_week + week), 0.0)
+        worked += total_hours[i]
+        if worked > threshold:
+            over_time[i] = min(total_hours[i], worked - threshold)
+
+    regular_hours = [hours - extra for hours, extra in zip(total_hours, over_time)]
+    amount = [(regular + extra * multiplier) * rate for regular, extra, rate in zip(regular_hours, over_time, rates)]
+    return PayrollHours(total_hours, regular_hours, over_time, amount, splited)
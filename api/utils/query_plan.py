@@ -0,0 +1,107 @@
+from django.db.models import Model, QuerySet, prefetch_related_objects
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField
+from rest_framework.serializers import LIST_SERIALIZER_KWARGS
+
+# serializer class -> (select_related, prefetch_related)
+_plans = {}
+
+def _related_model(model, name):
+    """
+    Model on the other side of the attribute, reverse relations are
+    matched by their accessor (e.g: favoritelist_set)
+    """
+    for field in model._meta.get_fields():
+        if not field.is_relation:
+            continue
+        accessor = field.get_accessor_name() if field.auto_created and not field.concrete else field.name
+        if accessor == name:
+            return field.related_model
+    return None
+
+def build_query_plan(serializer, model, prefix='', joined=True):
+    """
+    Walk the fields of a serializer and collect the relations it is going to read:
+    single relations reachable with joins go to select_related, everything
+    else (many to many, reverse foreign keys and what hangs from them) is prefetched
+    """
+    select_related = []
+    prefetch_related = []
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*' or '.' in field.source:
+            continue
+        related_model = _related_model(model, field.source)
+        if related_model is None:
+            continue
+        path = prefix + field.source
+
+        if isinstance(field, serializers.ListSerializer):
+            prefetch_related.append(path)
+            nested = build_query_plan(field.child, related_model, path + '__', joined=False)
+            prefetch_related += nested[0] + nested[1]
+        elif isinstance(field, ManyRelatedField):
+            prefetch_related.append(path)
+        elif isinstance(field, serializers.BaseSerializer):
+            nested = build_query_plan(field, related_model, path + '__', joined)
+            if joined:
+                select_related += [path] + nested[0]
+            else:
+                prefetch_related += [path] + nested[0]
+            prefetch_related += nested[1]
+
+    meta = getattr(serializer, 'Meta', None)
+    if prefix == '':
+        select_related += list(getattr(meta, 'select_related', ()))
+        prefetch_related += list(getattr(meta, 'prefetch_related', ()))
+    return select_related, prefetch_related
+
+def get_query_plan(serializer_class):
+    if serializer_class not in _plans:
+        _plans[serializer_class] = build_query_plan(serializer_class(), serializer_class.Meta.model)
+    return _plans[serializer_class]
+
+def apply_query_plan(serializer_class, data):
+    """
+    Load everything the serializer needs in a constant number of queries,
+    data can be a queryset, a list of instances (a page) or one instance
+    """
+    select_related, prefetch_related = get_query_plan(serializer_class)
+    if isinstance(data, QuerySet):
+        return data.select_related(*select_related).prefetch_related(*prefetch_related)
+
+    instances = [data] if isinstance(data, Model) else list(data)
+    if len(instances) > 0:
+        prefetch_related_objects(instances, *(select_related + prefetch_related))
+    return data
+
+class QueryPlanListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        if self.parent is None and not isinstance(data, dict):
+            data = apply_query_plan(type(self.child), data)
+        return super(QueryPlanListSerializer, self).to_representation(data)
+
+class QueryPlanMixin(object):
+    """
+    Read serializers that load their nested relations in bulk, the plan is
+    derived from the nested serializers and extended with Meta.select_related
+    and Meta.prefetch_related for what can't be derived (method fields, properties)
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        allow_empty = kwargs.pop('allow_empty', None)
+        child_serializer = cls(*args, **kwargs)
+        list_kwargs = {'child': child_serializer}
+        if allow_empty is not None:
+            list_kwargs['allow_empty'] = allow_empty
+        list_kwargs.update({
+            key: value for key, value in kwargs.items()
+            if key in LIST_SERIALIZER_KWARGS
+        })
+        return QueryPlanListSerializer(*args, **list_kwargs)
+
+    def to_representation(self, instance):
+        if self.parent is None and isinstance(instance, Model):
+            apply_query_plan(type(self), instance)
+        return super(QueryPlanMixin, self).to_representation(instance)
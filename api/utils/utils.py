@@ -1,7 +1,8 @@
+import datetime
 from math import radians, cos, sin, asin, sqrt
 
 from django.utils.timezone import is_aware, make_aware
-from django.utils.dateparse import parse_datetime
+from django.utils.dateparse import parse_datetime, parse_date
 
 def custom_index(array, compare_function):
     for i, v in enumerate(array):
@@ -36,4 +37,22 @@ def get_aware_datetime(date_str):
     ret = parse_datetime(date_str)
     if not is_aware(ret):
         ret = make_aware(ret)
-    return ret
\ No newline at end of file
+    return ret
+
+def parse_aware_datetime(date_str, end_of_day=False):
+    """
+    Aware datetime of a query string value, a date alone is the start (or the end)
+    of that day. Returns None if it is not a valid date
+    """
+    try:
+        ret = parse_datetime(date_str)
+        if ret is None:
+            day = parse_date(date_str)
+            if day is None:
+                return None
+            ret = datetime.datetime.combine(day, datetime.time.max if end_of_day else datetime.time.min)
+    except ValueError:
+        return None
+    if not is_aware(ret):
+        ret = make_aware(ret)
+    return ret
@@ -9,7 +9,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly
-from api.pagination import CustomPagination
+from api.pagination import CustomPagination, StartingAtPagination
 from django.db.models import Q
 
 from api.utils.email import send_fcm
@@ -94,7 +94,9 @@ class EmployerUsersView(APIView):
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-class PayrollPeriodView(APIView):
+class PayrollPeriodView(APIView, CustomPagination):
+    pagination_class = StartingAtPagination
+
     def get(self, request, period_id=None):
         if period_id:
             try:
@@ -103,6 +105,7 @@ class PayrollPeriodView(APIView):
                 return Response(validators.error_object('Not found.'), status=status.HTTP_404_NOT_FOUND)
 
             serializer = payment_serializer.PayrollPeriodGetSerializer(period)
+            return Response(serializer.data, status=status.HTTP_200_OK)
         else:
             periods = PayrollPeriod.objects.all()
             
@@ -114,9 +117,9 @@ class PayrollPeriodView(APIView):
             if qEmployer:
                 periods = periods.filter(employer__id=qEmployer)
                 
-            serializer = payment_serializer.PayrollPeriodGetSerializer(periods, many=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+            page = self.paginate_queryset(periods)
+            serializer = payment_serializer.PayrollPeriodGetSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         
 class GeneratePeriodsView(APIView):
     def get(self, request, employer_id=None):
@@ -24,6 +24,8 @@ from api.utils.utils import get_aware_datetime
 from api.serializers import user_serializer, profile_serializer, shift_serializer, employee_serializer, other_serializer, payment_serializer
 from api.serializers import favlist_serializer, venue_serializer, employer_serializer, auth_serializer, notification_serializer, clockin_serializer
 from api.serializers import rating_serializer
+from api.actions import daily_hours_actions, clock_sync_actions, roster_actions
+from django.db import IntegrityError
 from rest_framework_jwt.settings import api_settings
 from django.db.models import Count
 
@@ -161,7 +163,7 @@ class EmployeeMeView(EmployeeView, CustomPagination):
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-class EmployeeShiftInviteView(EmployeeView):
+class EmployeeShiftInviteView(EmployeeView, CustomPagination):
     def get(self, request, id=False):
         self.validate_employee(request)
         
@@ -172,6 +174,7 @@ class EmployeeShiftInviteView(EmployeeView):
                 return Response(validators.error_object('The invite was not found, maybe the shift does not exist anymore. Talk to the employer for any more details about this error.'), status=status.HTTP_404_NOT_FOUND)
 
             serializer = shift_serializer.ShiftInviteGetSerializer(invite, many=False)
+            return Response(serializer.data, status=status.HTTP_200_OK)
         else:
             invites = ShiftInvite.objects.filter(employee__id=self.employee.id)
             
@@ -179,9 +182,9 @@ class EmployeeShiftInviteView(EmployeeView):
             if qStatus:
                 invites = invites.filter(status=qStatus)
                 
-            serializer = shift_serializer.ShiftInviteGetSerializer(invites, many=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+            page = self.paginate_queryset(invites)
+            serializer = shift_serializer.ShiftInviteGetSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
 
     def put(self, request, id, action):
         self.validate_employee(request)
@@ -203,12 +206,17 @@ class EmployeeShiftInviteView(EmployeeView):
         if(len(preferred_talent) > 0):
             shiftSerializer = shift_serializer.ShiftInviteSerializer(invite, data={ "status": "APPLIED" }, many=False, context={"request": request })
             if shiftSerializer.is_valid():
+                result = roster_actions.fill_shift(invite.shift.id, self.employee.id)
+                if result == roster_actions.SHIFT_FILLED:
+                    return Response(validators.error_object("This shift is already filled"), status=status.HTTP_400_BAD_REQUEST)
+                if result == roster_actions.SHIFT_NOT_OPEN:
+                    return Response(validators.error_object("This shift is not opened for applicants"), status=status.HTTP_400_BAD_REQUEST)
                 shiftSerializer.save()
-                ShiftEmployee.objects.create(employee=self.employee, shift=invite.shift)
-                notify_shift_candidate_update(user=self.employee.user, shift=invite.shift, talents_to_notify={ 
-                    "accepted": [self.employee],
-                    "rejected": []
-                })
+                if result == roster_actions.ACCEPTED:
+                    notify_shift_candidate_update(user=self.employee.user, shift=invite.shift, talents_to_notify={ 
+                        "accepted": [self.employee],
+                        "rejected": []
+                    })
                 return Response({ "details": "Your application was automatically approved because you are one of the vendors preferred talents." }, status=status.HTTP_200_OK)
             else:
                 return Response(shiftSerializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -285,12 +293,34 @@ class ClockinsMeView(EmployeeView):
             return Response(validators.error_object("You need to specify started_at or ended_at"), status=status.HTTP_400_BAD_REQUEST)
             
         if serializer.is_valid():
-            serializer.save()
+            clockin = serializer.save()
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-        
+
+        # the clockin is closed, its hours can be added to the rollup
+        if clockin.ended_at is not None:
+            daily_hours_actions.refresh_daily_hours([(clockin.employee_id, clockin.shift_id)])
+
         return Response(serializer.data, status=status.HTTP_201_CREATED)
         
+class ClockinsSyncView(EmployeeView):
+    def post(self, request):
+        self.validate_employee(request)
+
+        events = request.data.get('events') if isinstance(request.data, dict) else None
+        if not isinstance(events, list):
+            return Response(validators.error_object("You need to send the list of events"), status=status.HTTP_400_BAD_REQUEST)
+        if len(events) > clock_sync_actions.MAXIMUM_SYNC_EVENTS:
+            return Response(validators.error_object("You can only sync "+str(clock_sync_actions.MAXIMUM_SYNC_EVENTS)+" events at a time"), status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            results = clock_sync_actions.sync_clock_events(self.employee, events)
+        except IntegrityError:
+            # another request is syncing the same events right now
+            return Response(validators.error_object("These events are already being synced, try again"), status=status.HTTP_409_CONFLICT)
+
+        return Response({ "results": results }, status=status.HTTP_200_OK)
+
 class EmployeeAvailabilityBlockView(EmployeeView, CustomPagination):
 
     def get(self, request, employee_id=False):
@@ -9,8 +9,8 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly
-from api.pagination import CustomPagination
-from django.db.models import Q
+from api.pagination import CustomPagination, StartingAtPagination
+from django.db.models import Q, F, DurationField, ExpressionWrapper
 
 from api.utils.email import send_fcm
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
@@ -18,11 +18,12 @@ from django.contrib.auth.models import User
 from oauth2_provider.models import AccessToken
 from api.models import *
 from api.utils.notifier import notify_password_reset_code
-from api.utils import validators
-from api.utils.utils import get_aware_datetime
+from api.utils import validators, exports
+from api.utils.utils import parse_aware_datetime
 from api.serializers import user_serializer, profile_serializer, shift_serializer, employee_serializer, other_serializer, payment_serializer
 from api.serializers import favlist_serializer, venue_serializer, employer_serializer, auth_serializer, notification_serializer, clockin_serializer
 from api.serializers import rating_serializer
+from api.actions import employer_actions
 from rest_framework_jwt.settings import api_settings
 
 import api.utils.jwt
@@ -56,6 +57,12 @@ class EmployerMeView(EmployerView):
 
         return Response(serializer.data, status=status.HTTP_200_OK)
         
+class EmployerMeSummaryView(EmployerView):
+    def get(self, request):
+        self.validate_employer(request)
+
+        return Response(employer_actions.get_employer_summary(self.employer.id), status=status.HTTP_200_OK)
+
 class EmployerMeUsersView(EmployerView):
     def get(self, request, id=False):
         self.validate_employer(request)
@@ -103,22 +110,23 @@ class ApplicantsView(EmployerView):
         
         return Response(status=status.HTTP_204_NO_CONTENT)
         
-class EmployerShiftInviteView(EmployerView):
+class EmployerShiftInviteView(EmployerView, CustomPagination):
     def get(self, request, id=False):
         self.validate_employer(request)
         if (id):
             try:
-                invite = ShiftInvite.objects.get(id=id, employer__id=self.employer.id)
+                invite = ShiftInvite.objects.get(id=id, sender__employer__id=self.employer.id)
             except ShiftInvite.DoesNotExist:
                 return Response(validators.error_object('The invite was not found, maybe the shift does not exist anymore. Talk to the employer for any more details about this error.'), status=status.HTTP_404_NOT_FOUND)
 
             serializer = shift_serializer.ShiftInviteGetSerializer(invite, many=False)
+            return Response(serializer.data, status=status.HTTP_200_OK)
         else:
             invites = ShiftInvite.objects.filter(sender__employer__id=self.employer.id)
             
             qEmployee_id = request.GET.get('employee')
             if qEmployee_id:
-                invites = invites.filter(employer__id=qEmployee_id)
+                invites = invites.filter(employee__id=qEmployee_id)
 
             qShift_id = request.GET.get('shift')
             if qShift_id:
@@ -128,9 +136,9 @@ class EmployerShiftInviteView(EmployerView):
             if qStatus:
                 invites = invites.filter(status=qStatus)
                 
-            serializer = shift_serializer.ShiftInviteGetSerializer(invites, many=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+            page = self.paginate_queryset(invites)
+            serializer = shift_serializer.ShiftInviteGetSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
 
     def post(self, request):
         self.validate_employer(request)
@@ -195,6 +203,77 @@ class EmployerPayrollPeriodView(EmployerView):
 
         return Response(serializer.data, status=status.HTTP_200_OK)
         
+class EmployerPayrollExportView(EmployerView):
+    """
+    Payroll downloads (CSV or NDJSON) streamed row by row, ?output=csv|ndjson
+    and ?starting_at= ?ending_at= (dates or datetimes) to limit the range
+    """
+    PAYMENT_COLUMNS = [
+        ('period', 'paryroll_period__id'),
+        ('period_starting_at', 'paryroll_period__starting_at'),
+        ('period_ending_at', 'paryroll_period__ending_at'),
+        ('employee', 'employee__id'),
+        ('first_name', 'employee__user__first_name'),
+        ('last_name', 'employee__user__last_name'),
+        ('shift', 'shift__id'),
+        ('regular_hours', 'regular_hours'),
+        ('over_time', 'over_time'),
+        ('hourly_rate', 'hourly_rate'),
+        ('total_amount', 'total_amount'),
+        ('status', 'status'),
+    ]
+    CLOCKIN_COLUMNS = [
+        ('clockin', 'id'),
+        ('employee', 'employee__id'),
+        ('first_name', 'employee__user__first_name'),
+        ('last_name', 'employee__user__last_name'),
+        ('shift', 'shift__id'),
+        ('position', 'shift__position__title'),
+        ('started_at', 'started_at'),
+        ('ended_at', 'ended_at'),
+        ('hours', 'worked'),
+        ('hourly_rate', 'shift__minimum_hourly_rate'),
+        ('status', 'status'),
+    ]
+
+    def get(self, request, kind):
+        self.validate_employer(request)
+
+        qOutput = request.GET.get('output', 'csv')
+        if qOutput not in exports.CONTENT_TYPES:
+            return Response(validators.error_object('The output must be csv or ndjson'), status=status.HTTP_400_BAD_REQUEST)
+
+        qStarted_at = request.GET.get('starting_at')
+        qEnded_at = request.GET.get('ending_at')
+        if qStarted_at:
+            qStarted_at = parse_aware_datetime(qStarted_at)
+            if qStarted_at is None:
+                return Response(validators.error_object('The starting_at must be a date or a datetime'), status=status.HTTP_400_BAD_REQUEST)
+        if qEnded_at:
+            qEnded_at = parse_aware_datetime(qEnded_at, end_of_day=True)
+            if qEnded_at is None:
+                return Response(validators.error_object('The ending_at must be a date or a datetime'), status=status.HTTP_400_BAD_REQUEST)
+
+        if kind == 'periods':
+            rows = PayrollPeriodPayment.objects.filter(paryroll_period__employer__id=self.employer.id)
+            if qStarted_at:
+                rows = rows.filter(paryroll_period__starting_at__gte=qStarted_at)
+            if qEnded_at:
+                rows = rows.filter(paryroll_period__ending_at__lte=qEnded_at)
+            rows = rows.order_by('paryroll_period__starting_at', 'id')
+            columns = self.PAYMENT_COLUMNS
+        else:
+            rows = Clockin.objects.filter(shift__employer__id=self.employer.id).annotate(
+                worked=ExpressionWrapper(F('ended_at') - F('started_at'), output_field=DurationField()))
+            if qStarted_at:
+                rows = rows.filter(started_at__gte=qStarted_at)
+            if qEnded_at:
+                rows = rows.filter(started_at__lte=qEnded_at)
+            rows = rows.order_by('started_at', 'id')
+            columns = self.CLOCKIN_COLUMNS
+
+        return exports.streaming_export(rows, columns, qOutput, 'payroll-' + kind)
+
 class EmployerVenueView(EmployerView):
     def get(self, request, id=False):
         self.validate_employer(request)
@@ -319,6 +398,8 @@ class FavListEmployeeView(EmployerView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
 class EmployerShiftView(EmployerView, CustomPagination):
+    pagination_class = StartingAtPagination
+
     def get(self, request, id=False):
         self.validate_employer(request)
         
@@ -332,7 +413,7 @@ class EmployerShiftView(EmployerView, CustomPagination):
             return Response(serializer.data, status=status.HTTP_200_OK)
         else:
         
-            shifts = Shift.objects.filter(employer__id=self.employer.id).order_by('starting_at')
+            shifts = Shift.objects.filter(employer__id=self.employer.id)
             
             qStatus = request.GET.get('status')
             if validators.in_choices(qStatus, SHIFT_STATUS_CHOICES):
@@ -359,8 +440,9 @@ class EmployerShiftView(EmployerView, CustomPagination):
             else:
                 shifts = shifts.filter(employer = request.user.profile.employer.id)
             
-            serializer = shift_serializer.ShiftGetSerializer(shifts, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            page = self.paginate_queryset(shifts)
+            serializer = shift_serializer.ShiftGetSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
             
     def post(self, request):
         self.validate_employer(request)
@@ -397,6 +479,18 @@ class EmployerShiftView(EmployerView, CustomPagination):
         shift.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+class EmployerShiftSeriesView(EmployerView):
+    def post(self, request):
+        self.validate_employer(request)
+
+        request.data["employer"] = self.employer.id
+        serializer = shift_serializer.ShiftSeriesSerializer(data=request.data, context={"request": request})
+        if serializer.is_valid():
+            shifts = serializer.save()
+            return_serializer = shift_serializer.ShiftGetSerializer(Shift.objects.filter(id__in=[shift.id for shift in shifts]).order_by('starting_at'), many=True)
+            return Response(return_serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
 class EmployerShiftCandidatesView(EmployerView, CustomPagination):
     def put(self, request, id):
         try:
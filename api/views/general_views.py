@@ -2,7 +2,7 @@ import json
 import os
 import functools
 import operator
-from django.utils.dateparse import parse_datetime
+from django.utils.dateparse import parse_datetime, parse_date
 from django.http import HttpResponse
 from rest_framework import status
 from rest_framework.views import APIView
@@ -23,6 +23,7 @@ from api.utils.utils import get_aware_datetime
 from api.serializers import user_serializer, profile_serializer, shift_serializer, employee_serializer, other_serializer, payment_serializer
 from api.serializers import favlist_serializer, venue_serializer, employer_serializer, auth_serializer, notification_serializer, clockin_serializer
 from api.serializers import rating_serializer
+from api.actions import daily_hours_actions, timesheet_actions
 from rest_framework_jwt.settings import api_settings
 
 import api.utils.jwt
@@ -206,8 +207,9 @@ class EmployeeView(APIView, CustomPagination):
             if qBadges:
                 employees = employees.filter(badges__id__in=qBadges)
             
-            serializer = employee_serializer.EmployeeGetSmallSerializer(employees, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            page = self.paginate_queryset(employees)
+            serializer = employee_serializer.EmployeeGetSmallSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
 
     # there shoud be no POST because it is created on signup (registration)
     
@@ -467,7 +469,7 @@ class BadgeView(APIView):
         badge.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-class RateView(APIView):
+class RateView(APIView, CustomPagination):
     def get(self, request, id=False):
         if (id):
             try:
@@ -476,6 +478,7 @@ class RateView(APIView):
                 return Response(validators.error_object('Not found.'), status=status.HTTP_404_NOT_FOUND)
 
             serializer = rating_serializer.RatingGetSerializer(rate, many=False)
+            return Response(serializer.data, status=status.HTTP_200_OK)
         else:
             rates = Rate.objects.all()
             
@@ -490,9 +493,9 @@ class RateView(APIView):
             if qShift:
                 rates = rates.filter(shift__id=qShift)
                 
-            serializer = rating_serializer.RatingGetSerializer(rates, many=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+            page = self.paginate_queryset(rates)
+            serializer = rating_serializer.RatingGetSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
 
     def post(self, request):
 
@@ -591,6 +594,7 @@ class ClockinsView(APIView):
             return Response(validators.error_object('Not found.'), status=status.HTTP_404_NOT_FOUND)
 
         clockin.delete()
+        daily_hours_actions.refresh_daily_hours([(clockin.employee_id, clockin.shift_id)])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 class PayrollShiftsView(APIView, CustomPagination):
@@ -632,31 +636,23 @@ class PayrollShiftsView(APIView, CustomPagination):
             
         return Response(payrol, status=status.HTTP_200_OK)
     
-    def put(self, request, id):
+    def put(self, request, id=None):
         
         if (request.user.profile.employer == None):
             return Response(validators.error_object("You don't seem to be an employer"), status=status.HTTP_400_BAD_REQUEST)
         
-        try:
-            emp = Employee.objects.get(id=id)
-        except Employee.DoesNotExist:
+        if id is not None and not Employee.objects.filter(id=id).exists():
             return Response({ "detail": "The employee was not found"},status=status.HTTP_404_NOT_FOUND)
+
+        if not isinstance(request.data, list):
+            return Response(validators.error_object('You need to send a list of clockins'), status=status.HTTP_400_BAD_REQUEST)
+
+        # the whole timesheet is validated first and saved in one transaction
+        clockins, errors = timesheet_actions.save_timesheet(request.user.profile.employer, request.data)
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
         
-        _serializers = []
-        for clockin in request.data:
-            try:
-                old_clockin = Clockin.objects.get(id=clockin["id"])
-                serializer = clockin_serializer.ClockinPayrollSerializer(old_clockin, data=clockin)
-            except Clockin.DoesNotExist:
-                serializer = clockin_serializer.ClockinPayrollSerializer(data=clockin)
-                
-            if not serializer.is_valid():
-                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-            _serializers.append(serializer)
-        
-        for serializer in _serializers:   
-            serializer.save()
-        
+        serializer = clockin_serializer.ClockinSerializer(clockins, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 class ProjectedPaymentsView(APIView):
@@ -665,12 +661,24 @@ class ProjectedPaymentsView(APIView):
         if employer_id == None:
             return Response(validators.error_object('The employer must be specified'), status=status.HTTP_404_NOT_FOUND)
             
+        qEmployee = request.GET.get('employee')
+
+        # the detailed clockins are only loaded for the day the user opens
+        qDay = request.GET.get('day')
+        if qDay is not None:
+            try:
+                day = parse_date(qDay)
+            except ValueError:
+                return Response(validators.error_object('The day '+qDay+' does not exist'), status=status.HTTP_400_BAD_REQUEST)
+            if day is None:
+                return Response(validators.error_object('The day must have the format YYYY-MM-DD'), status=status.HTTP_400_BAD_REQUEST)
+            clockins = payment_serializer.get_projected_clockins(employer_id=employer_id, day=day, talent_id=qEmployee)
+            return Response({ "day": qDay, "clockins": clockins }, status=status.HTTP_200_OK)
+
         qStarted_at = request.GET.get('starting_at')
         if qStarted_at is None:
             return Response(validators.error_object('You need to specify starting_at'), status=status.HTTP_404_NOT_FOUND)
 
-        qEmployee = request.GET.get('employee')
-        
         qLen = request.GET.get('period_length')
         qType = request.GET.get('period_type')
         